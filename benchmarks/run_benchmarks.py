@@ -0,0 +1,232 @@
+"""
+Benchmark suite for imcntr.
+
+Measures the overhead of the communication stack against a local
+:class:`imcntr.simulator.ControllerSimulator`, so no hardware is needed:
+
+- ``round_trip``: p50/p99 latency of ``SubmitTask(wait=True)`` through a real
+  transport (pseudo terminal or TCP socket).
+- ``receive``: lines per second through :meth:`DeviceConnection.receive`
+  with a growing number of pending waiters.
+- ``framing``: lines per second through the serial line handler, i.e.
+  framing and decoding of raw bytes including dispatch.
+- ``subscribe``: cost of a subscribe/unsubscribe pair on the receive
+  observer with a growing number of existing subscriptions.
+- ``import_time``: cold start of ``import imcntr`` in a fresh interpreter,
+  compared against a budget (``--import-budget``).
+
+Run from the repository root::
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only round_trip --iterations 5000 --json results.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SOURCE = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SOURCE))
+
+from imcntr import ConnectionHub, DeviceConnection, SubmitTask  # noqa: E402
+from imcntr.device_connection import _SerialLineHandler  # noqa: E402
+from imcntr.simulator import ControllerSimulator  # noqa: E402
+
+WAITER_COUNTS = (0, 10, 100, 1000)
+IMPORT_BUDGET_MS = 10.0
+
+
+def percentile(samples, fraction):
+    """
+    Return the given percentile of a list of samples (nearest rank).
+    """
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def bench_round_trip(iterations, transport, hub=False):
+    """
+    Measure command round-trip latency against the simulator.
+    """
+    with ControllerSimulator() as simulator, ConnectionHub() as connection_hub:
+        port = simulator.start_pty() if transport == "pty" else simulator.start_socket()
+        with DeviceConnection(port, hub=connection_hub if hub else None) as connection:
+            task = SubmitTask(connection, response="shutter_opened", task="open_shutter", timeout=5)
+            for _ in range(min(100, iterations)):
+                task(wait=True)
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                if not task(wait=True):
+                    raise RuntimeError("Simulator did not answer within timeout")
+                samples.append(time.perf_counter() - start)
+    return {
+        "transport": transport,
+        "hub": hub,
+        "iterations": iterations,
+        "p50_us": percentile(samples, 0.50) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+        "mean_us": statistics.fmean(samples) * 1e6,
+    }
+
+
+def bench_receive(iterations):
+    """
+    Measure lines per second through DeviceConnection.receive.
+    """
+    results = []
+    for waiters in WAITER_COUNTS:
+        connection = DeviceConnection()
+        observer = connection.receive_observer
+        for index in range(waiters):
+            observer.subscribe_key(f"pending_{index}", lambda data: None)
+        hits = []
+        observer.subscribe_key("rot_stopped", hits.append)
+        receive = connection.receive
+        start = time.perf_counter()
+        for _ in range(iterations):
+            receive("rot_stopped")
+        elapsed = time.perf_counter() - start
+        results.append({"waiters": waiters, "lines_per_s": iterations / elapsed})
+    return results
+
+
+def bench_framing(iterations):
+    """
+    Measure lines per second through the serial line handler.
+    """
+    connection = DeviceConnection()
+    connection.receive_observer.subscribe_key("rot_stopped", lambda data: None)
+    connection.register_responses("rot_stopped")
+    handler = _SerialLineHandler()
+    handler.receiver = connection
+    handler.responses = connection._responses
+    chunk = b"rot_stopped\r\n" * 64
+    rounds = max(1, iterations // 64)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        handler.data_received(chunk)
+    elapsed = time.perf_counter() - start
+    return {"chunk_lines": 64, "lines_per_s": rounds * 64 / elapsed}
+
+
+def bench_subscribe(iterations):
+    """
+    Measure the cost of a subscribe/unsubscribe pair.
+    """
+    results = []
+    for waiters in WAITER_COUNTS:
+        observer = DeviceConnection().receive_observer
+        for index in range(waiters):
+            observer.subscribe_key("rot_stopped", lambda data, index=index: None)
+        callback = lambda data: None  # noqa: E731
+        start = time.perf_counter()
+        for _ in range(iterations):
+            observer.unsubscribe_handle(observer.subscribe_key("rot_stopped", callback))
+        elapsed = time.perf_counter() - start
+        results.append({"waiters": waiters, "pair_us": elapsed / iterations * 1e6})
+    return results
+
+
+def bench_import_time(iterations, budget_ms):
+    """
+    Measure the cumulative import time of ``import imcntr`` in fresh interpreters.
+    """
+    environment = dict(os.environ, PYTHONPATH=str(SOURCE))
+    samples = []
+    for _ in range(iterations):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import imcntr"],
+            env=environment,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in process.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == "imcntr":
+                samples.append(int(fields[1]) / 1000)
+    median = statistics.median(samples)
+    return {
+        "iterations": iterations,
+        "median_ms": median,
+        "max_ms": max(samples),
+        "budget_ms": budget_ms,
+        "within_budget": median <= budget_ms,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000, help="iterations per measurement")
+    parser.add_argument(
+        "--transport",
+        choices=("socket", "pty"),
+        default="pty" if os.name == "posix" else "socket",
+        help="simulator transport used for round-trip measurements",
+    )
+    parser.add_argument(
+        "--hub",
+        action="store_true",
+        help="read the port via a ConnectionHub in round-trip measurements",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=("round_trip", "receive", "framing", "subscribe", "import_time"),
+        help="run only the given benchmark (may be repeated)",
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=IMPORT_BUDGET_MS,
+        metavar="MS",
+        help="budget for the cold import time in milliseconds",
+    )
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    selected = args.only or ["round_trip", "receive", "framing", "subscribe", "import_time"]
+    results = {}
+    if "round_trip" in selected:
+        results["round_trip"] = result = bench_round_trip(args.iterations, args.transport, args.hub)
+        reader = "hub" if result["hub"] else "reader thread"
+        print(
+            f"round_trip ({result['transport']}, {reader}): p50 {result['p50_us']:.1f} us, "
+            f"p99 {result['p99_us']:.1f} us, mean {result['mean_us']:.1f} us"
+        )
+    if "receive" in selected:
+        results["receive"] = bench_receive(args.iterations * 50)
+        for result in results["receive"]:
+            print(f"receive ({result['waiters']} waiters): {result['lines_per_s']:,.0f} lines/s")
+    if "framing" in selected:
+        results["framing"] = result = bench_framing(args.iterations * 50)
+        print(f"framing: {result['lines_per_s']:,.0f} lines/s")
+    if "subscribe" in selected:
+        results["subscribe"] = bench_subscribe(args.iterations * 10)
+        for result in results["subscribe"]:
+            print(f"subscribe/unsubscribe ({result['waiters']} waiters): {result['pair_us']:.2f} us")
+    if "import_time" in selected:
+        results["import_time"] = result = bench_import_time(
+            max(5, args.iterations // 100), args.import_budget
+        )
+        status = "within" if result["within_budget"] else "OVER"
+        print(
+            f"import_time: median {result['median_ms']:.2f} ms, max {result['max_ms']:.2f} ms "
+            f"({status} budget of {result['budget_ms']:.1f} ms)"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    results = main()
+    if not results.get("import_time", {}).get("within_budget", True):
+        sys.exit(1)
@@ -6,13 +6,68 @@ imaging controller via a communication protocol. It defines controller tasks,
 creates task submission and response-waiting objects, and exposes simple
 interfaces for common operations such as moving samples, rotating, stopping
 motions, and controlling the shutter.
+
+The public names are imported lazily on first access, so ``import imcntr``
+does not load :mod:`serial` or :mod:`asyncio` until they are needed.
 """
 
-from .device_connection import DeviceConnection
-from .controller_api import Controller, Sample, Shutter
-from importlib.metadata import version, PackageNotFoundError
+from ._version import __version__
+
+_EXPORTS = {
+    "Observer": "response_observer",
+    "CommandMetrics": "metrics",
+    "TraceRecorder": "trace",
+    "TraceRecord": "trace",
+    "read_trace": "trace",
+    "DispatchExecutor": "dispatch",
+    "LineStream": "stream",
+    "DeviceConnection": "device_connection",
+    "AsyncDeviceConnection": "device_connection",
+    "ConnectionLostError": "device_connection",
+    "WaitForResponse": "device_command_handler",
+    "SubmitTask": "device_command_handler",
+    "AsyncWaitForResponse": "device_command_handler",
+    "AsyncSubmitTask": "device_command_handler",
+    "CommandPipeline": "device_command_handler",
+    "ResponsePattern": "device_command_handler",
+    "ResponseMatcher": "device_command_handler",
+    "ResponseMatch": "device_command_handler",
+    "Controller": "controller_api",
+    "Sample": "controller_api",
+    "Shutter": "controller_api",
+    "AsyncController": "controller_api",
+    "AsyncSample": "controller_api",
+    "AsyncShutter": "controller_api",
+    "ReplayConnection": "replay",
+    "ReconnectSupervisor": "supervisor",
+    "ConnectionHub": "hub",
+    "discover_port": "discovery",
+    "find_ports": "discovery",
+}
+
+__all__ = ["__version__", *_EXPORTS]
+
+
+def __getattr__(name):
+    """
+    Import a public name from its submodule on first access.
+
+    :param name: Attribute name.
+    :type name: str
+    :raises AttributeError: If the name is not exported.
+    """
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-try:
-    __version__ = version("imcntr")
-except PackageNotFoundError:
-    __version__ = None
+def __dir__():
+    """
+    List the module attributes including the lazily imported names.
+    """
+    return sorted(set(globals()) | set(_EXPORTS))
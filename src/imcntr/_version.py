@@ -0,0 +1,8 @@
+"""
+Package version.
+
+Kept as a constant, updated by semantic-release on every release, so that
+reading the version does not require a metadata lookup at import time.
+"""
+
+__version__ = "1.1.0"
@@ -9,9 +9,18 @@ The module builds communication protocol :class:`DeviceConnection` as well as on
 low-level command handlers provided by:class:`SubmitTask` and
 :class:`WaitForResponse`, exposing a clear, structured, and type-safe API for
 device operation.
+
+:class:`AsyncController`, :class:`AsyncSample` and :class:`AsyncShutter`
+expose the same API with awaitable methods, based on
+:class:`AsyncSubmitTask` and :class:`AsyncWaitForResponse`.
 """
 
-from .device_command_handler import WaitForResponse, SubmitTask
+from .device_command_handler import (
+    WaitForResponse,
+    SubmitTask,
+    AsyncWaitForResponse,
+    AsyncSubmitTask,
+)
 from enum import Enum
 from dataclasses import dataclass
 from typing import Optional
@@ -58,12 +67,18 @@ class TaskFactory:
     Factory for creating :class:`SubmitTask` and :class:`WaitForResponse`
     instances from :class:`_Task` definitions.
 
+    If ``asynchronous`` is ``True``, :class:`AsyncSubmitTask` and
+    :class:`AsyncWaitForResponse` instances are created instead.
+
     :param protocol: Communication protocol instance.
     :type protocol: imcntr.device_connection.DeviceConnection
+    :param asynchronous: Whether to create awaitable task handlers.
+    :type asynchronous: bool
     """
 
-    def __init__(self, protocol):
+    def __init__(self, protocol, asynchronous=False):
         self._protocol = protocol
+        self._asynchronous = asynchronous
 
     def submit(self, task):
         """
@@ -72,12 +87,14 @@ class TaskFactory:
         :param task: Task enum describing the command and expected response.
         :type task: _Task
         :return: Configured submit task instance.
-        :rtype: SubmitTask
+        :rtype: SubmitTask | AsyncSubmitTask
         """
-        return SubmitTask(
+        submit_class = AsyncSubmitTask if self._asynchronous else SubmitTask
+        return submit_class(
             protocol=self._protocol,
             task=task.value.task,
             response=task.value.response,
+            name=task.name,
         )
 
     def wait(self, task):
@@ -87,9 +104,10 @@ class TaskFactory:
         :param task: Task enum describing the expected response.
         :type task: _Task
         :return: Configured wait task instance.
-        :rtype: WaitForResponse
+        :rtype: WaitForResponse | AsyncWaitForResponse
         """
-        return WaitForResponse(
+        wait_class = AsyncWaitForResponse if self._asynchronous else WaitForResponse
+        return wait_class(
             protocol=self._protocol,
             response=task.value.response,
         )
@@ -105,25 +123,32 @@ class Controller:
     :param protocol: Communication protocol instance.
     :type protocol: imcntr.DeviceConnection
     """
+    _asynchronous = False
 
     def __init__(self, protocol):
-        factory = _TaskFactory(protocol)
+        factory = TaskFactory(protocol, asynchronous=self._asynchronous)
         self._ready = factory.wait(_Task.READY)
         self._connected = factory.submit(_Task.CONNECTED)
 
-    def connected(self, timeout):
+    def connected(self, timeout=None, block=True):
         """
         Check whether the controller is connected.
 
         :param timeout: Maximum time to wait for the expected response, in seconds.
         :type timeout: float
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
         :return: ``True`` if the response is received within the timeout,
-                 ``False`` if the timeout expires.
-        :rtype: Optional[bool]
+                 ``False`` if the timeout expires, or a
+                 :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: Optional[bool] | concurrent.futures.Future
         """
-        return self._connected(timeout)
+        if not block:
+            return self._connected.submit(timeout)
+        return self._connected(timeout, wait=True)
 
-    def ready(self, timeout):
+    def ready(self, timeout=None):
         """
         Wait for the controller to report it is ready.
 
@@ -142,11 +167,21 @@ class Sample:
 
     Provides methods to move sample in/out, rotate, and stop movements.
 
+    Every method blocks until the movement is completed. With ``block=False``
+    the task is sent immediately and a :class:`concurrent.futures.Future` is
+    returned instead, which allows running independent movements concurrently::
+
+        moved = sample.move_in(timeout=30, block=False)
+        opened = shutter.open(timeout=5, block=False)
+        moved.result(), opened.result()
+
     :param protocol: Communication protocol instance.
     :type protocol: imcntr.DeviceConnection
     """
+    _asynchronous = False
+
     def __init__(self, protocol):
-        factory = _TaskFactory(protocol)
+        factory = TaskFactory(protocol, asynchronous=self._asynchronous)
         self._move_in = factory.submit(_Task.MOVE_IN)
         self._move_out = factory.submit(_Task.MOVE_OUT)
         self._move_stop = factory.submit(_Task.MOVE_STOP)
@@ -176,76 +211,181 @@ class Sample:
             )
         return value
 
-    def move_in(self, timeout):
+    def move_in(self, timeout=None, block=True):
         """
         Move the sample in.
 
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
-        return self._move_in(timeout)
+        if not block:
+            return self._move_in.submit(timeout)
+        return self._move_in(timeout, wait=True)
 
-    def move_out(self, timeout):
+    def move_out(self, timeout=None, block=True):
         """
         Move the sample out.
 
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
-        return self._move_out(timeout)
+        if not block:
+            return self._move_out.submit(timeout)
+        return self._move_out(timeout, wait=True)
 
-    def move_stop(self, timeout):
+    def move_stop(self, timeout=None, block=True):
         """
         Stop linear sample movement.
 
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
-        return self._move_stop(timeout)
+        if not block:
+            return self._move_stop.submit(timeout)
+        return self._move_stop(timeout, wait=True)
 
-    def rotate_cw(self, step: int, timeout):
+    def rotate_cw(self, step: int, timeout=None, block=True):
         """
         Rotate the sample clockwise.
 
         :param step: Number of rotation steps.
         :type step: int
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
         step = self._validate_step(step)
-        self._rotate_cw.task = f"{_Task.ROTATE_CW.value.task}+{step}"
-        return self._rotate_cw(timeout)
+        task = f"{_Task.ROTATE_CW.value.task}+{step}"
+        if not block:
+            return self._rotate_cw.submit(timeout, task=task)
+        return self._rotate_cw(timeout, wait=True, task=task)
 
-    def rotate_ccw(self, step: int, timeout):
+    def rotate_ccw(self, step: int, timeout=None, block=True):
         """
         Rotate the sample counterclockwise.
 
         :param step: Number of rotation steps.
         :type step: int
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
         step = self._validate_step(step)
-        self._rotate_ccw.task = f"{_Task.ROTATE_CCW.value.task}+{step}"
-        return self._rotate_ccw(timeout)
+        task = f"{_Task.ROTATE_CCW.value.task}+{step}"
+        if not block:
+            return self._rotate_ccw.submit(timeout, task=task)
+        return self._rotate_ccw(timeout, wait=True, task=task)
 
-    def rotate_stop(self, timeout):
+    def scan(self, steps, timeout=None, clockwise=True, before_step=None, after_step=None):
+        """
+        Rotate the sample through a sequence of steps, e.g. for a tomography scan.
+
+        All rotation commands are built before the first one is sent, and the
+        whole sequence runs with a single subscription. Each rotation is
+        started as soon as the previous one has completed and the hooks have
+        returned. The scan stops at the first rotation that does not complete
+        within the timeout.
+
+        :param steps: Rotation step counts, one per rotation.
+        :type steps: Iterable[int]
+        :param timeout: Maximum time to wait for each rotation, in seconds.
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param clockwise: Rotate clockwise if ``True``, counterclockwise otherwise.
+        :type clockwise: bool
+        :param before_step: Optional callable invoked with the index and step
+                            count before each rotation.
+        :type before_step: callable | None
+        :param after_step: Optional callable invoked with the index and step
+                           count after each rotation, e.g. to trigger the camera.
+        :type after_step: callable | None
+        :return: Number of completed rotations.
+        :rtype: int
+        :raises TypeError: If a step is not an integer.
+        :raises ValueError: If a step is not positive.
+        :raises ConnectionLostError: If the connection is lost during the scan.
+        """
+        steps = [self._validate_step(step) for step in steps]
+        if clockwise:
+            handler, command = self._rotate_cw, _Task.ROTATE_CW.value.task
+        else:
+            handler, command = self._rotate_ccw, _Task.ROTATE_CCW.value.task
+        tasks = [f"{command}+{step}" for step in steps]
+        return handler.run_sequence(
+            tasks,
+            timeout,
+            before_task=_step_hook(before_step, steps),
+            after_task=_step_hook(after_step, steps),
+        )
+
+    def rotate_stop(self, timeout=None, block=True):
         """
         Stop sample rotation.
 
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
-        return self._rotate_stop(timeout)
+        if not block:
+            return self._rotate_stop.submit(timeout)
+        return self._rotate_stop(timeout, wait=True)
 
-    def stop(self, timeout: float):
+    def stop(self, timeout=None, block=True):
         """
         Stop all sample movements.
 
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
-        return self._stop(timeout)
+        if not block:
+            return self._stop.submit(timeout)
+        return self._stop(timeout, wait=True)
 
 
 class Shutter:
@@ -257,25 +397,106 @@ class Shutter:
     :param protocol: Communication protocol instance.
     :type protocol: imcntr.DeviceConnection
     """
+    _asynchronous = False
+
     def __init__(self, protocol):
-        factory = _TaskFactory(protocol)
+        factory = TaskFactory(protocol, asynchronous=self._asynchronous)
         self._open = factory.submit(_Task.OPEN)
         self._close = factory.submit(_Task.CLOSE)
 
-    def close(self, timeout: float):
+    def close(self, timeout=None, block=True):
         """
         Close the shutter.
 
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
-        return self._close(timeout)
+        if not block:
+            return self._close.submit(timeout)
+        return self._close(timeout, wait=True)
 
-    def open(self, timeout: float):
+    def open(self, timeout=None, block=True):
         """
         Open the shutter.
 
         :param timeout: Maximum time to wait for completion, in seconds.
-        :type timeout: float
+                        If ``None``, waits indefinitely.
+        :type timeout: float | None
+        :param block: If ``False``, return a future instead of waiting.
+        :type block: bool
+        :return: ``True`` if completed within the timeout, ``False`` otherwise,
+                 or a :class:`concurrent.futures.Future` resolving to it if
+                 ``block`` is ``False``.
+        :rtype: bool | concurrent.futures.Future
         """
-        return self._open(timeout)
+        if not block:
+            return self._open.submit(timeout)
+        return self._open(timeout, wait=True)
+
+
+def _step_hook(hook, steps):
+    """
+    Adapt a scan hook taking index and step count to a task index hook.
+
+    :param hook: Hook invoked with index and step count, or ``None``.
+    :type hook: callable | None
+    :param steps: Validated step counts of the scan.
+    :type steps: list[int]
+    :return: Hook invoked with the index only, or ``None``.
+    :rtype: callable | None
+    """
+    if hook is None:
+        return None
+    return lambda index: hook(index, steps[index])
+
+
+class AsyncController(Controller):
+    """
+    Awaitable controller interface.
+
+    Same API as :class:`Controller`, but every method returns a coroutine
+    that has to be awaited within an :mod:`asyncio` event loop. With
+    ``block=False`` the task is sent immediately and an
+    :class:`asyncio.Future` is returned instead.
+
+    :param protocol: Communication protocol instance.
+    :type protocol: imcntr.AsyncDeviceConnection
+    """
+    _asynchronous = True
+
+
+class AsyncSample(Sample):
+    """
+    Awaitable interface for sample movement and rotation control.
+
+    Same API as :class:`Sample`, but every method returns a coroutine
+    that has to be awaited within an :mod:`asyncio` event loop. With
+    ``block=False`` the task is sent immediately and an
+    :class:`asyncio.Future` is returned instead.
+
+    :param protocol: Communication protocol instance.
+    :type protocol: imcntr.AsyncDeviceConnection
+    """
+    _asynchronous = True
+
+
+class AsyncShutter(Shutter):
+    """
+    Awaitable interface for shutter control.
+
+    Same API as :class:`Shutter`, but every method returns a coroutine
+    that has to be awaited within an :mod:`asyncio` event loop. With
+    ``block=False`` the task is sent immediately and an
+    :class:`asyncio.Future` is returned instead.
+
+    :param protocol: Communication protocol instance.
+    :type protocol: imcntr.AsyncDeviceConnection
+    """
+    _asynchronous = True
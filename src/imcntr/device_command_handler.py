@@ -4,10 +4,357 @@ Task and response helpers for a device connection.
 This module provides utility classes for sending tasks to a device
 and waiting for specific responses via a given protocol using a
 threaded observer pattern.
+
+:class:`AsyncWaitForResponse` and :class:`AsyncSubmitTask` provide awaitable
+counterparts for use within an :mod:`asyncio` event loop. They resolve an
+:class:`asyncio.Future` from the serial reader thread instead of blocking a
+thread per outstanding wait.
+
+:meth:`SubmitTask.submit` sends a task without blocking and returns a
+:class:`concurrent.futures.Future`, so independent tasks can run concurrently
+and be joined later. Timeouts of such futures are handled by a single shared
+scheduler thread.
+
+:class:`CommandPipeline` sends several tasks back to back without waiting in
+between and matches the responses to the tasks in order of submission, per
+response string.
+
+Responses carrying a value, e.g. a position or an error code, are described
+by a :class:`ResponsePattern` such as ``ResponsePattern("pos={int}")``.
+Waiting for a pattern returns a :class:`ResponseMatch` with the parsed
+values. All patterns waited for on a connection are compiled into a single
+:class:`ResponseMatcher`, so every received line is classified in one pass,
+however many waits are pending.
 """
 
-from .device_connection import DeviceConnection
+from .device_connection import DeviceConnection, ConnectionLostError
+from .response_observer import Observer
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import heapq
+import itertools
+import re
 import threading
+import time
+import weakref
+
+_PLACEHOLDERS = {
+    "int": (r"([+-]?\d+)", int),
+    "float": (r"([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)", float),
+    "word": (r"(\S+)", str),
+    "str": (r"(.*?)", str),
+}
+_TEMPLATE_TOKEN = re.compile(r"\{\{|\}\}|\{([^{}]*)\}")
+
+ResponseMatch = collections.namedtuple("ResponseMatch", ("pattern", "line", "values"))
+ResponseMatch.__doc__ = """
+Received line matching a response pattern.
+
+:param pattern: Pattern or exact response string that matched.
+:type pattern: ResponsePattern | str
+:param line: Received line.
+:type line: str
+:param values: Values parsed from the placeholders, in order.
+:type values: tuple
+"""
+
+
+class ResponsePattern:
+    """
+    Describe a family of responses carrying values.
+
+    The template is matched against the whole received line. It may contain
+    the placeholders ``{int}``, ``{float}``, ``{word}`` (no whitespace) and
+    ``{str}`` (any text), whose values are converted and returned in
+    :attr:`ResponseMatch.values`. Literal braces are written as ``{{`` and
+    ``}}``.
+
+    With ``prefix=True`` the template only has to match the start of the
+    line, and the rest of the line is appended to the values as a string.
+
+    Patterns are immutable and compare equal if their template and prefix
+    flag are equal.
+
+    :param template: Response template, e.g. ``"pos={int}"``.
+    :type template: str
+    :param prefix: Whether the template matches the start of the line only.
+    :type prefix: bool
+    :raises TypeError: If the template is not a string.
+    :raises ValueError: If the template contains an unknown placeholder.
+    """
+
+    __slots__ = ("_template", "_prefix", "_source", "_converters", "_literal", "_regex")
+
+    def __init__(self, template, prefix=False):
+        if not isinstance(template, str):
+            raise TypeError(
+                f"Invalid template: must be of type str, got '{type(template).__name__}'"
+            )
+        source = []
+        converters = []
+        literal = []
+        position = 0
+        for token in _TEMPLATE_TOKEN.finditer(template):
+            text = template[position:token.start()]
+            source.append(re.escape(text))
+            literal.append(text)
+            position = token.end()
+            name = token.group(1)
+            if name is None:
+                source.append(re.escape(token.group()[0]))
+                literal.append(token.group()[0])
+                continue
+            if name not in _PLACEHOLDERS:
+                raise ValueError(
+                    f"Invalid placeholder: must be one of {', '.join(_PLACEHOLDERS)}, got '{name}'"
+                )
+            expression, converter = _PLACEHOLDERS[name]
+            source.append(expression)
+            converters.append(converter)
+        text = template[position:]
+        source.append(re.escape(text))
+        literal.append(text)
+        if prefix:
+            source.append("(.*)")
+            converters.append(str)
+        self._template = template
+        self._prefix = bool(prefix)
+        self._source = "".join(source)
+        self._converters = tuple(converters)
+        self._literal = "".join(literal)
+        self._regex = re.compile(self._source, re.DOTALL)
+
+    @property
+    def template(self):
+        """
+        Response template.
+
+        :rtype: str
+        """
+        return self._template
+
+    @property
+    def prefix(self):
+        """
+        Whether the template matches the start of the line only.
+
+        :rtype: bool
+        """
+        return self._prefix
+
+    @property
+    def exact(self):
+        """
+        The response string if the pattern matches a single line only, else ``None``.
+
+        :rtype: str | None
+        """
+        return self._literal if not self._converters else None
+
+    def match(self, line):
+        """
+        Match a received line against this pattern alone.
+
+        :param line: Received line.
+        :type line: str
+        :return: The match, or ``None`` if the line does not match.
+        :rtype: ResponseMatch | None
+        """
+        found = self._regex.fullmatch(line)
+        if found is None:
+            return None
+        return ResponseMatch(self, line, self._convert(found.groups()))
+
+    def _convert(self, groups):
+        """
+        Convert the captured groups to the placeholder types.
+
+        Internal use only.
+        """
+        return tuple(converter(group) for converter, group in zip(self._converters, groups))
+
+    def _precedence(self):
+        """
+        Sort key ranking templates before prefixes and longer literals first.
+
+        Internal use only.
+        """
+        return (self._prefix, -len(self._literal), self._template)
+
+    def __eq__(self, other):
+        if not isinstance(other, ResponsePattern):
+            return NotImplemented
+        return self._template == other._template and self._prefix == other._prefix
+
+    def __hash__(self):
+        return hash((ResponsePattern, self._template, self._prefix))
+
+    def __str__(self):
+        return self._template
+
+    def __repr__(self):
+        if self._prefix:
+            return f"ResponsePattern({self._template!r}, prefix=True)"
+        return f"ResponsePattern({self._template!r})"
+
+
+class ResponseMatcher:
+    """
+    Classify received lines against many responses in a single pass.
+
+    Exact response strings are looked up in a dictionary. All other patterns
+    are compiled into one combined regular expression, which is rebuilt
+    whenever a pattern is added or removed. :meth:`match` works on an
+    immutable snapshot and may be called from any thread while patterns are
+    changed.
+
+    :meth:`match` classifies a line as at most one response. Exact strings
+    take precedence over patterns, full templates over prefixes, and among
+    those the pattern with the longer literal text wins. :meth:`match_all`
+    returns every matching response instead.
+
+    :param patterns: Initial patterns or exact response strings.
+    :type patterns: Iterable[ResponsePattern | str]
+    :raises TypeError: If a pattern is neither a string nor a
+                       :class:`ResponsePattern`.
+    """
+
+    def __init__(self, patterns=()):
+        self._lock = threading.Lock()
+        self._patterns = {}
+        self._compiled = ({}, None, {}, ())
+        for pattern in patterns:
+            self.add(pattern)
+
+    @property
+    def patterns(self):
+        """
+        Registered patterns and exact response strings.
+
+        :rtype: tuple[ResponsePattern | str, ...]
+        """
+        return tuple(self._patterns)
+
+    def add(self, pattern):
+        """
+        Register a pattern. Registering a pattern twice has no effect.
+
+        :param pattern: Pattern or exact response string.
+        :type pattern: ResponsePattern | str
+        :raises TypeError: If ``pattern`` is neither a string nor a
+                           :class:`ResponsePattern`.
+        """
+        if not isinstance(pattern, (str, ResponsePattern)):
+            raise TypeError(
+                f"Invalid pattern: must be of type str or ResponsePattern, got '{type(pattern).__name__}'"
+            )
+        with self._lock:
+            if pattern not in self._patterns:
+                self._patterns[pattern] = None
+                self._compiled = self._compile(self._patterns)
+
+    def remove(self, pattern):
+        """
+        Unregister a pattern. Unknown patterns are ignored.
+
+        :param pattern: Pattern or exact response string.
+        :type pattern: ResponsePattern | str
+        """
+        with self._lock:
+            if pattern in self._patterns:
+                del self._patterns[pattern]
+                self._compiled = self._compile(self._patterns)
+
+    def match(self, line):
+        """
+        Classify a received line.
+
+        :param line: Received line.
+        :type line: str
+        :return: The match of the winning pattern, or ``None`` if no pattern
+                 matches.
+        :rtype: ResponseMatch | None
+        """
+        exact, regex, groups, _ = self._compiled
+        pattern = exact.get(line)
+        if pattern is not None:
+            return ResponseMatch(pattern, line, ())
+        if regex is None:
+            return None
+        found = regex.fullmatch(line)
+        if found is None:
+            return None
+        index = found.lastindex
+        pattern = groups[index]
+        values = found.groups()[index:index + len(pattern._converters)]
+        return ResponseMatch(pattern, line, pattern._convert(values))
+
+    def match_all(self, line):
+        """
+        Match a received line against every registered response.
+
+        The line is classified with :meth:`match` first, so lines matching
+        no response are rejected in a single pass.
+
+        :param line: Received line.
+        :type line: str
+        :return: The matches of all matching responses, in registration
+                 order.
+        :rtype: tuple[ResponseMatch, ...]
+        """
+        if self.match(line) is None:
+            return ()
+        matches = []
+        for pattern in self._compiled[3]:
+            if isinstance(pattern, str):
+                if pattern == line:
+                    matches.append(ResponseMatch(pattern, line, ()))
+            else:
+                found = pattern.match(line)
+                if found is not None:
+                    matches.append(found)
+        return tuple(matches)
+
+    @staticmethod
+    def _compile(patterns):
+        """
+        Build the lookup snapshot of the given patterns.
+
+        Internal use only.
+
+        :return: Dictionary of exact responses, combined regular expression
+                 or ``None``, mapping of the group index of every
+                 alternative to its pattern, and all patterns.
+        :rtype: tuple
+        """
+        exact = {}
+        alternatives = []
+        for pattern in patterns:
+            if isinstance(pattern, str):
+                exact[pattern] = pattern
+            elif pattern.exact is not None and not pattern.prefix:
+                exact.setdefault(pattern.exact, pattern)
+            else:
+                alternatives.append(pattern)
+        alternatives.sort(key=ResponsePattern._precedence)
+        groups = {}
+        sources = []
+        index = 1
+        for pattern in alternatives:
+            groups[index] = pattern
+            sources.append(f"({pattern._source})")
+            index += 1 + len(pattern._converters)
+        regex = re.compile("|".join(sources), re.DOTALL) if sources else None
+        return exact, regex, groups, tuple(patterns)
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def __contains__(self, pattern):
+        return pattern in self._patterns
+
 
 class WaitForResponse:
     """
@@ -17,7 +364,12 @@ class WaitForResponse:
     and blocks until the expected response is received or a timeout occurs.
 
     The instance itself is callable and returns a boolean indicating whether
-    the response was received within the timeout period.
+    the response was received within the timeout period. Every call waits on
+    its own event, so the same instance may be called from several threads
+    at once.
+
+    If the response is a :class:`ResponsePattern`, a received wait returns
+    the :class:`ResponseMatch` with the parsed values instead of ``True``.
 
     This class is also used as the base class for :class:`SubmitTask`.
 
@@ -27,29 +379,29 @@ class WaitForResponse:
 
     :param protocol: Active device communication protocol.
     :type protocol: :class:`DeviceConnection`
-    :param response: Expected response string to wait for.
-    :type response: str
+    :param response: Expected response string or pattern to wait for.
+    :type response: str | ResponsePattern
     :param timeout: Default timeout in seconds. If ``None``, waits indefinitely.
     :type timeout: float | None
     """
     def __init__(self, protocol, response=None, timeout=None):
         self._protocol, self._receive_observer = self._validate_protocol(protocol)
         if response is not None:
-            self._response = self._validate_signal(response)
+            self._response = self._validate_response(response)
+            _register_response(self._protocol, self._response)
         else:
             self._response = response
         if timeout is not None:
             self._timeout = self._validate_timeout(timeout)
         else:
             self._timeout = timeout
-        self._event = threading.Event()
 
     @property
     def response(self):
         """
-        Expected response string.
+        Expected response string or pattern.
 
-        :rtype: str
+        :rtype: str | ResponsePattern
         """
         return self._response
 
@@ -58,14 +410,15 @@ class WaitForResponse:
         """
         Set a new expected response.
 
-        :param value: New expected response string.
-        :type value: str
-        :raises TypeError: If the value is not a string.
+        :param value: New expected response string or pattern.
+        :type value: str | ResponsePattern
+        :raises TypeError: If the value is neither a string nor a pattern.
 
         .. warning::
             Do not modify this attribute while a wait is in progress.
         """
-        self._response = self._validate_signal(value)
+        self._response = self._validate_response(value)
+        _register_response(self._protocol, self._response)
 
     @property
     def timeout(self):
@@ -88,24 +441,287 @@ class WaitForResponse:
         """
         self._timeout = self._validate_timeout(value)
 
-    def _receive_message(self, data):
+    def _receive_message(self, received, event, data):
         """
         Receive observer callback.
 
         This method is invoked by the protocol's receive observer whenever
         data is received. If the received data matches the expected response,
-        the internal event is set, unblocking the waiting thread.
+        the result is appended to ``received`` and the event of the
+        corresponding call is set, unblocking the waiting thread.
 
         This mechanism is shared by :class:`WaitForResponse` and
         :class:`SubmitTask`.
 
+        :param received: Results of the waiting call.
+        :type received: list
+        :param event: Event of the waiting call.
+        :type event: threading.Event
         :param data: Data received from the device.
-        :type data: str
+        :type data: str | ResponseMatch
+        """
+        result = self._match(data)
+        if result is not None:
+            received.append(result)
+            event.set()
+
+    def _match(self, data):
+        """
+        Check received data against the expected response.
+
+        Internal use only.
+
+        :param data: Received line, or the match of a pattern response
+                     classified by the connection's :class:`ResponseMatcher`.
+        :type data: str | ResponseMatch
+        :return: ``True`` for a matching response string, the
+                 :class:`ResponseMatch` for a matching pattern, or ``None``.
+        :rtype: bool | ResponseMatch | None
+        """
+        response = self._response
+        if type(data) is ResponseMatch:
+            return data if data.pattern == response else None
+        if isinstance(response, ResponsePattern):
+            return response.match(data)
+        return True if data == response else None
+
+    def _subscribe(self, callback):
         """
-        if data == self._response:
-            self._event.set()
+        Subscribe a callback to the receive observer.
+
+        If the observer supports keyed subscriptions, the callback is
+        registered under the expected response so that it is only invoked
+        for matching data, and the returned handle is used to remove it
+        again. Otherwise a plain subscription is used.
+
+        Pattern responses are registered with the :class:`ResponseMatcher`
+        shared by all waits on the protocol, which runs in the reader thread
+        and invokes the callback with the :class:`ResponseMatch`.
+
+        Internal use only.
+
+        :param callback: Callable invoked with the received data.
+        :type callback: callable
+        :return: Subscription handle, or ``None`` for plain subscriptions.
+        :rtype: int | None
+        """
+        if isinstance(self._response, ResponsePattern):
+            return _pattern_router(self._protocol).subscribe(self._response, callback)
+        subscribe_key = getattr(self._receive_observer, "subscribe_key", None)
+        if subscribe_key is not None:
+            return subscribe_key(self._response, callback)
+        self._receive_observer.subscribe(callback)
+        return None
+
+    def _unsubscribe(self, handle, callback):
+        """
+        Remove the subscription created by :meth:`_subscribe`.
+
+        Internal use only.
+
+        :param handle: Handle returned by :meth:`_subscribe`.
+        :type handle: int | None
+        :param callback: Callable that was subscribed.
+        :type callback: callable
+        """
+        if isinstance(self._response, ResponsePattern):
+            _pattern_router(self._protocol).unsubscribe(handle)
+        elif handle is not None:
+            self._receive_observer.unsubscribe_handle(handle)
+        else:
+            self._receive_observer.unsubscribe(callback)
+
+    def _watch_connection(self, callback):
+        """
+        Subscribe a callback to the connection loss of the protocol.
+
+        Protocols without a ``connection_lost_observer`` are not watched.
+
+        Internal use only.
 
-    def _validate_protocol(self, protocol):
+        :param callback: Callable invoked with the exception that caused the loss.
+        :type callback: callable
+        :return: Subscription handle, or ``None`` if not watched.
+        :rtype: int | None
+        """
+        observer = getattr(self._protocol, "connection_lost_observer", None)
+        if observer is None:
+            return None
+        return observer.subscribe(callback)
+
+    def _unwatch_connection(self, handle):
+        """
+        Remove the subscription created by :meth:`_watch_connection`.
+
+        Internal use only.
+
+        :param handle: Handle returned by :meth:`_watch_connection`.
+        :type handle: int | None
+        """
+        if handle is not None:
+            self._protocol.connection_lost_observer.unsubscribe_handle(handle)
+
+    def _resolve_future(self, loop, future, data):
+        """
+        Receive observer callback for awaitable waits.
+
+        Invoked in the serial reader thread. If the received data matches the
+        expected response, ``future`` is resolved with the result of
+        :meth:`_match` in the thread running ``loop``.
+
+        Internal use only.
+
+        :param loop: Event loop owning ``future``.
+        :type loop: asyncio.AbstractEventLoop
+        :param future: Future to resolve.
+        :type future: asyncio.Future
+        :param data: Data received from the device.
+        :type data: str | ResponseMatch
+        """
+        result = self._match(data)
+        if result is not None:
+            loop.call_soon_threadsafe(_set_future_result, future, result)
+
+    def _complete_future(self, future, data):
+        """
+        Receive observer callback for non-blocking submits.
+
+        If the received data matches the expected response, ``future`` is
+        resolved with the result of :meth:`_match`.
+
+        Internal use only.
+
+        :param future: Future to resolve.
+        :type future: concurrent.futures.Future
+        :param data: Data received from the device.
+        :type data: str | ResponseMatch
+        """
+        result = self._match(data)
+        if result is not None:
+            _set_concurrent_future_result(future, result)
+
+    def _wait(self, timeout, task=None):
+        """
+        Block until the expected response is received, optionally sending a task first.
+
+        Internal use only.
+
+        :param timeout: Maximum time to wait in seconds, or ``None``.
+        :type timeout: float | None
+        :param task: Task string sent after subscribing, or ``None``.
+        :type task: str | None
+        :return: ``True`` or the :class:`ResponseMatch` if the response was
+                 received before timeout, ``False`` otherwise.
+        :rtype: bool | ResponseMatch
+        :raises ConnectionLostError: If the connection is lost while waiting.
+        """
+        if task is not None:
+            metrics = getattr(self._protocol, "metrics", None)
+            if metrics is not None:
+                return self._wait_measured(timeout, task, metrics)
+        event = threading.Event()
+        received = []
+        lost = []
+        callback = functools.partial(self._receive_message, received, event)
+        handle = self._subscribe(callback)
+        watch = self._watch_connection(functools.partial(_wake_on_loss, event, lost))
+        try:
+            if task is not None:
+                self._protocol.send(task)
+            done = event.wait(timeout)
+        finally:
+            self._unsubscribe(handle, callback)
+            self._unwatch_connection(watch)
+        if lost:
+            raise _connection_lost_error(self._response, lost[0])
+        return received[0] if done else False
+
+    def _wait_measured(self, timeout, task, metrics):
+        """
+        Send a task and wait for the response, recording its latency.
+
+        Internal use only.
+
+        :param timeout: Maximum time to wait in seconds, or ``None``.
+        :type timeout: float | None
+        :param task: Task string to send.
+        :type task: str
+        :param metrics: Collector receiving the measurement.
+        :type metrics: CommandMetrics
+        :return: ``True`` or the :class:`ResponseMatch` if the response was
+                 received before timeout, ``False`` otherwise.
+        :rtype: bool | ResponseMatch
+        :raises ConnectionLostError: If the connection is lost while waiting.
+        """
+        protocol = self._protocol
+        event = threading.Event()
+        lost = []
+        marks = {}
+
+        def callback(data):
+            result = self._match(data)
+            if result is not None and not event.is_set():
+                marks["first_byte"] = getattr(protocol, "line_started", None)
+                marks["matched"] = time.perf_counter()
+                marks["result"] = result
+                event.set()
+
+        handle = self._subscribe(callback)
+        watch = self._watch_connection(functools.partial(_wake_on_loss, event, lost))
+        try:
+            start = time.perf_counter()
+            protocol.send(task)
+            sent = time.perf_counter()
+            received = event.wait(timeout)
+            done = time.perf_counter()
+        finally:
+            self._unsubscribe(handle, callback)
+            self._unwatch_connection(watch)
+        if lost:
+            raise _connection_lost_error(self._response, lost[0])
+        name = getattr(self, "name", str(self._response))
+        if received:
+            metrics.record(name, start, sent, marks["first_byte"], marks["matched"], done)
+            return marks["result"]
+        metrics.record_timeout(name)
+        return False
+
+    async def _wait_async(self, timeout, task=None):
+        """
+        Await the expected response, optionally sending a task first.
+
+        Internal use only.
+
+        :param timeout: Maximum time to wait in seconds, or ``None``.
+        :type timeout: float | None
+        :param task: Task string sent after subscribing, or ``None``.
+        :type task: str | None
+        :return: ``True`` or the :class:`ResponseMatch` if the response was
+                 received before timeout, ``False`` otherwise.
+        :rtype: bool | ResponseMatch
+        :raises ConnectionLostError: If the connection is lost while waiting.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        callback = functools.partial(self._resolve_future, loop, future)
+        handle = self._subscribe(callback)
+        watch = self._watch_connection(
+            lambda exception: loop.call_soon_threadsafe(
+                _set_future_exception, future, _connection_lost_error(self._response, exception)
+            )
+        )
+        try:
+            if task is not None:
+                self._protocol.send(task)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._unsubscribe(handle, callback)
+            self._unwatch_connection(watch)
+
+    @staticmethod
+    def _validate_protocol(protocol):
         """
         Validate that the protocol exposes the required interface.
 
@@ -137,7 +753,8 @@ class WaitForResponse:
             )
         return protocol, observer
 
-    def _validate_signal(self, value):
+    @staticmethod
+    def _validate_signal(value):
         """
         Validate a signal value.
 
@@ -155,7 +772,25 @@ class WaitForResponse:
             )
         return value
 
-    def _validate_timeout(self, value):
+    @staticmethod
+    def _validate_response(value):
+        """
+        Validate an expected response.
+
+        :param value: Response string or pattern to validate.
+        :type value: str | ResponsePattern
+        :return: Validated response.
+        :rtype: str | ResponsePattern
+        :raises TypeError: If the value is neither a string nor a pattern.
+        """
+        if not isinstance(value, (str, ResponsePattern)):
+            raise TypeError(
+                f"Invalid response: must be of type str or ResponsePattern, got '{type(value).__name__}'"
+            )
+        return value
+
+    @staticmethod
+    def _validate_timeout(value):
         """
         Validate and normalize a timeout value.
 
@@ -184,10 +819,12 @@ class WaitForResponse:
 
         :param timeout: Maximum time to wait in seconds.
         :type timeout: float | None
-        :return: ``True`` if the response was received before timeout,
-                 ``False`` otherwise.
-        :rtype: bool
+        :return: ``True`` (the :class:`ResponseMatch` for a pattern response)
+                 if the response was received before timeout, ``False``
+                 otherwise.
+        :rtype: bool | ResponseMatch
         :raises ValueError: If the expected response is not set.
+        :raises ConnectionLostError: If the connection is lost while waiting.
         """
         if timeout is not None:
             timeout = self._validate_timeout(timeout)
@@ -195,13 +832,7 @@ class WaitForResponse:
             timeout = self._timeout
         if self._response is None:
             raise ValueError(f"Response is not set yet, got '{self._response}'")
-        self._event.clear()
-        self._receive_observer.subscribe(self._receive_message)
-        try:
-            return self._event.wait(timeout)
-        finally:
-            self._receive_observer.unsubscribe(self._receive_message)
-            self._event.clear()
+        return self._wait(timeout)
 
 
 class SubmitTask(WaitForResponse):
@@ -212,23 +843,38 @@ class SubmitTask(WaitForResponse):
     transmit a task via the protocol before waiting for the response.
 
     The instance itself is callable.
+    If the protocol has a :attr:`DeviceConnection.metrics` collector
+    assigned, blocking calls record their latency under :attr:`name`.
 
     :param protocol: Active device communication protocol.
     :type protocol: :class:`DeviceConnection`
-    :param response: Expected response string.
-    :type response: str
+    :param response: Expected response string or pattern.
+    :type response: str | ResponsePattern
     :param task: Default task string to send.
     :type task: str
     :param timeout: Default timeout in seconds. If ``None``, waits indefinitely.
     :type timeout: float | None
+    :param name: Task type used for metrics. Defaults to the response string
+                 or template.
+    :type name: str | None
     """
-    def __init__(self, protocol, response, task=None, timeout=None):
+    def __init__(self, protocol, response, task=None, timeout=None, name=None):
         if task is not None:
             self._task = self._validate_signal(task)
         else:
             self._task = task
+        self._name = name
         super().__init__(protocol, response, timeout)
 
+    @property
+    def name(self):
+        """
+        Task type used for metrics.
+
+        :rtype: str
+        """
+        return self._name if self._name is not None else str(self._response)
+
     @property
     def task(self):
         """
@@ -249,22 +895,151 @@ class SubmitTask(WaitForResponse):
         """
         self._task = self._validate_signal(value)
 
-    def __call__(self, timeout=None, wait=False):
+    def _resolve_task(self, task):
+        """
+        Return the task to send for a single call.
+
+        Internal use only.
+
+        :param task: Task given for this call, or ``None`` for the default task.
+        :type task: str | None
+        :return: Validated task string.
+        :rtype: str
+        :raises TypeError: If ``task`` is not a string.
+        :raises ValueError: If neither ``task`` nor the default task is set.
+        """
+        if task is None:
+            task = self._task
+            if task is None:
+                raise ValueError(f"Task is not set, got '{task}'")
+            return task
+        return self._validate_signal(task)
+
+    def submit(self, timeout=None, task=None):
+        """
+        Send the task to the device without blocking.
+
+        The waiter is registered before the task is sent. The returned future
+        resolves to ``True`` (the :class:`ResponseMatch` for a pattern
+        response) once the expected response is received, or to ``False``
+        when the timeout expires first. If the connection is lost
+        first, the future fails with :class:`ConnectionLostError`. Cancelling
+        the future stops waiting for the response.
+
+        If ``timeout`` is ``None``, the instance default timeout is used.
+
+        :param timeout: Maximum time to wait for the response in seconds.
+        :type timeout: float | None
+        :param task: Task string sent instead of the default :attr:`task`.
+        :type task: str | None
+        :return: Future resolving to the result of the wait.
+        :rtype: concurrent.futures.Future
+        :raises ValueError: If the task is not set.
+        """
+        task = self._resolve_task(task)
+        if timeout is not None:
+            timeout = self._validate_timeout(timeout)
+        else:
+            timeout = self._timeout
+        future = concurrent.futures.Future()
+        callback = functools.partial(self._complete_future, future)
+        handle = self._subscribe(callback)
+        watch = self._watch_connection(
+            lambda exception: _set_concurrent_future_exception(
+                future, _connection_lost_error(self._response, exception)
+            )
+        )
+
+        def release(_):
+            self._unsubscribe(handle, callback)
+            self._unwatch_connection(watch)
+
+        future.add_done_callback(release)
+        try:
+            self._protocol.send(task)
+        except Exception:
+            future.cancel()
+            raise
+        if timeout is not None:
+            _timeout_scheduler.schedule_future_timeout(future, timeout)
+        return future
+
+    def run_sequence(self, tasks, timeout=None, before_task=None, after_task=None):
+        """
+        Send several tasks one after another, waiting for each response.
+
+        All tasks are validated before the first one is sent, and a single
+        subscription is used for the whole sequence. The sequence stops at the
+        first task whose response is not received within the timeout.
+
+        :param tasks: Task strings to send in order.
+        :type tasks: Iterable[str]
+        :param timeout: Maximum time to wait for each response in seconds.
+                        If ``None``, the instance default timeout is used.
+        :type timeout: float | None
+        :param before_task: Optional callable invoked with the task index
+                            before the task is sent.
+        :type before_task: callable | None
+        :param after_task: Optional callable invoked with the task index
+                           after the response was received.
+        :type after_task: callable | None
+        :return: Number of tasks whose response was received.
+        :rtype: int
+        :raises TypeError: If a task is not a string.
+        :raises ConnectionLostError: If the connection is lost during the sequence.
+        """
+        tasks = [self._validate_signal(task) for task in tasks]
+        if timeout is not None:
+            timeout = self._validate_timeout(timeout)
+        else:
+            timeout = self._timeout
+        event = threading.Event()
+        results = []
+        lost = []
+        callback = functools.partial(self._receive_message, results, event)
+        handle = self._subscribe(callback)
+        watch = self._watch_connection(functools.partial(_wake_on_loss, event, lost))
+        send = self._protocol.send
+        try:
+            for index, task in enumerate(tasks):
+                if before_task is not None:
+                    before_task(index)
+                event.clear()
+                results.clear()
+                send(task)
+                received = event.wait(timeout)
+                if lost:
+                    raise _connection_lost_error(self._response, lost[0])
+                if not received:
+                    return index
+                if after_task is not None:
+                    after_task(index)
+        finally:
+            self._unsubscribe(handle, callback)
+            self._unwatch_connection(watch)
+        return len(tasks)
+
+    def __call__(self, timeout=None, wait=False, task=None):
         """
         Send the task to the device and optionally wait for a response.
 
+        Passing ``task`` sends it for this call only, without changing the
+        default :attr:`task`, which keeps concurrent calls independent.
+
         :param timeout: Maximum time to wait for the response in seconds.
         :type timeout: float | None
         :param wait: Whether to wait for the response after sending.
         :type wait: bool
-        :return: ``True`` if the response was received before timeout,
-                 ``False`` if timeout occurs, ``None`` if ``wait`` is False.
-        :rtype: bool | None
+        :param task: Task string sent instead of the default :attr:`task`.
+        :type task: str | None
+        :return: ``True`` (the :class:`ResponseMatch` for a pattern response)
+                 if the response was received before timeout, ``False`` if
+                 timeout occurs, ``None`` if ``wait`` is False.
+        :rtype: bool | ResponseMatch | None
         :raises ValueError: If the task is not set.
+        :raises ConnectionLostError: If the connection is lost while waiting.
         """
-        task = self._task
-        if task is None:
-            raise ValueError(f"Task is not set, got '{task}'")
+        task = self._resolve_task(task)
         if not wait:
             self._protocol.send(task)
             return
@@ -272,11 +1047,755 @@ class SubmitTask(WaitForResponse):
             timeout = self._validate_timeout(timeout)
         else:
             timeout = self._timeout
-        self._event.clear()
-        self._receive_observer.subscribe(self._receive_message)
+        return self._wait(timeout, task)
+
+
+class AsyncWaitForResponse(WaitForResponse):
+    """
+    Await a specific response from a connected device.
+
+    Awaitable counterpart of :class:`WaitForResponse` for use within an
+    :mod:`asyncio` event loop. Calling the instance returns a coroutine that
+    completes when the expected response is received or a timeout occurs.
+    Each call waits on its own future, so concurrent waits on the same
+    instance do not interfere.
+
+    :param protocol: Active device communication protocol.
+    :type protocol: :class:`DeviceConnection`
+    :param response: Expected response string to wait for.
+    :type response: str
+    :param timeout: Default timeout in seconds. If ``None``, waits indefinitely.
+    :type timeout: float | None
+    """
+
+    def __call__(self, timeout=None):
+        """
+        Wait for the expected response without blocking the event loop.
+
+        If ``timeout`` is ``None``, the instance default timeout is used.
+
+        :param timeout: Maximum time to wait in seconds.
+        :type timeout: float | None
+        :return: Coroutine resolving to ``True`` (the :class:`ResponseMatch`
+                 for a pattern response) if the response was received before
+                 timeout, ``False`` otherwise.
+        :rtype: Coroutine[Any, Any, bool | ResponseMatch]
+        :raises ValueError: If the expected response is not set.
+        :raises ConnectionLostError: When awaited, if the connection is lost while waiting.
+        """
+        if timeout is not None:
+            timeout = self._validate_timeout(timeout)
+        else:
+            timeout = self._timeout
+        if self._response is None:
+            raise ValueError(f"Response is not set yet, got '{self._response}'")
+        return self._wait_async(timeout)
+
+
+class AsyncSubmitTask(SubmitTask):
+    """
+    Send a task to the device and optionally await a response.
+
+    Awaitable counterpart of :class:`SubmitTask` for use within an
+    :mod:`asyncio` event loop. The task string is read when the instance is
+    called, so the task may be changed before the returned coroutine is
+    awaited.
+
+    :param protocol: Active device communication protocol.
+    :type protocol: :class:`DeviceConnection`
+    :param response: Expected response string.
+    :type response: str
+    :param task: Default task string to send.
+    :type task: str
+    :param timeout: Default timeout in seconds. If ``None``, waits indefinitely.
+    :type timeout: float | None
+    """
+
+    def __call__(self, timeout=None, wait=False, task=None):
+        """
+        Send the task to the device and optionally await the response.
+
+        :param timeout: Maximum time to wait for the response in seconds.
+        :type timeout: float | None
+        :param wait: Whether to wait for the response after sending.
+        :type wait: bool
+        :param task: Task string sent instead of the default :attr:`task`.
+        :type task: str | None
+        :return: Coroutine resolving to ``True`` (the :class:`ResponseMatch`
+                 for a pattern response) if the response was received before
+                 timeout, ``False`` if timeout occurs, ``None`` if ``wait``
+                 is False.
+        :rtype: Coroutine[Any, Any, bool | ResponseMatch | None]
+        :raises ValueError: If the task is not set.
+        :raises ConnectionLostError: When awaited, if the connection is lost while waiting.
+        """
+        task = self._resolve_task(task)
+        if not wait:
+            return self._send_async(task)
+        if timeout is not None:
+            timeout = self._validate_timeout(timeout)
+        else:
+            timeout = self._timeout
+        return self._wait_async(timeout, task)
+
+    def submit(self, timeout=None, task=None):
+        """
+        Send the task immediately and return a future for the response.
+
+        Awaitable counterpart of :meth:`SubmitTask.submit`, which has to be
+        called within a running :mod:`asyncio` event loop. Cancelling the
+        future stops waiting for the response.
+
+        :param timeout: Maximum time to wait for the response in seconds.
+        :type timeout: float | None
+        :param task: Task string sent instead of the default :attr:`task`.
+        :type task: str | None
+        :return: Future resolving to the result of the wait.
+        :rtype: asyncio.Future
+        :raises ValueError: If the task is not set.
+        :raises RuntimeError: If no event loop is running.
+        """
+        loop = asyncio.get_running_loop()
+        return asyncio.wrap_future(super().submit(timeout, task), loop=loop)
+
+    def run_sequence(self, tasks, timeout=None, before_task=None, after_task=None):
+        """
+        Send several tasks one after another, awaiting each response.
+
+        Awaitable counterpart of :meth:`SubmitTask.run_sequence`. The tasks
+        are validated when called.
+
+        :param tasks: Task strings to send in order.
+        :type tasks: Iterable[str]
+        :param timeout: Maximum time to wait for each response in seconds.
+                        If ``None``, the instance default timeout is used.
+        :type timeout: float | None
+        :param before_task: Optional callable invoked with the task index
+                            before the task is sent.
+        :type before_task: callable | None
+        :param after_task: Optional callable invoked with the task index
+                           after the response was received.
+        :type after_task: callable | None
+        :return: Coroutine resolving to the number of tasks whose response
+                 was received.
+        :rtype: Coroutine[Any, Any, int]
+        :raises TypeError: If a task is not a string.
+        :raises ConnectionLostError: When awaited, if the connection is lost during the sequence.
+        """
+        tasks = [self._validate_signal(task) for task in tasks]
+        if timeout is not None:
+            timeout = self._validate_timeout(timeout)
+        else:
+            timeout = self._timeout
+        return self._run_sequence_async(tasks, timeout, before_task, after_task)
+
+    async def _run_sequence_async(self, tasks, timeout, before_task, after_task):
+        """
+        Run a validated task sequence with a single subscription.
+
+        Internal use only.
+        """
+        loop = asyncio.get_running_loop()
+        current = [None]
+
+        def receive(data):
+            future = current[0]
+            if future is None:
+                return
+            result = self._match(data)
+            if result is not None:
+                loop.call_soon_threadsafe(_set_future_result, future, result)
+
+        def lose(exception):
+            future = current[0]
+            if future is not None:
+                loop.call_soon_threadsafe(
+                    _set_future_exception, future, _connection_lost_error(self._response, exception)
+                )
+
+        handle = self._subscribe(receive)
+        watch = self._watch_connection(lose)
+        send = self._protocol.send
         try:
-            self._protocol.send(task)
-            return self._event.wait(timeout)
+            for index, task in enumerate(tasks):
+                if before_task is not None:
+                    before_task(index)
+                future = current[0] = loop.create_future()
+                send(task)
+                try:
+                    if not await asyncio.wait_for(future, timeout):
+                        return index
+                except asyncio.TimeoutError:
+                    return index
+                if after_task is not None:
+                    after_task(index)
         finally:
-            self._receive_observer.unsubscribe(self._receive_message)
-            self._event.clear()
+            self._unsubscribe(handle, receive)
+            self._unwatch_connection(watch)
+        return len(tasks)
+
+    async def _send_async(self, task):
+        """
+        Send a task without waiting for the response.
+
+        Internal use only.
+
+        :param task: Task string to send.
+        :type task: str
+        """
+        self._protocol.send(task)
+
+
+def _wake_on_loss(event, lost, exception):
+    """
+    Connection lost callback of blocking waits.
+
+    Records the loss in ``lost`` and wakes the waiting thread, unless the
+    response has already been received.
+
+    Internal use only.
+    """
+    if not event.is_set():
+        lost.append(exception)
+        event.set()
+
+
+def _connection_lost_error(response, exception):
+    """
+    Create the error raised by a wait interrupted by connection loss.
+
+    Internal use only.
+
+    :param response: Response the wait was waiting for.
+    :type response: str
+    :param exception: Exception that caused the loss, or ``None`` if the
+                      connection was closed.
+    :type exception: Exception | None
+    :rtype: ConnectionLostError
+    """
+    reason = "lost" if exception is not None else "closed"
+    error = ConnectionLostError(f"Connection {reason} while waiting for '{response}'")
+    error.__cause__ = exception
+    return error
+
+
+def _register_response(protocol, response):
+    """
+    Announce an expected response string to the protocol, if supported.
+
+    Registered responses are matched as bytes by :class:`DeviceConnection`
+    without decoding each received line. Patterns are not registered.
+
+    Internal use only.
+    """
+    if not isinstance(response, str):
+        return
+    register = getattr(protocol, "register_responses", None)
+    if register is not None:
+        register(response)
+
+
+class _PatternRouter:
+    """
+    Dispatch received lines to the pattern waits of one protocol.
+
+    Holds a :class:`ResponseMatcher` with the patterns of all pending waits
+    and is subscribed to the protocol's ``match_observer`` while at least
+    one pattern is waited for. :class:`DeviceConnection` notifies that
+    observer in the reader thread, together with the keyed subscribers, so
+    pattern waits are never deferred to a dispatcher. Protocols without a
+    ``match_observer`` are served through a plain receive subscription.
+    Lines matching no pending pattern are rejected in a single pass;
+    otherwise the callbacks of every matching pattern are invoked with its
+    :class:`ResponseMatch`, so overlapping waits all complete. Callbacks are
+    kept in snapshot tuples replaced under a lock, like in :class:`Observer`.
+
+    Internal use only.
+    """
+
+    def __init__(self, observer):
+        self._observer = observer
+        self._matcher = ResponseMatcher()
+        self._lock = threading.Lock()
+        self._handles = itertools.count(1)
+        self._patterns = {}
+        self._callbacks = {}
+        self._handle = None
+
+    def subscribe(self, pattern, callback):
+        """
+        Invoke ``callback`` with the match of every line classified as ``pattern``.
+
+        :return: Subscription handle.
+        :rtype: int
+        """
+        with self._lock:
+            handle = next(self._handles)
+            callbacks = dict(self._callbacks)
+            callbacks[pattern] = callbacks.get(pattern, ()) + ((handle, callback),)
+            self._callbacks = callbacks
+            self._patterns[handle] = pattern
+            self._matcher.add(pattern)
+            if len(self._patterns) == 1:
+                self._handle = self._observer.subscribe(self._receive)
+        return handle
+
+    def unsubscribe(self, handle):
+        """
+        Remove a subscription created by :meth:`subscribe`.
+        """
+        with self._lock:
+            pattern = self._patterns.pop(handle, None)
+            if pattern is None:
+                return
+            callbacks = dict(self._callbacks)
+            remaining = tuple(entry for entry in callbacks[pattern] if entry[0] != handle)
+            if remaining:
+                callbacks[pattern] = remaining
+            else:
+                del callbacks[pattern]
+                self._matcher.remove(pattern)
+            self._callbacks = callbacks
+            if not self._patterns:
+                if self._handle is not None and hasattr(self._observer, "unsubscribe_handle"):
+                    self._observer.unsubscribe_handle(self._handle)
+                else:
+                    self._observer.unsubscribe(self._receive)
+                self._handle = None
+
+    def _receive(self, data):
+        """
+        Receive observer callback classifying a line.
+        """
+        callbacks = self._callbacks
+        for match in self._matcher.match_all(data):
+            for _, callback in callbacks.get(match.pattern, ()):
+                callback(match)
+
+
+_pattern_routers = weakref.WeakKeyDictionary()
+_pattern_routers_lock = threading.Lock()
+
+
+def _pattern_router(protocol):
+    """
+    Return the pattern router of a protocol, creating it on first use.
+
+    Internal use only.
+    """
+    with _pattern_routers_lock:
+        router = _pattern_routers.get(protocol)
+        if router is None:
+            observer = getattr(protocol, "match_observer", None)
+            if not isinstance(observer, Observer):
+                observer = protocol.receive_observer
+            router = _pattern_routers[protocol] = _PatternRouter(observer)
+        return router
+
+
+def _set_future_result(future, result):
+    """
+    Resolve a future unless it is already done (e.g. cancelled by a timeout).
+
+    Internal use only.
+
+    :param future: Future to resolve.
+    :type future: asyncio.Future
+    :param result: Result to set.
+    """
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_future_exception(future, exception):
+    """
+    Fail a future unless it is already done.
+
+    Internal use only.
+
+    :param future: Future to fail.
+    :type future: asyncio.Future
+    :param exception: Exception to set.
+    :type exception: Exception
+    """
+    if not future.done():
+        future.set_exception(exception)
+
+
+class CommandPipeline:
+    """
+    Send tasks back to back and correlate their responses in order.
+
+    Several controller tasks share the same response string, e.g.
+    ``rot_cw``, ``rot_ccw`` and ``stop_rot`` are all answered with
+    ``rot_stopped``. The pipeline keeps a first-in-first-out queue of pending
+    futures per response string: every received response resolves the oldest
+    pending future waiting for it. Tasks can therefore be submitted without
+    waiting for the previous response, keeping the controller busy.
+
+    A future whose timeout expires resolves to ``False`` and gives up its
+    place in the queue, as does a cancelled future, so a lost reply does not
+    shift the responses of later tasks. If the connection is lost, all
+    pending futures fail with :class:`ConnectionLostError` at once and the
+    queues are cleared.
+
+    The pipeline can be used as a context manager, which calls :meth:`close`
+    on exit.
+
+    :param protocol: Active device communication protocol.
+    :type protocol: :class:`DeviceConnection`
+    :param timeout: Default timeout in seconds. If ``None``, waits indefinitely.
+    :type timeout: float | None
+    """
+
+    def __init__(self, protocol, timeout=None):
+        self._protocol, self._receive_observer = WaitForResponse._validate_protocol(protocol)
+        if timeout is not None:
+            timeout = WaitForResponse._validate_timeout(timeout)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._pending = {}
+        self._handles = {}
+        observer = getattr(self._protocol, "connection_lost_observer", None)
+        self._watch = observer.subscribe(self._connection_lost) if observer is not None else None
+
+    @property
+    def pending(self):
+        """
+        Number of submitted tasks whose response has not been received yet.
+
+        Tasks whose futures timed out or were cancelled are not included.
+
+        :rtype: int
+        """
+        with self._lock:
+            return sum(len(queue) for queue in self._pending.values())
+
+    def submit(self, task, response, timeout=None):
+        """
+        Send a task and return a future for its response.
+
+        The task is sent immediately, without waiting for responses of
+        previously submitted tasks. The queue slot is reserved before the
+        task is sent, but the send itself does not hold the lock used to
+        match received responses.
+
+        :param task: Task string to send.
+        :type task: str
+        :param response: Expected response string.
+        :type response: str
+        :param timeout: Maximum time to wait for the response in seconds.
+                        If ``None``, the pipeline default timeout is used.
+        :type timeout: float | None
+        :return: Future resolving to ``True`` if the response was received
+                 before timeout, ``False`` otherwise. Fails with
+                 :class:`ConnectionLostError` if the connection is lost.
+        :rtype: concurrent.futures.Future
+        :raises TypeError: If task or response are not strings.
+        """
+        task = WaitForResponse._validate_signal(task)
+        response = WaitForResponse._validate_signal(response)
+        if timeout is not None:
+            timeout = WaitForResponse._validate_timeout(timeout)
+        else:
+            timeout = self._timeout
+        future = concurrent.futures.Future()
+        with self._send_lock:
+            with self._lock:
+                queue = self._pending.get(response)
+                if queue is None:
+                    queue = self._pending[response] = collections.deque()
+                    self._subscribe(response)
+                queue.append(future)
+            try:
+                self._protocol.send(task)
+            except Exception:
+                self._discard(response, future)
+                raise
+        future.add_done_callback(functools.partial(self._discard, response))
+        if timeout is not None:
+            _timeout_scheduler.schedule_future_timeout(future, timeout)
+        return future
+
+    def submit_all(self, tasks, timeout=None):
+        """
+        Send several tasks back to back.
+
+        :param tasks: Iterable of ``(task, response)`` string pairs.
+        :type tasks: Iterable[tuple[str, str]]
+        :param timeout: Maximum time to wait for each response in seconds.
+        :type timeout: float | None
+        :return: One future per task, in submission order.
+        :rtype: list[concurrent.futures.Future]
+        """
+        return [self.submit(task, response, timeout) for task, response in tasks]
+
+    def close(self):
+        """
+        Stop correlating responses.
+
+        Unsubscribes from the receive observer and cancels all futures that
+        are still pending.
+        """
+        with self._lock:
+            pending = [future for queue in self._pending.values() for future in queue]
+            self._pending.clear()
+            handles = self._handles
+            self._handles = {}
+            watch, self._watch = self._watch, None
+        if watch is not None:
+            self._protocol.connection_lost_observer.unsubscribe_handle(watch)
+        for response, handle in handles.items():
+            if handle is not None:
+                self._receive_observer.unsubscribe_handle(handle)
+            else:
+                self._receive_observer.unsubscribe(self._receive_message)
+        for future in pending:
+            future.cancel()
+
+    def _subscribe(self, response):
+        """
+        Subscribe to a response string.
+
+        Uses a keyed subscription if the observer supports it, otherwise a
+        single plain subscription shared by all response strings. Must be
+        called with the lock held.
+
+        Internal use only.
+
+        :param response: Response string to subscribe to.
+        :type response: str
+        """
+        _register_response(self._protocol, response)
+        if hasattr(self._receive_observer, "subscribe_key"):
+            self._handles[response] = self._receive_observer.subscribe_key(
+                response, self._receive_message
+            )
+        elif None not in self._handles.values():
+            self._receive_observer.subscribe(self._receive_message)
+            self._handles[response] = None
+
+    def _discard(self, response, future):
+        """
+        Give up the queue slot of a future that is done without a response.
+
+        Used as done callback, so futures resolved by a timeout or cancelled
+        no longer take the next response. Futures resolved by a response
+        have already left the queue.
+
+        Internal use only.
+
+        :param response: Response string the future waits for.
+        :type response: str
+        :param future: Future to remove.
+        :type future: concurrent.futures.Future
+        """
+        with self._lock:
+            queue = self._pending.get(response)
+            if queue:
+                try:
+                    queue.remove(future)
+                except ValueError:
+                    pass
+
+    def _connection_lost(self, exception):
+        """
+        Connection lost observer callback.
+
+        Fails all pending futures with :class:`ConnectionLostError`, since
+        their responses will not arrive anymore.
+
+        Internal use only.
+
+        :param exception: Exception that caused the loss, or ``None``.
+        :type exception: Exception | None
+        """
+        with self._lock:
+            pending = [
+                (response, future)
+                for response, queue in self._pending.items()
+                for future in queue
+            ]
+            for queue in self._pending.values():
+                queue.clear()
+        for response, future in pending:
+            _set_concurrent_future_exception(future, _connection_lost_error(response, exception))
+
+    def _receive_message(self, data):
+        """
+        Receive observer callback.
+
+        Resolves the oldest pending future waiting for ``data``.
+
+        Internal use only.
+
+        :param data: Data received from the device.
+        :type data: str
+        """
+        with self._lock:
+            queue = self._pending.get(data)
+            if not queue:
+                return
+            future = queue.popleft()
+        _set_concurrent_future_result(future, True)
+
+    def __enter__(self):
+        """
+        Enter context manager.
+
+        :return: This instance.
+        :rtype: CommandPipeline
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit context manager and close the pipeline.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        self.close()
+        return False
+
+
+def _set_concurrent_future_result(future, result):
+    """
+    Resolve a :class:`concurrent.futures.Future` unless it is already done.
+
+    Internal use only.
+
+    :param future: Future to resolve.
+    :type future: concurrent.futures.Future
+    :param result: Result to set.
+    """
+    if future.done():
+        return
+    try:
+        future.set_result(result)
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+def _set_concurrent_future_exception(future, exception):
+    """
+    Fail a :class:`concurrent.futures.Future` unless it is already done.
+
+    Internal use only.
+
+    :param future: Future to fail.
+    :type future: concurrent.futures.Future
+    :param exception: Exception to set.
+    :type exception: Exception
+    """
+    if future.done():
+        return
+    try:
+        future.set_exception(exception)
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+class _TimeoutScheduler:
+    """
+    Run callbacks after a delay on a single shared daemon thread.
+
+    Used to expire futures returned by :meth:`SubmitTask.submit` without
+    starting a timer thread per future. The thread is started on first use.
+
+    Cancelled entries stay in the heap until they are due, but the heap is
+    compacted once more than half of its entries are cancelled, so futures
+    completed long before their timeout do not accumulate.
+
+    Internal use only.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._deadlines = []
+        self._cancelled = 0
+        self._sequence = itertools.count()
+        self._thread = None
+
+    def schedule(self, delay, callback):
+        """
+        Schedule ``callback`` to run after ``delay`` seconds.
+
+        :param delay: Delay in seconds.
+        :type delay: float
+        :param callback: Callable invoked without arguments.
+        :type callback: callable
+        :return: Entry to pass to :meth:`cancel`.
+        :rtype: list
+        """
+        deadline = time.monotonic() + delay
+        with self._condition:
+            entry = [deadline, next(self._sequence), callback]
+            heapq.heappush(self._deadlines, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="imcntr-timeouts", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        return entry
+
+    def cancel(self, entry):
+        """
+        Cancel a scheduled callback. Entries that already ran are ignored.
+
+        :param entry: Entry returned by :meth:`schedule`.
+        :type entry: list
+        """
+        with self._condition:
+            if entry[2] is None:
+                return
+            entry[2] = None
+            self._cancelled += 1
+            if self._cancelled * 2 > len(self._deadlines):
+                self._deadlines = [item for item in self._deadlines if item[2] is not None]
+                heapq.heapify(self._deadlines)
+                self._cancelled = 0
+
+    def schedule_future_timeout(self, future, delay):
+        """
+        Resolve ``future`` with ``False`` after ``delay`` seconds, unless it
+        completes first.
+
+        :param future: Future to expire.
+        :type future: concurrent.futures.Future
+        :param delay: Timeout in seconds.
+        :type delay: float
+        """
+        entry = self.schedule(delay, functools.partial(_set_concurrent_future_result, future, False))
+        future.add_done_callback(lambda _: self.cancel(entry))
+
+    def _run(self):
+        """
+        Scheduler thread main loop.
+        """
+        while True:
+            with self._condition:
+                while True:
+                    if not self._deadlines:
+                        self._condition.wait()
+                        continue
+                    entry = self._deadlines[0]
+                    if entry[2] is None:
+                        heapq.heappop(self._deadlines)
+                        self._cancelled -= 1
+                        continue
+                    remaining = entry[0] - time.monotonic()
+                    if remaining <= 0:
+                        heapq.heappop(self._deadlines)
+                        callback, entry[2] = entry[2], None
+                        break
+                    self._condition.wait(remaining)
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+_timeout_scheduler = _TimeoutScheduler()
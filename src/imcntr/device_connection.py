@@ -3,16 +3,34 @@ Serial communication utilities based on :mod:`serial` (pySerial).
 
 This module provides a high-level interface for line-based serial communication,
 including threaded reading, observer-based receive handling, and extensible
-callback hooks.
+callback hooks. :class:`AsyncDeviceConnection` adds coroutine-based connection
+handling for use within an :mod:`asyncio` event loop.
 
 See also:
     :class:`serial.Serial`
     :class:`serial.threaded.ReaderThread`
 """
 
+import asyncio
+import collections
+import concurrent.futures
+import threading
+import time
 import serial
 import serial.threaded
 from .response_observer import Observer
+from .stream import LineStream, DROP_OLDEST
+from .trace import SENT, RECEIVED
+
+class ConnectionLostError(RuntimeError):
+    """
+    Raised by pending waits when the connection is lost or closed.
+
+    Distinguishes a lost connection from a timeout, which is reported as
+    ``False``. The exception that caused the loss, if any, is available as
+    ``__cause__``.
+    """
+
 
 class _SerialLineHandler(serial.threaded.LineReader):
     """
@@ -21,9 +39,17 @@ class _SerialLineHandler(serial.threaded.LineReader):
     This class subclasses :class:`serial.threaded.LineReader` and forwards
     received lines and connection-loss events to a receiver object.
 
+    Lines are framed directly in the received chunks. Only a partial line
+    at the end of a chunk is copied into :attr:`buffer`. Lines found in
+    :attr:`responses` are forwarded as the stored string without decoding,
+    all other lines are decoded.
+
     The receiver must implement:
         - :meth:`receive`
         - :meth:`connection_lost`
+
+    If :attr:`timestamps` is enabled, the arrival time of the first byte of
+    the line currently being handled is available as :attr:`line_started`.
     """
 
     def __init__(self):
@@ -32,6 +58,9 @@ class _SerialLineHandler(serial.threaded.LineReader):
         """
         super().__init__()
         self._receiver = None
+        self.timestamps = False
+        self.line_started = None
+        self.responses = {}
 
     @property
     def receiver(self):
@@ -69,6 +98,60 @@ class _SerialLineHandler(serial.threaded.LineReader):
         if self._receiver is not None:
             self._receiver.connection_lost(exc)
 
+    def data_received(self, data):
+        """
+        Called automatically with newly received bytes.
+
+        Splits the data into lines and, if :attr:`timestamps` is enabled,
+        records the arrival time of each line's first byte in
+        :attr:`line_started`.
+
+        :param data: Received bytes.
+        :type data: bytes
+        """
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        now = time.perf_counter() if self.timestamps else None
+        terminator = self.TERMINATOR
+        buffer = self.buffer
+        start = 0
+        if buffer:
+            searched = len(buffer)
+            buffer.extend(data)
+            end = buffer.find(terminator, max(0, searched - len(terminator) + 1))
+            if end < 0:
+                return
+            packet = bytes(buffer[:end])
+            buffer.clear()
+            start = end + len(terminator) - searched
+            self.handle_packet(memoryview(packet))
+        view = memoryview(data)
+        while True:
+            if now is not None:
+                self.line_started = now
+            end = data.find(terminator, start)
+            if end < 0:
+                break
+            self.handle_packet(view[start:end])
+            start = end + len(terminator)
+        if start < len(data):
+            buffer.extend(view[start:])
+
+    def handle_packet(self, packet):
+        """
+        Called automatically with each received line without terminator.
+
+        Looks the line up in :attr:`responses` and decodes it only if it is
+        not found.
+
+        :param packet: Received line.
+        :type packet: memoryview
+        """
+        line = self.responses.get(packet)
+        if line is None:
+            line = str(packet, self.ENCODING, self.UNICODE_HANDLING)
+        self.handle_line(line)
+
     def handle_line(self, line):
         """
         Called automatically when a complete line is received.
@@ -82,6 +165,88 @@ class _SerialLineHandler(serial.threaded.LineReader):
             self._receiver.receive(line)
 
 
+class _SerialWriter:
+    """
+    Writer thread draining a send queue.
+
+    All lines queued while a write is in progress are joined and written
+    with a single call of ``write``. Each queued line has a
+    :class:`concurrent.futures.Future` that completes once the batch has
+    been written, or fails with :class:`RuntimeError` if writing fails.
+    Cancelled lines are not written.
+
+    Internal use only.
+
+    :param write: Function writing bytes, e.g. :meth:`ReaderThread.write`.
+    :type write: Callable[[bytes], object]
+    """
+
+    def __init__(self, write):
+        self._write = write
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="imcntr-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, payload):
+        """
+        Queue bytes for writing.
+
+        :param payload: Encoded line including terminator.
+        :type payload: bytes
+        :return: Future completed once the bytes have been written.
+        :rtype: concurrent.futures.Future
+        :raises RuntimeError: If the writer is closed.
+        """
+        future = concurrent.futures.Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Not connected to serial port")
+            self._queue.append((payload, future))
+            self._condition.notify()
+        return future
+
+    def close(self):
+        """
+        Write all queued lines and stop the writer thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        """
+        Writer thread main loop.
+        """
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                batch = [
+                    (payload, future)
+                    for payload, future in self._queue
+                    if future.set_running_or_notify_cancel()
+                ]
+                self._queue.clear()
+            if not batch:
+                continue
+            try:
+                self._write(b"".join(payload for payload, _ in batch))
+            except Exception as e:
+                error = RuntimeError("Writing data to serial port failed!")
+                error.__cause__ = e
+                for _, future in batch:
+                    future.set_exception(error)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+
+
 class DeviceConnection:
     """
     Manages a serial device connection using pySerial and a reader thread.
@@ -91,23 +256,101 @@ class DeviceConnection:
         - Threaded I/O (:class:`serial.threaded.ReaderThread`)
 
     It also supports usage as a context manager.
+
+    Serial parameters that are not given keep the pySerial defaults
+    (9600 baud, 8N1, blocking reads). The port may also be a pySerial URL
+    such as ``'socket://localhost:7777'`` or ``'loop://'``, which is opened
+    via :func:`serial.serial_for_url`.
+
+    With ``write_queue`` enabled, :meth:`send` queues lines for a dedicated
+    writer thread instead of writing them in the calling thread. Lines
+    queued while a write is in progress are coalesced into a single write.
+
+    :meth:`lines` and :meth:`alines` return iterators over the received
+    lines, each backed by its own bounded buffer.
     """
 
-    def __init__(self, port=None):
+    def __init__(
+        self,
+        port=None,
+        baudrate=None,
+        bytesize=None,
+        parity=None,
+        stopbits=None,
+        timeout=None,
+        write_timeout=None,
+        inter_byte_timeout=None,
+        rx_buffer_size=None,
+        tx_buffer_size=None,
+        write_queue=False,
+        hub=None,
+    ):
         """
         Initialize the device connection.
 
-        :param port: Serial port identifier (e.g. ``'COM3'`` or ``'/dev/ttyUSB0'``).
+        :param port: Serial port identifier (e.g. ``'COM3'`` or ``'/dev/ttyUSB0'``)
+                     or pySerial URL.
         :type port: str | None
+        :param baudrate: Baud rate, e.g. ``115200``.
+        :type baudrate: int | None
+        :param bytesize: Number of data bits, e.g. :data:`serial.EIGHTBITS`.
+        :type bytesize: int | None
+        :param parity: Parity checking, e.g. :data:`serial.PARITY_NONE`.
+        :type parity: str | None
+        :param stopbits: Number of stop bits, e.g. :data:`serial.STOPBITS_ONE`.
+        :type stopbits: float | None
+        :param timeout: Read timeout in seconds.
+        :type timeout: float | None
+        :param write_timeout: Write timeout in seconds.
+        :type write_timeout: float | None
+        :param inter_byte_timeout: Inter-character timeout in seconds.
+        :type inter_byte_timeout: float | None
+        :param rx_buffer_size: Receive buffer size of the OS driver in bytes.
+                               Only supported on some platforms (e.g. Windows).
+        :type rx_buffer_size: int | None
+        :param tx_buffer_size: Transmit buffer size of the OS driver in bytes.
+                               Only supported on some platforms (e.g. Windows).
+        :type tx_buffer_size: int | None
+        :param write_queue: Whether to send via a writer thread with a send queue.
+        :type write_queue: bool
+        :param hub: Hub reading the port on its shared thread instead of a
+                    reader thread per connection.
+        :type hub: ConnectionHub | None
         """
         self._port = None
         if port is not None:
             self.port = port
+        settings = {
+            "baudrate": baudrate,
+            "bytesize": bytesize,
+            "parity": parity,
+            "stopbits": stopbits,
+            "timeout": timeout,
+            "write_timeout": write_timeout,
+            "inter_byte_timeout": inter_byte_timeout,
+        }
+        self._serial_settings = {key: value for key, value in settings.items() if value is not None}
+        self._buffer_sizes = {
+            key: value
+            for key, value in (("rx_size", rx_buffer_size), ("tx_size", tx_buffer_size))
+            if value is not None
+        }
+        self._write_queue = bool(write_queue)
+        self._hub = hub
+        self._writer = None
         self._serial_connection = None
         self._thread = None
         self._transport = None
         self._protocol = None
-        self._receive_observer = Observer()
+        self._receive_observer = Observer(isolate_errors=True)
+        self._match_observer = Observer(isolate_errors=True)
+        self._connection_lost_observer = Observer(isolate_errors=True)
+        self._metrics = None
+        self._tracer = None
+        self._dispatcher = None
+        self._responses = {}
+        self._streams = ()
+        self._streams_lock = threading.Lock()
 
     @property
     def connected(self):
@@ -135,6 +378,103 @@ class DeviceConnection:
         """
         return self._serial_connection
 
+    @property
+    def line_started(self):
+        """
+        Arrival time of the first byte of the line currently being received.
+
+        Only available while :attr:`metrics` is set, and only meaningful in
+        the serial reader thread, e.g. within receive observers.
+
+        :return: :func:`time.perf_counter` timestamp or ``None``.
+        :rtype: float | None
+        """
+        protocol = self._protocol
+        return getattr(protocol, "line_started", None) if protocol is not None else None
+
+    @property
+    def metrics(self):
+        """
+        Collector for task latency measurements.
+
+        If set, blocking :class:`SubmitTask` calls record their latencies in
+        it. ``None`` disables the instrumentation.
+
+        :return: Metrics collector or ``None``.
+        :rtype: CommandMetrics | None
+        """
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, value):
+        """
+        Set or remove the metrics collector.
+
+        :param value: Metrics collector or ``None``.
+        :type value: CommandMetrics | None
+        """
+        self._metrics = value
+        if self._protocol is not None:
+            self._protocol.timestamps = value is not None
+
+    @property
+    def tracer(self):
+        """
+        Recorder for the serial traffic.
+
+        If set, every sent and received line is recorded. ``None`` disables
+        tracing.
+
+        :return: Trace recorder or ``None``.
+        :rtype: TraceRecorder | None
+        """
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, value):
+        """
+        Set or remove the trace recorder.
+
+        :param value: Trace recorder or ``None``.
+        :type value: TraceRecorder | None
+        """
+        self._tracer = value
+
+    @property
+    def dispatcher(self):
+        """
+        Executor for receive callbacks.
+
+        If set, the reader thread only notifies :attr:`match_observer` and
+        the keyed observers of :attr:`receive_observer`, which includes all
+        waiting tasks. Plain observers and :meth:`receive_callback` are
+        executed by the dispatcher instead. ``None`` runs all callbacks in the reader thread,
+        as does a dispatcher that has been shut down.
+
+        :return: Dispatch executor or ``None``.
+        :rtype: DispatchExecutor | None
+        """
+        return self._dispatcher
+
+    @dispatcher.setter
+    def dispatcher(self, value):
+        """
+        Set or remove the dispatch executor.
+
+        :param value: Dispatch executor or ``None``.
+        :type value: DispatchExecutor | None
+        """
+        self._dispatcher = value
+
+    @property
+    def write_queue(self):
+        """
+        Whether lines are sent via a writer thread with a send queue.
+
+        :rtype: bool
+        """
+        return self._write_queue
+
     @property
     def port(self):
         """
@@ -158,23 +498,73 @@ class DeviceConnection:
             raise TypeError("port must be a string")
         self._port = value
 
+    @property
+    def serial_settings(self):
+        """
+        Serial parameters passed when opening the port.
+
+        Only explicitly configured parameters are included.
+
+        :return: Copy of the keyword arguments for :class:`serial.Serial`.
+        :rtype: dict
+        """
+        return dict(self._serial_settings)
+
     @property
     def receive_observer(self):
         """
         Observer notified when data is received.
 
-        Subscribers are called with the received data string.
+        Subscribers are called with the received data string. Exceptions
+        raised by subscribers do not stop the reader thread; they are
+        collected by the observer's error channel instead (see
+        :attr:`Observer.error_count`, :attr:`Observer.last_error` and
+        :meth:`Observer.error_callback`).
 
         :return: Receive observer instance.
         :rtype: Observer
         """
         return self._receive_observer
 
+    @property
+    def match_observer(self):
+        """
+        Observer notified in the reader thread when data is received.
+
+        Used for response matching that must not be deferred to a
+        :attr:`dispatcher`, such as the pattern waits of
+        :class:`WaitForResponse`. Subscribers are called with the received
+        data string before :attr:`receive_observer` and should return
+        quickly.
+
+        :return: Match observer instance.
+        :rtype: Observer
+        """
+        return self._match_observer
+
+    @property
+    def connection_lost_observer(self):
+        """
+        Observer notified when the connection is lost or closed.
+
+        Subscribers are called with the exception that caused the loss, or
+        ``None`` if the connection was closed by :meth:`disconnect`. Pending
+        waits subscribe here to raise :class:`ConnectionLostError` immediately
+        instead of running into their timeout.
+
+        :return: Connection lost observer instance.
+        :rtype: Observer
+        """
+        return self._connection_lost_observer
+
     @property
     def thread(self):
         """
         Reader thread managing serial I/O.
 
+        If the connection is served by a :class:`ConnectionHub`, this is a
+        stand-in providing the same interface.
+
         :return: Reader thread instance or ``None``.
         :rtype: serial.threaded.ReaderThread | None
         """
@@ -184,6 +574,9 @@ class DeviceConnection:
         """
         Establish the serial connection and start the reader thread.
 
+        If the reader thread cannot be started or the port cannot be
+        attached to the :attr:`hub`, the port is closed again.
+
         :raises ValueError: If the serial port is not set.
         :raises RuntimeError: If already connected or connection fails.
         """
@@ -192,19 +585,39 @@ class DeviceConnection:
         if self._thread and self._thread.is_alive():
             raise RuntimeError("Connection already established")
         self._connect_to_serial_port()
-        self._start_serial_reader_thread()
+        try:
+            self._start_serial_reader_thread()
+        except Exception:
+            serial_connection = self._serial_connection
+            self._reset_connection()
+            try:
+                serial_connection.close()
+            except Exception:
+                pass
+            raise
 
     def connection_lost(self, exception):
         """
         Handle connection loss.
 
-        Resets internal state and forwards the event to
+        Resets internal state, closes the port if the connection was lost
+        due to an error, notifies all subscribers via
+        :attr:`connection_lost_observer` and forwards the event to
         :meth:`connection_lost_callback`.
 
-        :param exception: Exception that caused the connection loss.
-        :type exception: Exception
+        :param exception: Exception that caused the connection loss, or
+                          ``None`` if the connection was closed.
+        :type exception: Exception | None
         """
+        serial_connection = self._serial_connection
         self._reset_connection()
+        if exception is not None and serial_connection is not None:
+            try:
+                serial_connection.close()
+            except Exception:
+                pass
+        self._finish_streams(exception)
+        self._connection_lost_observer.call(exception)
         self.connection_lost_callback(exception)
 
     def connection_lost_callback(self, exception):
@@ -225,6 +638,8 @@ class DeviceConnection:
         :raises RuntimeError: If the connection cannot be closed cleanly.
         """
         try:
+            if self._writer is not None:
+                self._writer.close()
             if self._thread and self._thread.is_alive():
                 self._thread.close()
             if self._serial_connection and self._serial_connection.is_open:
@@ -234,17 +649,139 @@ class DeviceConnection:
         else:
             self._reset_connection()
 
+    def register_responses(self, *responses):
+        """
+        Register expected response strings.
+
+        Received lines equal to a registered response are matched as bytes
+        and forwarded as the registered string, so they are not decoded.
+        Waiting tasks register their responses automatically.
+
+        :param responses: Response strings.
+        :type responses: str
+        :raises TypeError: If a response is not a string.
+        """
+        for response in responses:
+            if not isinstance(response, str):
+                raise TypeError(
+                    f"Invalid response: must be of type str, got '{type(response).__name__}'"
+                )
+            self._responses[response.encode(_SerialLineHandler.ENCODING)] = response
+
+    def lines(self, maxsize=1024, policy=DROP_OLDEST):
+        """
+        Return an iterator over the lines received from now on.
+
+        Every call creates an independent :class:`LineStream` with its own
+        buffer, which the reader thread fills without ever waiting for the
+        consumer. If the buffer is full, a line is discarded according to
+        ``policy`` and counted in :attr:`LineStream.dropped`.
+
+        The iteration ends when the connection is closed, and raises
+        :class:`ConnectionLostError` if it is lost. Close the stream, e.g.
+        with a ``with`` block, to stop buffering lines.
+
+        :param maxsize: Maximum number of buffered lines.
+        :type maxsize: int
+        :param policy: :data:`DROP_OLDEST` or :data:`DROP_NEWEST`.
+        :type policy: str
+        :return: Stream of received lines.
+        :rtype: LineStream
+        :raises TypeError: If ``maxsize`` is not an integer.
+        :raises ValueError: If ``maxsize`` is not positive or ``policy`` is unknown.
+        """
+        stream = LineStream(maxsize, policy, detach=self._remove_stream)
+        with self._streams_lock:
+            self._streams += (stream,)
+        return stream
+
+    def alines(self, maxsize=1024, policy=DROP_OLDEST):
+        """
+        Return an asynchronous iterator over the lines received from now on.
+
+        Same as :meth:`lines`, for use with ``async for``. Waiting for a line
+        does not block the event loop.
+
+        :param maxsize: Maximum number of buffered lines.
+        :type maxsize: int
+        :param policy: :data:`DROP_OLDEST` or :data:`DROP_NEWEST`.
+        :type policy: str
+        :return: Stream of received lines.
+        :rtype: LineStream
+        :raises TypeError: If ``maxsize`` is not an integer.
+        :raises ValueError: If ``maxsize`` is not positive or ``policy`` is unknown.
+        """
+        return self.lines(maxsize, policy)
+
+    def _remove_stream(self, stream):
+        """
+        Stop feeding a closed stream.
+
+        Internal use only.
+        """
+        with self._streams_lock:
+            self._streams = tuple(item for item in self._streams if item is not stream)
+
+    def _finish_streams(self, exception):
+        """
+        End all streams after the connection was closed or lost.
+
+        Internal use only.
+
+        :param exception: Exception that caused the loss, or ``None``.
+        :type exception: Exception | None
+        """
+        with self._streams_lock:
+            streams, self._streams = self._streams, ()
+        for stream in streams:
+            if exception is None:
+                stream.finish()
+                continue
+            error = ConnectionLostError("Connection lost while streaming lines")
+            error.__cause__ = exception
+            stream.finish(error)
+
     def receive(self, data):
         """
         Handle received data from the serial device.
 
-        Notifies all subscribers via :attr:`receive_observer` and then calls
-        :meth:`receive_callback`.
+        Appends the line to all streams created by :meth:`lines`, notifies
+        :attr:`match_observer` and all subscribers via
+        :attr:`receive_observer` and then calls :meth:`receive_callback`. If
+        a :attr:`dispatcher` is set, only the match observer and the keyed
+        subscribers are notified directly and the remaining calls are
+        submitted to the dispatcher.
 
         :param data: Received data.
         :type data: str
         """
-        self._receive_observer.call(data)
+        tracer = self._tracer
+        if tracer is not None:
+            tracer.record(RECEIVED, data)
+        for stream in self._streams:
+            stream.put(data)
+        self._match_observer.call(data)
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            self._receive_observer.call(data)
+            self.receive_callback(data)
+            return
+        self._receive_observer.call_keyed(data)
+        try:
+            dispatcher.submit(self._dispatch, data)
+        except RuntimeError:
+            self._dispatch(data)
+
+    def _dispatch(self, data):
+        """
+        Notify plain subscribers and call :meth:`receive_callback` in the dispatcher.
+
+        Internal use only.
+
+        :param data: Received data.
+        :type data: str
+        """
+        self._receive_observer.call_plain(data)
         self.receive_callback(data)
 
     def receive_callback(self, data):
@@ -254,7 +791,8 @@ class DeviceConnection:
         Override in subclasses or monekey patch to implement custom handling.
 
         .. note::
-            This callback is executed in the serial reader thread.
+            This callback is executed in the serial reader thread, or in a
+            worker thread of :attr:`dispatcher` if one is set.
 
         :param data: Received data.
         :type data: str
@@ -265,17 +803,35 @@ class DeviceConnection:
         """
         Send data to the device.
 
+        If :attr:`write_queue` is enabled, the line is queued for the writer
+        thread and a future is returned, which completes once the bytes have
+        been written or fails with :class:`RuntimeError` if writing fails.
+
         :param data: Data string to send.
         :type data: str
+        :return: ``None``, or a future if :attr:`write_queue` is enabled.
+        :rtype: concurrent.futures.Future | None
         :raises RuntimeError: If not connected or sending fails.
         """
         if not self.connected:
             raise RuntimeError("Not connected to serial port")
-        try:
-            self._protocol.write_line(data)
-        except Exception as e:
-            raise RuntimeError("Writing data to serial port failed!") from e
+        writer = self._writer
+        if writer is not None:
+            future = writer.submit(
+                data.encode(_SerialLineHandler.ENCODING, _SerialLineHandler.UNICODE_HANDLING)
+                + _SerialLineHandler.TERMINATOR
+            )
+        else:
+            future = None
+            try:
+                self._protocol.write_line(data)
+            except Exception as e:
+                raise RuntimeError("Writing data to serial port failed!") from e
+        tracer = self._tracer
+        if tracer is not None:
+            tracer.record(SENT, data)
         self.send_callback(data)
+        return future
 
     def send_callback(self, data):
         """
@@ -292,10 +848,19 @@ class DeviceConnection:
         """
         Open the serial port.
 
+        Ports containing ``://`` are opened via :func:`serial.serial_for_url`.
+        Configured OS buffer sizes are applied if the platform supports it.
+
         :raises RuntimeError: If the port cannot be opened.
         """
         try:
-            self._serial_connection = serial.Serial(self._port)
+            if "://" in self._port:
+                self._serial_connection = serial.serial_for_url(self._port, **self._serial_settings)
+            else:
+                self._serial_connection = serial.Serial(self._port, **self._serial_settings)
+            set_buffer_size = getattr(self._serial_connection, "set_buffer_size", None)
+            if self._buffer_sizes and callable(set_buffer_size):
+                set_buffer_size(**self._buffer_sizes)
         except ValueError as e:
             raise RuntimeError("Parameter out of range when opening serial connection") from e
         except serial.SerialException as e:
@@ -309,6 +874,9 @@ class DeviceConnection:
 
         Internal use only.
         """
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
         self._serial_connection = None
         self._thread = None
         self._transport = None
@@ -318,20 +886,28 @@ class DeviceConnection:
         """
         Start the reader thread for serial communication.
 
-        Initializes the protocol handler and assigns the receiver.
+        Initializes the protocol handler and assigns the receiver. If a hub
+        is set, the port is attached to the hub instead.
 
         :raises RuntimeError: If the reader thread fails to start.
         """
-        self._thread = serial.threaded.ReaderThread(
-            self._serial_connection,
-            _SerialLineHandler,
-        )
-        try:
-            self._thread.start()
-        except Exception as e:
-            raise RuntimeError("Connecting communication thread failed!") from e
+        if self._hub is not None:
+            self._thread = self._hub.attach(self._serial_connection)
+        else:
+            self._thread = serial.threaded.ReaderThread(
+                self._serial_connection,
+                _SerialLineHandler,
+            )
+            try:
+                self._thread.start()
+            except Exception as e:
+                raise RuntimeError("Connecting communication thread failed!") from e
         self._transport, self._protocol = self._thread.connect()
         self._protocol.receiver = self
+        self._protocol.responses = self._responses
+        self._protocol.timestamps = self._metrics is not None
+        if self._write_queue:
+            self._writer = _SerialWriter(self._transport.write)
 
     def __enter__(self):
         """
@@ -359,3 +935,62 @@ class DeviceConnection:
         except Exception:
             pass
         return False
+
+
+class AsyncDeviceConnection(DeviceConnection):
+    """
+    Device connection for use within an :mod:`asyncio` event loop.
+
+    Extends :class:`DeviceConnection` with coroutines for connecting and
+    disconnecting, which run the blocking port handling in the loop's default
+    executor, and with support for ``async with``.
+
+    Received lines are still read by the serial reader thread. Awaitable
+    handlers such as :class:`AsyncSubmitTask` resolve their futures from
+    there via :meth:`asyncio.loop.call_soon_threadsafe`, so any number of
+    outstanding waits costs no additional threads.
+    """
+
+    async def aconnect(self):
+        """
+        Establish the serial connection without blocking the event loop.
+
+        :raises ValueError: If the serial port is not set.
+        :raises RuntimeError: If already connected or connection fails.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.connect)
+
+    async def adisconnect(self):
+        """
+        Close the serial connection without blocking the event loop.
+
+        :raises RuntimeError: If the connection cannot be closed cleanly.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.disconnect)
+
+    async def __aenter__(self):
+        """
+        Enter asynchronous context manager and connect.
+
+        :return: This instance.
+        :rtype: AsyncDeviceConnection
+        """
+        await self.aconnect()
+        if not self.connected:
+            raise RuntimeError("Connection not possible!")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Exit asynchronous context manager and disconnect.
+
+        Exceptions raised inside the ``async with`` block are propagated.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        try:
+            await self.adisconnect()
+        except Exception:
+            pass
+        return False
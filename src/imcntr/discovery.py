@@ -0,0 +1,179 @@
+"""
+Serial port discovery of the imaging controller.
+
+The controller is an Arduino Nano Every, which may appear under a different
+device name after every re-plug or reboot. :func:`discover_port` finds it
+by USB vendor and product ID and, optionally, its serial number using
+:mod:`serial.tools.list_ports`.
+
+Found ports are stored in a small JSON cache. On the next lookup the cached
+port is checked first: on Linux by reading the USB attributes of that single
+device from sysfs, which avoids enumerating all serial ports. Only if the
+cached port is gone or belongs to another device, all ports are enumerated.
+
+Example::
+
+    port = discover_port(serial_number="8A3B2C1D")
+    with DeviceConnection(port) as connection:
+        ...
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+from serial.tools import list_ports
+
+ARDUINO_VID = 0x2341
+NANO_EVERY_PID = 0x0058
+
+_CACHE_VERSION = 1
+
+
+def default_cache_path():
+    """
+    Return the default location of the port cache.
+
+    Uses ``$XDG_CACHE_HOME/imcntr/ports.json``, falling back to
+    ``~/.cache/imcntr/ports.json``.
+
+    :rtype: pathlib.Path
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "imcntr" / "ports.json"
+
+
+def find_ports(vid=ARDUINO_VID, pid=NANO_EVERY_PID, serial_number=None):
+    """
+    Enumerate all serial ports matching the given USB identifiers.
+
+    :param vid: USB vendor ID.
+    :type vid: int
+    :param pid: USB product ID.
+    :type pid: int
+    :param serial_number: USB serial number, or ``None`` to match any.
+    :type serial_number: str | None
+    :return: Matching device names, sorted.
+    :rtype: list[str]
+    """
+    return sorted(
+        info.device
+        for info in list_ports.comports()
+        if _matches(info, vid, pid, serial_number)
+    )
+
+
+def discover_port(vid=ARDUINO_VID, pid=NANO_EVERY_PID, serial_number=None, cache=True):
+    """
+    Find the serial port of the controller.
+
+    If a ``serial_number`` is given, the cached port is returned if it still
+    belongs to the device. Otherwise all ports are enumerated and the cache
+    is updated. Without a serial number all ports are always enumerated,
+    since only that tells a single controller from several.
+
+    :param vid: USB vendor ID.
+    :type vid: int
+    :param pid: USB product ID.
+    :type pid: int
+    :param serial_number: USB serial number, or ``None`` to match any.
+                          Required to tell several controllers apart.
+    :type serial_number: str | None
+    :param cache: ``True`` to use the default cache file, a path to use
+                  another file, or ``False`` to disable caching.
+    :type cache: bool | str | os.PathLike
+    :return: Device name, e.g. ``'/dev/ttyACM0'`` or ``'COM3'``.
+    :rtype: str
+    :raises RuntimeError: If no matching port is found, or if several are
+                          found and no ``serial_number`` is given.
+    """
+    if serial_number is None:
+        cache = False
+    elif cache is True:
+        cache = default_cache_path()
+    key = f"{vid:04x}:{pid:04x}:{serial_number or '*'}"
+    entries = _read_cache(cache) if cache else {}
+    cached = entries.get(key)
+    if cached is not None and _validate(cached, vid, pid, serial_number):
+        return cached
+    ports = find_ports(vid, pid, serial_number)
+    if not ports:
+        raise RuntimeError(f"No controller found for USB device '{key}'")
+    if len(ports) > 1 and serial_number is None:
+        raise RuntimeError(
+            f"Several controllers found, specify a serial number: {', '.join(ports)}"
+        )
+    port = ports[0]
+    if cache and port != cached:
+        entries[key] = port
+        _write_cache(cache, entries)
+    return port
+
+
+def _matches(info, vid, pid, serial_number):
+    """
+    Check whether port information matches the given USB identifiers.
+
+    Internal use only.
+    """
+    return (
+        info.vid == vid
+        and info.pid == pid
+        and (serial_number is None or info.serial_number == serial_number)
+    )
+
+
+def _validate(device, vid, pid, serial_number):
+    """
+    Check whether a cached device still belongs to the USB device.
+
+    On Linux only the sysfs attributes of ``device`` are read. On other
+    platforms all ports are enumerated.
+
+    Internal use only.
+    """
+    if sys.platform.startswith("linux"):
+        if not os.path.exists(device):
+            return False
+        from serial.tools.list_ports_linux import SysFS
+
+        return _matches(SysFS(device), vid, pid, serial_number)
+    return device in find_ports(vid, pid, serial_number)
+
+
+def _read_cache(path):
+    """
+    Read the cache entries, ignoring a missing or corrupt file.
+
+    Internal use only.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            content = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(content, dict) or content.get("version") != _CACHE_VERSION:
+        return {}
+    ports = content.get("ports")
+    return dict(ports) if isinstance(ports, dict) else {}
+
+
+def _write_cache(path, entries):
+    """
+    Write the cache entries atomically, ignoring failures.
+
+    Internal use only.
+    """
+    path = Path(path)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"version": _CACHE_VERSION, "ports": entries}, file, indent=2)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            temporary.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,247 @@
+"""
+Deferred execution of receive callbacks.
+
+This module provides :class:`DispatchExecutor`, a bounded queue served by a
+pool of worker threads. Assigned to :attr:`DeviceConnection.dispatcher`, it
+takes over all receive handling except the matching of waiting tasks, so
+slow callbacks such as logging, database writes or pipeline triggers no
+longer stall the serial reader thread.
+
+If the queue is full, the ``policy`` decides what happens:
+
+- :data:`BLOCK`: the reader waits for free space, so no line is lost.
+- :data:`DROP_OLDEST`: the oldest queued call is discarded.
+- :data:`DROP_NEWEST`: the new call is discarded.
+
+Discarded calls are counted in :attr:`DispatchExecutor.dropped`.
+"""
+
+import collections
+import threading
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+
+class DispatchExecutor:
+    """
+    Execute calls on a pool of worker threads fed by a bounded queue.
+
+    With a single worker, calls are executed in submission order. Exceptions
+    raised by calls are counted and forwarded to :meth:`error_callback`.
+
+    The executor can be used as a context manager, which calls
+    :meth:`shutdown` on exit.
+
+    :param workers: Number of worker threads.
+    :type workers: int
+    :param maxsize: Maximum number of queued calls.
+    :type maxsize: int
+    :param policy: Behaviour if the queue is full, one of :data:`BLOCK`,
+                   :data:`DROP_OLDEST` or :data:`DROP_NEWEST`.
+    :type policy: str
+    """
+
+    def __init__(self, workers=1, maxsize=1024, policy=BLOCK):
+        for name, value in (("workers", workers), ("maxsize", maxsize)):
+            if not isinstance(value, int):
+                raise TypeError(
+                    f"Invalid {name}: must be of type int, got '{type(value).__name__}'"
+                )
+            if value <= 0:
+                raise ValueError(
+                    f"Invalid {name}: must be non-zero positive number, got '{value}'"
+                )
+        if policy not in _POLICIES:
+            raise ValueError(
+                f"Invalid policy: must be one of {', '.join(_POLICIES)}, got '{policy}'"
+            )
+        self._maxsize = maxsize
+        self._policy = policy
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._active = 0
+        self._dropped = 0
+        self._error_count = 0
+        self._last_error = None
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"imcntr-dispatch-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def policy(self):
+        """
+        Behaviour if the queue is full.
+
+        :rtype: str
+        """
+        return self._policy
+
+    @property
+    def pending(self):
+        """
+        Number of queued calls.
+
+        :rtype: int
+        """
+        return len(self._queue)
+
+    @property
+    def dropped(self):
+        """
+        Number of calls discarded because the queue was full.
+
+        :rtype: int
+        """
+        return self._dropped
+
+    @property
+    def error_count(self):
+        """
+        Number of calls that raised an exception.
+
+        :rtype: int
+        """
+        return self._error_count
+
+    @property
+    def last_error(self):
+        """
+        The most recent exception raised by a call, or ``None``.
+
+        :rtype: Exception | None
+        """
+        return self._last_error
+
+    def error_callback(self, exception, function):
+        """
+        Optional hook invoked in the worker thread when a call raises.
+
+        Override in subclasses or monkey patch to implement custom handling.
+        Exceptions raised by this hook are ignored.
+
+        :param exception: The exception raised by the call.
+        :type exception: Exception
+        :param function: The function that raised.
+        :type function: Callable
+        """
+        pass
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queue a call for execution by a worker thread.
+
+        :param function: Function to call.
+        :type function: Callable
+        :param args: Positional arguments passed to ``function``.
+        :param kwargs: Keyword arguments passed to ``function``.
+        :return: ``True`` if the call was queued, ``False`` if it was dropped.
+        :rtype: bool
+        :raises RuntimeError: If the executor has been shut down.
+        """
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Dispatch executor has been shut down")
+            if len(self._queue) >= self._maxsize:
+                if self._policy == DROP_NEWEST:
+                    self._dropped += 1
+                    return False
+                if self._policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self._dropped += 1
+                else:
+                    while len(self._queue) >= self._maxsize and not self._shutdown:
+                        self._condition.wait()
+                    if self._shutdown:
+                        raise RuntimeError("Dispatch executor has been shut down")
+            self._queue.append((function, args, kwargs))
+            self._condition.notify_all()
+        return True
+
+    def join(self, timeout=None):
+        """
+        Wait until all queued calls have been executed.
+
+        :param timeout: Maximum time to wait in seconds, or ``None``.
+        :type timeout: float | None
+        :return: ``True`` if the queue was drained, ``False`` on timeout.
+        :rtype: bool
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._active, timeout
+            )
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting calls and stop the worker threads.
+
+        Calls queued before the shutdown are still executed.
+
+        :param wait: Whether to wait for the worker threads to finish.
+        :type wait: bool
+        """
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            current = threading.current_thread()
+            for thread in self._threads:
+                if thread is not current:
+                    thread.join()
+
+    def _run(self):
+        """
+        Worker thread main loop.
+
+        Internal use only.
+        """
+        while True:
+            with self._condition:
+                while not self._queue and not self._shutdown:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                function, args, kwargs = self._queue.popleft()
+                self._active += 1
+                self._condition.notify_all()
+            try:
+                function(*args, **kwargs)
+            except Exception as e:
+                self._error_count += 1
+                self._last_error = e
+                try:
+                    self.error_callback(e, function)
+                except Exception:
+                    pass
+            finally:
+                with self._condition:
+                    self._active -= 1
+                    if not self._queue and not self._active:
+                        self._condition.notify_all()
+
+    def __enter__(self):
+        """
+        Enter context manager.
+
+        :return: This instance.
+        :rtype: DispatchExecutor
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit context manager and shut down the executor.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        self.shutdown()
+        return False
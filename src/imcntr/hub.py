@@ -0,0 +1,321 @@
+"""
+Multiplexed reading of several serial ports on a single thread.
+
+By default every :class:`DeviceConnection` starts its own
+:class:`serial.threaded.ReaderThread`. A :class:`ConnectionHub` serves any
+number of connections from a single :mod:`selectors` loop instead, so the
+number of threads stays constant as controllers are added. Each port keeps
+its own line framing, and received lines are dispatched to the
+``receive_observer`` of their connection in the hub thread.
+
+Only ports with a file descriptor can be multiplexed, i.e. serial ports on
+POSIX systems and ``socket://`` URLs.
+
+Example::
+
+    with ConnectionHub() as hub:
+        with DeviceConnection("/dev/ttyACM0", hub=hub) as first:
+            with DeviceConnection("/dev/ttyACM1", hub=hub) as second:
+                Sample(first).move_in(timeout=10)
+                Sample(second).move_in(timeout=10)
+"""
+
+import collections
+import selectors
+import socket
+import threading
+
+from .device_connection import _SerialLineHandler
+
+
+class _HubChannel:
+    """
+    Stand-in for :class:`serial.threaded.ReaderThread` of a port served by a hub.
+
+    Provides the parts of the reader thread interface used by
+    :class:`DeviceConnection`: ``connect``, ``is_alive``, ``write`` and
+    ``close``.
+
+    Internal use only.
+    """
+
+    def __init__(self, hub, serial_instance, fileno, protocol):
+        self.serial = serial_instance
+        self.fileno = fileno
+        self.protocol = protocol
+        self.alive = True
+        self._hub = hub
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """
+        Return the transport and protocol, like :meth:`ReaderThread.connect`.
+        """
+        return self, self.protocol
+
+    def is_alive(self):
+        """
+        Whether the port is still served by the hub.
+        """
+        return self.alive
+
+    def write(self, data):
+        """
+        Write bytes to the port, thread safe.
+        """
+        with self._lock:
+            self.serial.write(data)
+
+    def close(self):
+        """
+        Stop serving the port and close it.
+        """
+        self._hub._detach(self, None)
+        with self._lock:
+            self.serial.close()
+
+
+class ConnectionHub:
+    """
+    Serve the reading of several serial ports from a single thread.
+
+    Pass the hub to :class:`DeviceConnection` to attach the connection to it
+    when connecting. Ports are switched to non-blocking reads (read timeout
+    ``0``) while attached. The hub thread is started with the first attached
+    port.
+
+    The hub can be used as a context manager, which calls :meth:`close` on
+    exit.
+
+    :param read_size: Maximum number of bytes read from a port at once.
+    :type read_size: int
+    """
+
+    def __init__(self, read_size=4096):
+        if not isinstance(read_size, int) or read_size <= 0:
+            raise ValueError(f"Invalid read size: must be positive integer, got '{read_size}'")
+        self._read_size = read_size
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ, None)
+        self._lock = threading.Lock()
+        self._calls = collections.deque()
+        self._channels = set()
+        self._thread = None
+        self._closed = False
+
+    @property
+    def connections(self):
+        """
+        Number of ports currently served.
+
+        :rtype: int
+        """
+        return len(self._channels)
+
+    @property
+    def thread(self):
+        """
+        Hub thread, or ``None`` if it has not been started.
+
+        :rtype: threading.Thread | None
+        """
+        return self._thread
+
+    def attach(self, serial_instance):
+        """
+        Start serving an open port.
+
+        Called by :meth:`DeviceConnection.connect`.
+
+        :param serial_instance: Open serial port.
+        :type serial_instance: serial.SerialBase
+        :return: Reader thread stand-in providing ``connect``, ``is_alive``,
+                 ``write`` and ``close``.
+        :raises RuntimeError: If the hub is closed or the port has no file
+                              descriptor.
+        """
+        try:
+            fileno = serial_instance.fileno()
+        except Exception as e:
+            raise RuntimeError("Port does not support multiplexed reading") from e
+        serial_instance.timeout = 0
+        protocol = _SerialLineHandler()
+        channel = _HubChannel(self, serial_instance, fileno, protocol)
+        protocol.connection_made(channel)
+        self._call(self._register, channel)
+        return channel
+
+    def close(self):
+        """
+        Close all served ports and stop the hub thread.
+
+        Each connection is notified via ``connection_lost(None)``.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is not None:
+            self._call(self._shutdown)
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+        else:
+            self._shutdown()
+        self._selector.close()
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
+
+    def _detach(self, channel, exception):
+        """
+        Stop serving a port and notify its connection.
+
+        Internal use only.
+        """
+        if threading.current_thread() is self._thread or self._thread is None:
+            self._unregister(channel, exception)
+        elif not self._closed:
+            self._call(self._unregister, channel, exception)
+
+    def _call(self, function, *args):
+        """
+        Run ``function`` in the hub thread and wait for it to finish.
+
+        Internal use only.
+
+        :raises RuntimeError: If the hub is closed.
+        """
+        if threading.current_thread() is self._thread:
+            return function(*args)
+        done = threading.Event()
+        outcome = []
+
+        def call():
+            try:
+                outcome.append(function(*args))
+            except BaseException as e:
+                outcome.append(e)
+                raise
+            finally:
+                done.set()
+
+        with self._lock:
+            if self._closed and function != self._shutdown:
+                raise RuntimeError("Connection hub is closed")
+            self._calls.append(call)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="imcntr-hub", daemon=True)
+                self._thread.start()
+        try:
+            self._wakeup_writer.send(b"\0")
+        except BlockingIOError:
+            pass
+        done.wait()
+        if outcome and isinstance(outcome[0], BaseException):
+            raise outcome[0]
+        return outcome[0] if outcome else None
+
+    def _register(self, channel):
+        """
+        Add a port to the selector. Runs in the hub thread.
+
+        Internal use only.
+        """
+        self._selector.register(channel.fileno, selectors.EVENT_READ, channel)
+        self._channels.add(channel)
+
+    def _unregister(self, channel, exception):
+        """
+        Remove a port from the selector and notify its connection. Runs in
+        the hub thread.
+
+        Internal use only.
+        """
+        if channel not in self._channels:
+            return
+        self._channels.discard(channel)
+        channel.alive = False
+        try:
+            self._selector.unregister(channel.fileno)
+        except (KeyError, ValueError, OSError):
+            pass
+        channel.protocol.connection_lost(exception)
+
+    def _shutdown(self):
+        """
+        Remove all ports. Runs in the hub thread.
+
+        Internal use only.
+        """
+        for channel in list(self._channels):
+            self._unregister(channel, None)
+            try:
+                channel.serial.close()
+            except Exception:
+                pass
+
+    def _run(self):
+        """
+        Hub thread main loop.
+
+        Internal use only.
+        """
+        read_size = self._read_size
+        while True:
+            for key, _ in self._selector.select():
+                channel = key.data
+                if channel is None:
+                    self._run_calls()
+                    continue
+                if not channel.alive:
+                    continue
+                try:
+                    data = channel.serial.read(read_size)
+                    if data:
+                        channel.protocol.data_received(data)
+                except Exception as e:
+                    self._unregister(channel, e)
+            if self._closed and not self._calls and not self._channels:
+                return
+
+    def _run_calls(self):
+        """
+        Run the calls queued by other threads.
+
+        Internal use only.
+        """
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while True:
+            with self._lock:
+                if not self._calls:
+                    return
+                call = self._calls.popleft()
+            try:
+                call()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        """
+        Enter context manager.
+
+        :return: This instance.
+        :rtype: ConnectionHub
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit context manager and close the hub.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        self.close()
+        return False
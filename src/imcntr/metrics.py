@@ -0,0 +1,213 @@
+"""
+Latency metrics for controller tasks.
+
+This module provides :class:`CommandMetrics`, a collector for per-task
+latency measurements. Assign an instance to :attr:`DeviceConnection.metrics`
+to enable instrumentation of blocking :class:`SubmitTask` calls. Without a
+collector assigned, no timestamps are taken.
+
+Every completed task is split into the following phases:
+
+- ``write``: time spent in :meth:`DeviceConnection.send`.
+- ``device``: from the end of the write until the first byte of the response
+  line arrived, i.e. transfer and firmware execution.
+- ``dispatch``: from the first byte until the response was matched in the
+  reader thread, i.e. framing, decoding and observer dispatch.
+- ``wakeup``: from the match until the waiting thread resumed.
+- ``total``: from the start of the call until the waiting thread resumed.
+"""
+
+import collections
+import threading
+
+PHASES = ("write", "device", "dispatch", "wakeup", "total")
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _TaskStatistics:
+    """
+    Rolling latency samples and running totals of a single task type.
+
+    Internal use only.
+    """
+
+    def __init__(self, window):
+        self.samples = {phase: collections.deque(maxlen=window) for phase in PHASES}
+        self.sums = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.timeouts = 0
+
+
+class CommandMetrics:
+    """
+    Collect latency measurements per task type.
+
+    For each task type and phase the most recent ``window`` samples are kept
+    to compute quantiles, while count and sum cover all samples since the
+    last :meth:`reset`.
+
+    :param window: Number of recent samples kept per task type and phase.
+    :type window: int
+    """
+
+    def __init__(self, window=1024):
+        if not isinstance(window, int):
+            raise TypeError(
+                f"Invalid window: must be of type int, got '{type(window).__name__}'"
+            )
+        if window <= 0:
+            raise ValueError(
+                f"Invalid window: must be non-zero positive number, got '{window}'"
+            )
+        self._window = window
+        self._lock = threading.Lock()
+        self._tasks = {}
+
+    def record(self, name, start, sent, first_byte, matched, done):
+        """
+        Record the timestamps of a completed task.
+
+        All timestamps are :func:`time.perf_counter` values in seconds. If
+        ``first_byte`` is unknown, the ``device`` and ``dispatch`` phases are
+        not recorded.
+
+        :param name: Task type, e.g. ``'ROTATE_CW'``.
+        :type name: str
+        :param start: Start of the call.
+        :type start: float
+        :param sent: End of the write.
+        :type sent: float
+        :param first_byte: Arrival of the first byte of the response line, or ``None``.
+        :type first_byte: float | None
+        :param matched: Match of the response in the reader thread.
+        :type matched: float
+        :param done: Resumption of the waiting thread.
+        :type done: float
+        """
+        durations = {"write": sent - start, "wakeup": done - matched, "total": done - start}
+        if first_byte is not None:
+            first_byte = max(first_byte, sent)
+            durations["device"] = first_byte - sent
+            durations["dispatch"] = matched - first_byte
+        with self._lock:
+            statistics = self._statistics(name)
+            for phase, duration in durations.items():
+                statistics.samples[phase].append(duration)
+                statistics.sums[phase] += duration
+                statistics.counts[phase] += 1
+
+    def record_timeout(self, name):
+        """
+        Record a task whose response was not received within the timeout.
+
+        :param name: Task type.
+        :type name: str
+        """
+        with self._lock:
+            self._statistics(name).timeouts += 1
+
+    def reset(self):
+        """
+        Discard all recorded measurements.
+        """
+        with self._lock:
+            self._tasks.clear()
+
+    def snapshot(self):
+        """
+        Return a summary of all recorded measurements.
+
+        The result maps each task type to a dictionary with the number of
+        ``timeouts`` and one entry per phase, containing ``count``, ``sum``
+        and ``mean`` over all samples as well as ``p50``, ``p90``, ``p99``
+        and ``max`` over the recent window. Durations are given in seconds.
+
+        :rtype: dict
+        """
+        with self._lock:
+            tasks = {
+                name: (
+                    {phase: list(samples) for phase, samples in statistics.samples.items()},
+                    dict(statistics.sums),
+                    dict(statistics.counts),
+                    statistics.timeouts,
+                )
+                for name, statistics in self._tasks.items()
+            }
+        result = {}
+        for name, (samples, sums, counts, timeouts) in tasks.items():
+            summary = {"timeouts": timeouts}
+            for phase in PHASES:
+                if not counts[phase]:
+                    continue
+                ordered = sorted(samples[phase])
+                summary[phase] = {
+                    "count": counts[phase],
+                    "sum": sums[phase],
+                    "mean": sums[phase] / counts[phase],
+                    "p50": _quantile(ordered, 0.5),
+                    "p90": _quantile(ordered, 0.9),
+                    "p99": _quantile(ordered, 0.99),
+                    "max": ordered[-1],
+                }
+            result[name] = summary
+        return result
+
+    def prometheus(self, prefix="imcntr"):
+        """
+        Return the measurements in the Prometheus text exposition format.
+
+        Latencies are exported as summary ``<prefix>_task_seconds`` with
+        ``task`` and ``phase`` labels, timeouts as counter
+        ``<prefix>_task_timeouts_total``.
+
+        :param prefix: Metric name prefix.
+        :type prefix: str
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+        latency = f"{prefix}_task_seconds"
+        timeouts = f"{prefix}_task_timeouts_total"
+        lines = [
+            f"# HELP {latency} Controller task latency by phase.",
+            f"# TYPE {latency} summary",
+        ]
+        for name, summary in snapshot.items():
+            for phase in PHASES:
+                if phase not in summary:
+                    continue
+                values = summary[phase]
+                labels = f'task="{name}",phase="{phase}"'
+                for quantile in QUANTILES:
+                    key = f"p{round(quantile * 100)}"
+                    lines.append(f'{latency}{{{labels},quantile="{quantile}"}} {values[key]!r}')
+                lines.append(f"{latency}_sum{{{labels}}} {values['sum']!r}")
+                lines.append(f"{latency}_count{{{labels}}} {values['count']}")
+        lines.append(f"# HELP {timeouts} Controller tasks that timed out.")
+        lines.append(f"# TYPE {timeouts} counter")
+        for name, summary in snapshot.items():
+            lines.append(f'{timeouts}{{task="{name}"}} {summary["timeouts"]}')
+        return "\n".join(lines) + "\n"
+
+    def _statistics(self, name):
+        """
+        Return the statistics of a task type, creating them if needed.
+
+        Must be called with the lock held.
+
+        Internal use only.
+        """
+        statistics = self._tasks.get(name)
+        if statistics is None:
+            statistics = self._tasks[name] = _TaskStatistics(self._window)
+        return statistics
+
+
+def _quantile(ordered, fraction):
+    """
+    Return the nearest-rank quantile of sorted samples.
+
+    Internal use only.
+    """
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
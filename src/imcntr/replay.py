@@ -0,0 +1,238 @@
+"""
+Replay of recorded serial sessions.
+
+This module provides :class:`ReplayConnection`, a drop-in replacement for
+:class:`DeviceConnection` that answers sent lines with the responses of a
+trace recorded by :class:`TraceRecorder`. :class:`Controller`,
+:class:`Sample` and :class:`Shutter` run unmodified against it, so recorded
+production sessions can be used to regression-test and profile response
+matching, observer fan-out and scan logic without hardware.
+
+Received lines are replayed with their recorded delay relative to the sent
+line they followed, scaled by the replay speed. Lines received before the
+first sent line, such as the ready banner, are replayed relative to
+:meth:`ReplayConnection.connect`.
+
+Example::
+
+    with ReplayConnection("scan.trace", speed=10) as connection:
+        Sample(connection).scan([10] * 360, timeout=5)
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from .device_connection import DeviceConnection
+from .trace import SENT, RECEIVED, read_trace
+
+
+class ReplayConnection(DeviceConnection):
+    """
+    Device connection replaying a recorded session.
+
+    Every sent line is matched against the next sent line of the recording.
+    On a match, the lines received after it in the recording are delivered
+    to :meth:`receive` from a background thread.
+
+    :param trace: Path of a trace file or iterable of :class:`TraceRecord`.
+    :type trace: str | os.PathLike | Iterable[TraceRecord]
+    :param speed: Replay speed factor, e.g. ``10`` to replay ten times faster.
+                  ``None`` replays without delays.
+    :type speed: float | None
+    :param strict: If ``True``, sending a line that does not match the
+                   recording raises :class:`RuntimeError`. Otherwise the
+                   recording is searched forward for the line and unmatched
+                   lines are not answered.
+    :type strict: bool
+    :raises ValueError: If ``speed`` is not a positive number or ``None``.
+    """
+
+    def __init__(self, trace, speed=1.0, strict=True):
+        if speed is not None and (not isinstance(speed, (int, float)) or speed <= 0):
+            raise ValueError(f"Invalid speed: must be positive number or None, got '{speed}'")
+        super().__init__(port="replay://")
+        if isinstance(trace, (str, os.PathLike)):
+            trace = read_trace(trace)
+        self._segments = self._split(trace)
+        self._speed = speed
+        self._strict = strict
+        self._position = 0
+        self._pending = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._replay_thread = None
+        self._running = False
+
+    @property
+    def connected(self):
+        """
+        Whether the replay is running.
+
+        :rtype: bool
+        """
+        return self._running
+
+    @property
+    def speed(self):
+        """
+        Replay speed factor, or ``None`` for replay without delays.
+
+        :rtype: float | None
+        """
+        return self._speed
+
+    @property
+    def remaining(self):
+        """
+        Number of recorded sent lines that have not been replayed yet.
+
+        :rtype: int
+        """
+        return len(self._segments) - 1 - self._position
+
+    def connect(self):
+        """
+        Start the replay.
+
+        Restarts the recording from its beginning and schedules the lines
+        received before the first sent line.
+
+        :raises RuntimeError: If the replay is already running.
+        """
+        if self._running:
+            raise RuntimeError("Connection already established")
+        self._position = 0
+        self._pending = []
+        self._running = True
+        self._replay_thread = threading.Thread(
+            target=self._run, name="imcntr-replay", daemon=True
+        )
+        self._replay_thread.start()
+        self._schedule(self._segments[0][1])
+
+    def disconnect(self):
+        """
+        Stop the replay and discard undelivered lines.
+
+        Like closing a serial port, this calls :meth:`connection_lost` with
+        ``None``, so pending waits raise :class:`ConnectionLostError` and
+        line streams end.
+        """
+        with self._condition:
+            running = self._running
+            self._running = False
+            self._pending = []
+            self._condition.notify()
+        if self._replay_thread is not None:
+            if self._replay_thread is not threading.current_thread():
+                self._replay_thread.join()
+            self._replay_thread = None
+        if running:
+            self.connection_lost(None)
+
+    def send(self, data):
+        """
+        Send data to the replayed device.
+
+        :param data: Data string to send.
+        :type data: str
+        :raises RuntimeError: If not connected, or if ``strict`` and the line
+                              does not match the recording.
+        """
+        if not self.connected:
+            raise RuntimeError("Not connected to serial port")
+        responses = self._match(data)
+        tracer = self._tracer
+        if tracer is not None:
+            tracer.record(SENT, data)
+        self.send_callback(data)
+        if responses is not None:
+            self._schedule(responses)
+
+    def _match(self, data):
+        """
+        Advance the recording to the next sent line equal to ``data``.
+
+        Internal use only.
+
+        :return: Received lines following the sent line as ``(delay, line)``
+                 tuples, or ``None`` if the line is not in the recording.
+        :rtype: list[tuple[float, str]] | None
+        """
+        with self._condition:
+            for index in range(self._position + 1, len(self._segments)):
+                line, responses = self._segments[index]
+                if line == data:
+                    self._position = index
+                    return responses
+                if self._strict:
+                    break
+        if self._strict:
+            expected = self._segments[self._position + 1][0] if self.remaining else None
+            raise RuntimeError(
+                f"Sent line does not match recording: expected '{expected}', got '{data}'"
+            )
+        return None
+
+    def _schedule(self, responses):
+        """
+        Schedule received lines relative to now.
+
+        Internal use only.
+        """
+        if not responses:
+            return
+        now = time.monotonic()
+        speed = self._speed
+        with self._condition:
+            for delay, line in responses:
+                due = now + delay / speed if speed else now
+                heapq.heappush(self._pending, (due, next(self._sequence), line))
+            self._condition.notify()
+
+    def _run(self):
+        """
+        Replay thread main loop, delivering due lines to :meth:`receive`.
+
+        Internal use only.
+        """
+        while True:
+            with self._condition:
+                while self._running:
+                    if self._pending:
+                        timeout = self._pending[0][0] - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+                _, _, line = heapq.heappop(self._pending)
+            self.receive(line)
+
+    @staticmethod
+    def _split(records):
+        """
+        Split records into segments, each a sent line and the received lines
+        following it with their delay in seconds.
+
+        The first segment has no sent line and holds the lines received
+        before the first sent line, timed relative to the first record.
+
+        Internal use only.
+        """
+        segments = [[None, []]]
+        origin = None
+        for record in records:
+            if origin is None:
+                origin = record.timestamp
+            if record.direction == SENT:
+                segments.append([record.line, []])
+                origin = record.timestamp
+            elif record.direction == RECEIVED:
+                segments[-1][1].append((record.timestamp - origin, record.line))
+        return [tuple(segment) for segment in segments]
@@ -4,8 +4,36 @@ Observer utilities for event-driven notifications.
 This module provides a lightweight implementation of the Observer
 design pattern, allowing callables to subscribe to and be notified
 of events emitted by an observable source.
+
+Besides plain subscriptions, which are notified on every event, observers
+can be subscribed under a key. Keyed observers are only notified when the
+first positional argument passed to :meth:`Observer.call` equals their key,
+which is resolved by a single dictionary lookup instead of calling every
+subscriber.
+
+Every subscription is identified by a handle returned from
+:meth:`Observer.subscribe` or :meth:`Observer.subscribe_key`, which allows
+removing it again via :meth:`Observer.unsubscribe_handle` without searching
+for a matching definition.
+
+Dispatch is lock-free: subscribing and unsubscribing replace immutable
+snapshot tuples under a lock (copy-on-write), while :meth:`Observer.call`
+iterates whichever snapshot it picked up. Observers may therefore subscribe
+and unsubscribe from other threads while an event is being dispatched.
+Replacing a snapshot takes time linear in the number of observers it
+holds: all plain observers, or the observers of a single key.
+
+By default an exception raised by an observer aborts the dispatch. With
+error isolation enabled, every observer is called and failures are collected
+in an error channel instead (see :attr:`Observer.error_count`,
+:attr:`Observer.last_error` and :meth:`Observer.error_callback`).
 """
 
+import itertools
+import threading
+
+_NO_KEY = object()
+
 
 class Observer:
     """
@@ -15,21 +43,44 @@ class Observer:
     Each observer may be registered with predefined positional and keyword arguments.
     When the event is triggered via :meth:`call`, all subscribed observers are invoked.
 
+    Observers subscribed with :meth:`subscribe_key` are only invoked if the
+    first positional argument of :meth:`call` equals their key. They are
+    notified before the plain observers.
+
     See also:
         :class:`DeviceConnection` for usage with serial receive events.
         :class:`WaitForResponse` and :class:`SubmitTask` for task-response subscription patterns.
     """
 
-    def __init__(self):
+    def __init__(self, isolate_errors=False):
         """
-        Initializes the Observer object with an empty list of observers.
+        Initializes the Observer object without any observers.
+
+        :param isolate_errors: If ``True``, exceptions raised by observers are
+                               collected instead of aborting :meth:`call`.
+        :type isolate_errors: bool
 
         Each observer is a dictionary with keys:
             - ``target``: The callable to invoke.
             - ``arguments``: Positional arguments for the callable.
             - ``kwarguments``: Keyword arguments for the callable.
+
+        Observers are stored in insertion-ordered dictionaries keyed by their
+        subscription handle. Keyed observers are stored per key. Every change
+        publishes a new snapshot tuple of the affected observers, which is
+        what :meth:`call` iterates.
         """
-        self._observers = []
+        self._lock = threading.Lock()
+        self._handles = itertools.count(1)
+        self._subscriptions = {}
+        self._index = {}
+        self._observers = {}
+        self._keyed_observers = {}
+        self._snapshot = ()
+        self._keyed_snapshots = {}
+        self._isolate_errors = bool(isolate_errors)
+        self._error_count = 0
+        self._last_error = None
 
     @property
     def observers(self):
@@ -39,7 +90,76 @@ class Observer:
         :return: List of observer definitions (dicts with keys ``target``, ``arguments``, ``kwarguments``).
         :rtype: list
         """
-        return self._observers
+        return list(self._snapshot)
+
+    @property
+    def keyed_observers(self):
+        """
+        Return the currently subscribed keyed observers.
+
+        :return: Dictionary mapping each key to its list of observer definitions.
+        :rtype: dict
+        """
+        keyed_snapshots = dict(self._keyed_snapshots)
+        return {key: list(observers) for key, observers in keyed_snapshots.items()}
+
+    @property
+    def isolate_errors(self):
+        """
+        Whether exceptions raised by observers are isolated.
+
+        If ``True``, :meth:`call` invokes every observer even if some of them
+        fail. Failures are counted, stored in :attr:`last_error` and passed to
+        :meth:`error_callback`.
+
+        :rtype: bool
+        """
+        return self._isolate_errors
+
+    @isolate_errors.setter
+    def isolate_errors(self, value):
+        """
+        Enable or disable error isolation.
+
+        :param value: ``True`` to isolate observer errors.
+        :type value: bool
+        """
+        self._isolate_errors = bool(value)
+
+    @property
+    def error_count(self):
+        """
+        Number of observer failures collected while error isolation was enabled.
+
+        :rtype: int
+        """
+        return self._error_count
+
+    @property
+    def last_error(self):
+        """
+        Most recent observer failure collected while error isolation was enabled.
+
+        The exception is a :class:`TypeError` or :class:`RuntimeError` with the
+        original exception as its ``__cause__``.
+
+        :rtype: Exception | None
+        """
+        return self._last_error
+
+    def error_callback(self, exception, observer):
+        """
+        Optional hook invoked when an observer fails while error isolation is enabled.
+
+        Override in subclasses or monkey patch to implement custom handling.
+        Exceptions raised by this hook are ignored.
+
+        :param exception: Collected exception, chained to the original one.
+        :type exception: Exception
+        :param observer: Definition of the failing observer.
+        :type observer: dict
+        """
+        pass
 
     def call(self, *args, **kwargs):
         """
@@ -48,38 +168,93 @@ class Observer:
         Each observer is called with its predefined arguments (set at subscription via :meth:`subscribe`)
         followed by the additional arguments provided here.
 
+        Keyed observers subscribed under the first positional argument are
+        invoked first, followed by all plain observers. The observers are
+        taken from the snapshot current at the time of the call, so changes
+        made by other threads during dispatch take effect with the next call.
+
+        :param args: Additional positional arguments passed to each observer.
+        :param kwargs: Additional keyword arguments passed to each observer.
+        :raises TypeError: If an observer raises a TypeError (argument mismatch)
+                           and errors are not isolated.
+        :raises RuntimeError: If any other exception occurs while calling an observer
+                              and errors are not isolated.
+        """
+        self.call_keyed(*args, **kwargs)
+        self.call_plain(*args, **kwargs)
+
+    def call_keyed(self, *args, **kwargs):
+        """
+        Invoke only the keyed observers subscribed under the first positional argument.
+
+        Together with :meth:`call_plain` this allows to split a :meth:`call`,
+        e.g. to run the keyed observers immediately and defer the plain ones.
+
         :param args: Additional positional arguments passed to each observer.
         :param kwargs: Additional keyword arguments passed to each observer.
-        :raises TypeError: If an observer raises a TypeError (argument mismatch).
-        :raises RuntimeError: If any other exception occurs while calling an observer.
+        :raises TypeError: If an observer raises a TypeError (argument mismatch)
+                           and errors are not isolated.
+        :raises RuntimeError: If any other exception occurs while calling an observer
+                              and errors are not isolated.
         """
-        for observer in self._observers:
+        keyed_snapshots = self._keyed_snapshots
+        if args and keyed_snapshots:
             try:
-                observer['target'](*observer['arguments'], *args, **observer['kwarguments'], **kwargs)
-            except TypeError as e:
-                raise TypeError(
-                    "Wrong number of arguments when calling observer!"
-                ) from e
-            except Exception as e:
-                raise RuntimeError(
-                    "An exception occurred while calling observer!"
-                ) from e
+                keyed_observers = keyed_snapshots.get(args[0], ())
+            except TypeError:
+                return
+            for observer in keyed_observers:
+                self._notify(observer, args, kwargs)
+
+    def call_plain(self, *args, **kwargs):
+        """
+        Invoke only the plain observers, i.e. those not subscribed under a key.
+
+        :param args: Additional positional arguments passed to each observer.
+        :param kwargs: Additional keyword arguments passed to each observer.
+        :raises TypeError: If an observer raises a TypeError (argument mismatch)
+                           and errors are not isolated.
+        :raises RuntimeError: If any other exception occurs while calling an observer
+                              and errors are not isolated.
+        """
+        for observer in self._snapshot:
+            self._notify(observer, args, kwargs)
 
     def subscribe(self, target, *args, **kwargs):
         """
         Subscribe a new observer.
 
-        The observer will be invoked when :meth:`call` is executed.
+        The observer will be invoked when :meth:`call` is executed. Subscribing
+        the same target with the same arguments twice has no effect and returns
+        the handle of the existing subscription.
 
         :param target: The callable to be notified.
         :type target: callable
         :param args: Optional positional arguments for the callable.
         :param kwargs: Optional keyword arguments for the callable.
+        :return: Handle identifying the subscription.
+        :rtype: int
+        """
+        return self._add(_NO_KEY, target, args, kwargs)
 
+    def subscribe_key(self, key, target, *args, **kwargs):
         """
-        observer_to_subscribe = {'target': target, 'arguments': args, 'kwarguments': kwargs}
-        if observer_to_subscribe not in self._observers:
-            self._observers.append(observer_to_subscribe)
+        Subscribe a new observer under a key.
+
+        The observer will only be invoked when :meth:`call` is executed with
+        ``key`` as its first positional argument.
+
+        :param key: Hashable key the observer is registered for, e.g. an
+                    expected response string.
+        :type key: hashable
+        :param target: The callable to be notified.
+        :type target: callable
+        :param args: Optional positional arguments for the callable.
+        :param kwargs: Optional keyword arguments for the callable.
+        :return: Handle identifying the subscription.
+        :rtype: int
+        """
+        return self._add(key, target, args, kwargs)
 
     def unsubscribe(self, target: callable = None, *args, remove_all = False, **kwargs):
         """
@@ -87,7 +262,8 @@ class Observer:
 
         Behavior depends on the provided arguments:
 
-        - If no ``target`` is provided, all observers are removed.
+        - If no ``target`` is provided, all observers are removed, including
+          keyed observers.
         - If ``target`` is provided and ``remove_all`` is False, only the observer
           matching the target **and** provided arguments is removed.
         - If ``target`` is provided and ``remove_all`` is True, all observers
@@ -101,13 +277,223 @@ class Observer:
         :param kwargs: Keyword arguments used to match a specific subscription.
         """
         if target:
+            self._remove(_NO_KEY, target, args, kwargs, remove_all)
+        else:
+            with self._lock:
+                self._subscriptions.clear()
+                self._index.clear()
+                self._observers.clear()
+                self._keyed_observers.clear()
+                self._snapshot = ()
+                self._keyed_snapshots = {}
+
+    def unsubscribe_key(self, key, target: callable = None, *args, remove_all = False, **kwargs):
+        """
+        Unsubscribe keyed observers.
+
+        Behaves like :meth:`unsubscribe`, restricted to the observers
+        subscribed under ``key``.
+
+        :param key: Key the observers are registered for.
+        :type key: hashable
+        :param target: The observer callable to remove.
+        :type target: callable, optional
+        :param remove_all: Remove all observers matching the target if True.
+        :type remove_all: bool
+        :param args: Positional arguments used to match a specific subscription.
+        :param kwargs: Keyword arguments used to match a specific subscription.
+        """
+        if target:
+            self._remove(key, target, args, kwargs, remove_all)
+        else:
+            with self._lock:
+                for handle in list(self._bucket(key)):
+                    self._discard(handle)
+                self._publish(key)
+
+    def unsubscribe_handle(self, handle):
+        """
+        Remove a single subscription by its handle.
+
+        The subscription is found by a dictionary lookup; only the snapshot
+        of its key (or of the plain observers) is rebuilt.
+
+        Unknown or already removed handles are ignored.
+
+        :param handle: Handle returned by :meth:`subscribe` or :meth:`subscribe_key`.
+        :type handle: int
+        """
+        with self._lock:
+            key = self._discard(handle)
+            if key is not None:
+                self._publish(key)
+
+    def _add(self, key, target, args, kwargs):
+        """
+        Register an observer definition under ``key``.
+
+        Internal use only.
+
+        :return: Handle of the new or already existing subscription.
+        :rtype: int
+        """
+        signature = self._signature(key, target, args, kwargs)
+        with self._lock:
+            handle = self._find(key, target, args, kwargs, signature)
+            if handle is not None:
+                return handle
+            handle = next(self._handles)
+            observer = {'target': target, 'arguments': args, 'kwarguments': kwargs}
+            if key is _NO_KEY:
+                self._observers[handle] = observer
+            else:
+                self._keyed_observers.setdefault(key, {})[handle] = observer
+            self._subscriptions[handle] = (key, signature)
+            if signature is not None:
+                self._index[signature] = handle
+            self._publish(key)
+        return handle
+
+    def _discard(self, handle):
+        """
+        Remove a subscription from the internal dictionaries.
+
+        Must be called with the lock held. The snapshot is not updated.
+
+        Internal use only.
+
+        :return: Key of the removed subscription, or ``None`` if the handle is unknown.
+        """
+        subscription = self._subscriptions.pop(handle, None)
+        if subscription is None:
+            return None
+        key, signature = subscription
+        if signature is not None:
+            self._index.pop(signature, None)
+        if key is _NO_KEY:
+            del self._observers[handle]
+        else:
+            observers = self._keyed_observers[key]
+            del observers[handle]
+            if not observers:
+                del self._keyed_observers[key]
+        return key
+
+    def _publish(self, key):
+        """
+        Replace the snapshot of the observers registered under ``key``.
+
+        Must be called with the lock held. Readers keep iterating the snapshot
+        they already picked up. The tuple of a key is swapped in place, so
+        the cost is linear in the observers of that key only, independent of
+        the number of keys.
+
+        Internal use only.
+        """
+        if key is _NO_KEY:
+            self._snapshot = tuple(self._observers.values())
+            return
+        observers = self._keyed_observers.get(key)
+        if observers:
+            self._keyed_snapshots[key] = tuple(observers.values())
+        else:
+            self._keyed_snapshots.pop(key, None)
+
+    def _find(self, key, target, args, kwargs, signature):
+        """
+        Return the handle of the subscription matching the given definition.
+
+        Hashable definitions are resolved through the index, others by
+        comparing against the subscriptions registered under ``key``.
+
+        Internal use only.
+
+        :return: Matching handle or ``None``.
+        :rtype: int | None
+        """
+        if signature is not None:
+            return self._index.get(signature)
+        observer_to_find = {'target': target, 'arguments': args, 'kwarguments': kwargs}
+        for handle, observer in self._bucket(key).items():
+            if observer == observer_to_find:
+                return handle
+        return None
+
+    def _remove(self, key, target, args, kwargs, remove_all):
+        """
+        Remove subscriptions under ``key`` matching the target.
+
+        Internal use only.
+        """
+        signature = self._signature(key, target, args, kwargs)
+        with self._lock:
             if not remove_all:
-                observer_to_unsubscribe = {'target': target, 'arguments': args, 'kwarguments': kwargs}
-                if observer_to_unsubscribe in self._observers:
-                    self._observers.remove(observer_to_unsubscribe)
+                handle = self._find(key, target, args, kwargs, signature)
+                if handle is not None:
+                    self._discard(handle)
             else:
-                for observer in self._observers[:]:
+                for handle, observer in list(self._bucket(key).items()):
                     if observer['target'] == target:
-                        self._observers.remove(observer)
+                        self._discard(handle)
+            self._publish(key)
+
+    def _bucket(self, key):
+        """
+        Return the handle-to-observer mapping for ``key``.
+
+        Internal use only.
+
+        :rtype: dict
+        """
+        if key is _NO_KEY:
+            return self._observers
+        return self._keyed_observers.get(key, {})
+
+    @staticmethod
+    def _signature(key, target, args, kwargs):
+        """
+        Build a hashable signature for an observer definition.
+
+        Internal use only.
+
+        :return: Signature tuple, or ``None`` if the definition is not hashable.
+        :rtype: tuple | None
+        """
+        try:
+            signature = (key, target, args, frozenset(kwargs.items()) if kwargs else None)
+            hash(signature)
+        except TypeError:
+            return None
+        return signature
+
+    def _notify(self, observer, args, kwargs):
+        """
+        Invoke a single observer definition.
+
+        Internal use only.
+
+        :param observer: Observer definition to invoke.
+        :type observer: dict
+        :param args: Additional positional arguments passed to the observer.
+        :param kwargs: Additional keyword arguments passed to the observer.
+        :raises TypeError: If the observer raises a TypeError (argument mismatch).
+        :raises RuntimeError: If any other exception occurs while calling the observer.
+        """
+        try:
+            observer['target'](*observer['arguments'], *args, **observer['kwarguments'], **kwargs)
+        except TypeError as e:
+            error = TypeError("Wrong number of arguments when calling observer!")
+            error.__cause__ = e
+        except Exception as e:
+            error = RuntimeError("An exception occurred while calling observer!")
+            error.__cause__ = e
         else:
-            self._observers.clear()
+            return
+        if not self._isolate_errors:
+            raise error
+        self._error_count += 1
+        self._last_error = error
+        try:
+            self.error_callback(error, observer)
+        except Exception:
+            pass
@@ -0,0 +1,468 @@
+"""
+Controller simulator for testing without hardware.
+
+This module provides a software stand-in for the imaging controller. The
+simulator speaks the same line-based protocol as the controller firmware
+(see :class:`_Task`), including the ready banner, the ``connect`` handshake,
+shutter, linear and rotation movements and the stop commands.
+
+The simulator is attached through a pseudo terminal (POSIX only) or a TCP
+socket, so an unmodified :class:`DeviceConnection` can connect to it either
+via the device path of the pseudo terminal or via a ``socket://`` URL.
+Motion durations, random jitter and dropped replies are configurable, which
+makes it suitable for latency and throughput measurements.
+
+Example::
+
+    with ControllerSimulator(linear_time=0.5) as simulator:
+        with DeviceConnection(simulator.start_socket()) as connection:
+            Controller(connection).ready(timeout=5)
+            Sample(connection).move_in(timeout=5)
+"""
+
+import collections
+import os
+import random
+import select
+import socket
+import threading
+
+from .controller_api import _Task
+
+# pyserial discards all input received while a socket:// port is being
+# opened, so the ready banner of a socket client is delayed at least this
+# long, in seconds. A real controller boots long after the port was opened.
+_SOCKET_BOOT_TIME = 0.1
+
+
+class _PtyTransport:
+    """
+    Pseudo terminal transport of the simulator.
+
+    The simulator uses the master side, the device connection opens the
+    slave device path. The slave is kept open and switched to raw mode so
+    that written lines are neither echoed nor translated.
+
+    Internal use only.
+    """
+
+    def __init__(self):
+        import tty
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+
+    def read(self, timeout):
+        """
+        Read available bytes, or return ``b''`` if none arrive within ``timeout``.
+        """
+        readable, _, _ = select.select([self._master], [], [], timeout)
+        if not readable:
+            return b""
+        try:
+            return os.read(self._master, 4096)
+        except OSError:
+            return b""
+
+    def write(self, data):
+        """
+        Write bytes to the device connection.
+        """
+        os.write(self._master, data)
+
+    def close(self):
+        """
+        Close both sides of the pseudo terminal.
+        """
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class _SocketTransport:
+    """
+    TCP socket transport of the simulator.
+
+    Accepts a single client at a time. A new client replaces the previous
+    one and triggers the ready banner, like a controller reset when the
+    serial port is opened.
+
+    Internal use only.
+    """
+
+    def __init__(self, host, port, on_connect):
+        self._server = socket.create_server((host, port))
+        self._server.setblocking(False)
+        self._client = None
+        self._on_connect = on_connect
+        host, port = self._server.getsockname()[:2]
+        self.port = f"socket://{host}:{port}"
+
+    def read(self, timeout):
+        """
+        Accept new clients and read available bytes, or return ``b''`` if
+        none arrive within ``timeout``.
+        """
+        sockets = [self._server] if self._client is None else [self._server, self._client]
+        try:
+            readable, _, _ = select.select(sockets, [], [], timeout)
+        except (OSError, ValueError):
+            # The client was closed by another thread, e.g. to simulate a
+            # lost connection.
+            return b""
+        if self._server in readable:
+            client, _ = self._server.accept()
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._close_client()
+            self._client = client
+            self._on_connect()
+            return b""
+        if self._client is not None and self._client in readable:
+            try:
+                data = self._client.recv(4096)
+            except OSError:
+                data = b""
+            if not data:
+                self._close_client()
+            return data
+        return b""
+
+    def write(self, data):
+        """
+        Write bytes to the connected client, if any.
+        """
+        client = self._client
+        if client is not None:
+            try:
+                client.sendall(data)
+            except OSError:
+                pass
+
+    def close(self):
+        """
+        Close the client and server sockets.
+        """
+        self._close_client()
+        self._server.close()
+
+    def _close_client(self):
+        """
+        Close the current client connection.
+        """
+        client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+
+class ControllerSimulator:
+    """
+    Simulate the imaging controller firmware.
+
+    Received commands are answered with the responses defined in
+    :class:`_Task` after the configured motion durations. Like the command
+    buffer of the firmware, commands of the same axis are queued and
+    executed one after another in order of arrival, so tasks can be
+    pipelined. Stop commands cancel the running and queued motions of the
+    stopped axes and are answered immediately.
+
+    The simulator can be used as a context manager, which calls :meth:`stop`
+    on exit.
+
+    :param shutter_time: Duration of opening or closing the shutter, in seconds.
+    :type shutter_time: float
+    :param linear_time: Duration of moving the sample in or out, in seconds.
+    :type linear_time: float
+    :param rotation_step_time: Duration of a single rotation step, in seconds.
+    :type rotation_step_time: float
+    :param jitter: Maximum random delay added to every reply, in seconds.
+    :type jitter: float
+    :param drop_rate: Probability between 0 and 1 that a reply is not sent.
+    :type drop_rate: float
+    :param boot_time: Delay before the ready banner is sent after a reset, in seconds.
+    :type boot_time: float
+    :param seed: Seed for the random generator used for jitter and drops.
+    :type seed: int | None
+    """
+
+    def __init__(
+        self,
+        shutter_time=0.0,
+        linear_time=0.0,
+        rotation_step_time=0.0,
+        jitter=0.0,
+        drop_rate=0.0,
+        boot_time=0.0,
+        seed=None,
+    ):
+        if not 0 <= drop_rate <= 1:
+            raise ValueError(f"Invalid drop rate: must be between 0 and 1, got '{drop_rate}'")
+        self.shutter_time = shutter_time
+        self.linear_time = linear_time
+        self.rotation_step_time = rotation_step_time
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.boot_time = boot_time
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._queues = {}
+        self._commands = []
+        self._transport = None
+        self._thread = None
+        self._running = threading.Event()
+
+    @property
+    def commands(self):
+        """
+        Commands received so far, in order of arrival.
+
+        :rtype: list[str]
+        """
+        with self._lock:
+            return list(self._commands)
+
+    @property
+    def port(self):
+        """
+        Port to pass to :class:`DeviceConnection`.
+
+        :return: Device path of the pseudo terminal, ``socket://`` URL,
+                 or ``None`` if the simulator is not running.
+        :rtype: str | None
+        """
+        return self._transport.port if self._transport is not None else None
+
+    def start_pty(self):
+        """
+        Start the simulator on a new pseudo terminal.
+
+        Only available on POSIX systems. Since opening a pseudo terminal does
+        not reset the simulator, call :meth:`reset` to send the ready banner.
+
+        :return: Device path to connect to.
+        :rtype: str
+        :raises RuntimeError: If the simulator is already running.
+        """
+        self._start(_PtyTransport())
+        return self.port
+
+    def start_socket(self, host="127.0.0.1", port=0):
+        """
+        Start the simulator on a TCP socket.
+
+        Every new client connection resets the simulator and sends the ready
+        banner after :attr:`boot_time`, but not earlier than 0.1 seconds
+        after the client connected, since the client discards input received
+        while opening the port.
+
+        :param host: Host address to listen on.
+        :type host: str
+        :param port: TCP port to listen on, ``0`` selects a free port.
+        :type port: int
+        :return: ``socket://`` URL to connect to.
+        :rtype: str
+        :raises RuntimeError: If the simulator is already running.
+        """
+        self._start(_SocketTransport(host, port, self._reset_socket_client))
+        return self.port
+
+    def stop(self):
+        """
+        Stop the simulator and close its transport.
+        """
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._cancel_timers()
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def reset(self):
+        """
+        Simulate a controller reset.
+
+        Cancels all movements and sends the ready banner after
+        :attr:`boot_time`.
+        """
+        self._cancel_timers()
+        self._reply("boot", _Task.READY.value.response, self.boot_time)
+
+    def _reset_socket_client(self):
+        """
+        Reset the simulator for a new socket client.
+
+        Internal use only.
+        """
+        self._cancel_timers()
+        self._reply("boot", _Task.READY.value.response, max(self.boot_time, _SOCKET_BOOT_TIME))
+
+    def handle_line(self, line):
+        """
+        Handle a single received command.
+
+        :param line: Command without line terminator.
+        :type line: str
+        """
+        with self._lock:
+            self._commands.append(line)
+        command, _, argument = line.partition("+")
+        if command == _Task.CONNECTED.value.task:
+            self._reply("connect", _Task.CONNECTED.value.response, 0)
+        elif command in (_Task.OPEN.value.task, _Task.CLOSE.value.task):
+            task = _Task.OPEN if command == _Task.OPEN.value.task else _Task.CLOSE
+            self._reply("shutter", task.value.response, self.shutter_time)
+        elif command in (_Task.MOVE_IN.value.task, _Task.MOVE_OUT.value.task):
+            task = _Task.MOVE_IN if command == _Task.MOVE_IN.value.task else _Task.MOVE_OUT
+            self._reply("linear", task.value.response, self.linear_time)
+        elif command in (_Task.ROTATE_CW.value.task, _Task.ROTATE_CCW.value.task):
+            try:
+                steps = int(argument)
+            except ValueError:
+                return
+            self._reply("rotation", _Task.ROTATE_CW.value.response, steps * self.rotation_step_time)
+        elif command == _Task.MOVE_STOP.value.task:
+            self._cancel_timers("linear")
+            self._reply("stop_linear", _Task.MOVE_STOP.value.response, 0)
+        elif command == _Task.ROTATE_STOP.value.task:
+            self._cancel_timers("rotation")
+            self._reply("stop_rotation", _Task.ROTATE_STOP.value.response, 0)
+        elif command == _Task.STOP.value.task:
+            self._cancel_timers("linear", "rotation")
+            self._reply("stop_all", _Task.STOP.value.response, 0)
+
+    def _start(self, transport):
+        """
+        Start the reader thread on the given transport.
+
+        Internal use only.
+        """
+        if self._running.is_set():
+            transport.close()
+            raise RuntimeError("Simulator already running")
+        self._transport = transport
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="imcntr-simulator", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """
+        Reader thread main loop, splitting received bytes into lines.
+
+        Internal use only.
+        """
+        buffer = bytearray()
+        while self._running.is_set():
+            data = self._transport.read(0.05)
+            if not data:
+                continue
+            buffer.extend(data)
+            while True:
+                end = buffer.find(b"\n")
+                if end < 0:
+                    break
+                line = bytes(buffer[:end]).rstrip(b"\r")
+                del buffer[:end + 1]
+                self.handle_line(line.decode("ascii", "replace"))
+
+    def _reply(self, axis, response, delay):
+        """
+        Queue a motion of ``delay`` plus jitter on ``axis``, answered with ``response``.
+
+        The motion starts once the previous motions of the axis have
+        finished. A dropped reply still takes its motion time.
+
+        Internal use only.
+        """
+        send = not (self.drop_rate and self._random.random() < self.drop_rate)
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        with self._lock:
+            self._queues.setdefault(axis, collections.deque()).append((response, delay, send))
+        self._advance(axis)
+
+    def _advance(self, axis):
+        """
+        Start the next queued motion of an axis, unless one is running.
+
+        Replies without delay are sent immediately.
+
+        Internal use only.
+        """
+        while True:
+            with self._lock:
+                queue = self._queues.get(axis)
+                if axis in self._timers or not queue:
+                    return
+                response, delay, send = queue.popleft()
+                if delay > 0:
+                    timer = threading.Timer(delay, self._complete, (axis, response, send))
+                    timer.daemon = True
+                    self._timers[axis] = timer
+                    timer.start()
+                    return
+            if send:
+                self._write(response)
+
+    def _complete(self, axis, response, send):
+        """
+        Timer callback finishing a motion and starting the next one.
+
+        Internal use only.
+        """
+        with self._lock:
+            if self._timers.get(axis) is not threading.current_thread():
+                return
+            del self._timers[axis]
+        if send:
+            self._write(response)
+        self._advance(axis)
+
+    def _cancel_timers(self, *axes):
+        """
+        Cancel the running and queued motions of the given axes, or of all
+        axes if none are given.
+
+        Internal use only.
+        """
+        with self._lock:
+            if not axes:
+                axes = set(self._timers) | set(self._queues)
+            timers = [self._timers.pop(axis) for axis in axes if axis in self._timers]
+            for axis in axes:
+                self._queues.pop(axis, None)
+        for timer in timers:
+            timer.cancel()
+
+    def _write(self, response):
+        """
+        Write a response line to the transport.
+
+        Internal use only.
+        """
+        transport = self._transport
+        if transport is not None:
+            transport.write(response.encode("ascii") + b"\r\n")
+
+    def __enter__(self):
+        """
+        Enter context manager.
+
+        :return: This instance.
+        :rtype: ControllerSimulator
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit context manager and stop the simulator.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        self.stop()
+        return False
@@ -0,0 +1,301 @@
+"""
+Streaming access to the received lines.
+
+This module provides :class:`LineStream`, a bounded buffer of received lines
+returned by :meth:`DeviceConnection.lines` and :meth:`DeviceConnection.alines`.
+The reader thread only appends to the buffer and never waits for the
+consumer, so several independent consumers can each tap the line stream
+without slowing down the reader thread.
+
+If a consumer falls behind and its buffer is full, the ``policy`` decides
+which line is discarded:
+
+- :data:`DROP_OLDEST`: the oldest buffered line, keeping the most recent ones.
+- :data:`DROP_NEWEST`: the received line, keeping the buffered ones.
+
+Discarded lines are counted in :attr:`LineStream.dropped`.
+
+Example::
+
+    with connection.lines(maxsize=256) as lines:
+        for line in lines:
+            pipeline.process(line)
+
+    async for line in connection.alines():
+        await pipeline.process(line)
+"""
+
+import asyncio
+import collections
+import threading
+
+from .dispatch import DROP_OLDEST, DROP_NEWEST
+
+_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+
+class LineStream:
+    """
+    Iterate over received lines through a bounded buffer.
+
+    A stream is iterable with ``for`` and ``async for`` and meant for a
+    single consumer; create one stream per consumer. Iteration ends once the
+    connection is closed and all buffered lines have been consumed. If the
+    connection was lost due to an error, :class:`ConnectionLostError` is
+    raised instead.
+
+    The stream can be used as a context manager, which calls :meth:`close`
+    on exit.
+
+    :param maxsize: Maximum number of buffered lines.
+    :type maxsize: int
+    :param policy: Line discarded if the buffer is full, one of
+                   :data:`DROP_OLDEST` or :data:`DROP_NEWEST`.
+    :type policy: str
+    :param detach: Optional callable invoked with the stream when it is
+                   closed, used by the connection to stop feeding it.
+    :type detach: Callable[[LineStream], None] | None
+    """
+
+    def __init__(self, maxsize=1024, policy=DROP_OLDEST, detach=None):
+        if not isinstance(maxsize, int):
+            raise TypeError(f"Invalid maxsize: must be of type int, got '{type(maxsize).__name__}'")
+        if maxsize <= 0:
+            raise ValueError(f"Invalid maxsize: must be non-zero positive number, got '{maxsize}'")
+        if policy not in _POLICIES:
+            raise ValueError(
+                f"Invalid policy: must be one of {', '.join(_POLICIES)}, got '{policy}'"
+            )
+        self._maxsize = maxsize
+        self._policy = policy
+        self._detach = detach
+        self._buffer = collections.deque()
+        self._condition = threading.Condition()
+        self._waiter = None
+        self._received = 0
+        self._dropped = 0
+        self._ended = False
+        self._error = None
+
+    @property
+    def maxsize(self):
+        """
+        Maximum number of buffered lines.
+
+        :rtype: int
+        """
+        return self._maxsize
+
+    @property
+    def policy(self):
+        """
+        Line discarded if the buffer is full.
+
+        :rtype: str
+        """
+        return self._policy
+
+    @property
+    def pending(self):
+        """
+        Number of buffered lines.
+
+        :rtype: int
+        """
+        return len(self._buffer)
+
+    @property
+    def received(self):
+        """
+        Number of lines offered to the stream, including dropped ones.
+
+        :rtype: int
+        """
+        return self._received
+
+    @property
+    def dropped(self):
+        """
+        Number of lines discarded because the buffer was full.
+
+        :rtype: int
+        """
+        return self._dropped
+
+    @property
+    def ended(self):
+        """
+        Whether the stream receives no further lines.
+
+        :rtype: bool
+        """
+        return self._ended
+
+    def put(self, line):
+        """
+        Append a received line without blocking.
+
+        Called by :class:`DeviceConnection` in the serial reader thread.
+        Lines put after the stream has ended are ignored.
+
+        :param line: Received line.
+        :type line: str
+        """
+        with self._condition:
+            if self._ended:
+                return
+            self._received += 1
+            if len(self._buffer) >= self._maxsize:
+                self._dropped += 1
+                if self._policy == DROP_NEWEST:
+                    return
+                self._buffer.popleft()
+            self._buffer.append(line)
+            self._condition.notify()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            _wake(waiter)
+
+    def finish(self, error=None):
+        """
+        End the stream once the buffered lines have been consumed.
+
+        Called by :class:`DeviceConnection` when the connection is closed or
+        lost.
+
+        :param error: Exception raised by the consumer after the buffered
+                      lines, or ``None`` to end the iteration normally.
+        :type error: Exception | None
+        """
+        with self._condition:
+            if self._ended:
+                return
+            self._ended = True
+            self._error = error
+            self._condition.notify_all()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            _wake(waiter)
+
+    def close(self):
+        """
+        Stop receiving lines and discard the buffered ones.
+
+        A pending iteration ends. Closing a stream twice has no effect.
+        """
+        detach, self._detach = self._detach, None
+        if detach is not None:
+            detach(self)
+        with self._condition:
+            self._buffer.clear()
+        self.finish()
+
+    def _next_line(self):
+        """
+        Pop the next buffered line. Must be called with the lock held.
+
+        Internal use only.
+
+        :return: Whether a line is available, and the line.
+        :rtype: tuple[bool, str | None]
+        :raises Exception: The error passed to :meth:`finish`, once the
+                           buffer is empty.
+        """
+        if self._buffer:
+            return True, self._buffer.popleft()
+        if self._ended and self._error is not None:
+            raise self._error
+        return False, None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """
+        Block until the next line is received.
+
+        :rtype: str
+        :raises StopIteration: If the stream has ended.
+        :raises ConnectionLostError: If the connection was lost.
+        """
+        with self._condition:
+            while True:
+                available, line = self._next_line()
+                if available:
+                    return line
+                if self._ended:
+                    raise StopIteration
+                self._condition.wait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """
+        Await the next line without blocking the event loop.
+
+        :rtype: str
+        :raises StopAsyncIteration: If the stream has ended.
+        :raises ConnectionLostError: If the connection was lost.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                available, line = self._next_line()
+                if available:
+                    return line
+                if self._ended:
+                    raise StopAsyncIteration
+                future = loop.create_future()
+                self._waiter = (loop, future)
+            try:
+                await future
+            finally:
+                with self._condition:
+                    if self._waiter is not None and self._waiter[1] is future:
+                        self._waiter = None
+
+    def __enter__(self):
+        """
+        Enter context manager.
+
+        :return: This instance.
+        :rtype: LineStream
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit context manager and close the stream.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        self.close()
+        return False
+
+
+def _wake(waiter):
+    """
+    Resolve the future of a waiting asynchronous consumer.
+
+    Internal use only.
+
+    :param waiter: Event loop and future of the consumer.
+    :type waiter: tuple[asyncio.AbstractEventLoop, asyncio.Future]
+    """
+    loop, future = waiter
+    try:
+        loop.call_soon_threadsafe(_set_result, future)
+    except RuntimeError:
+        pass
+
+
+def _set_result(future):
+    """
+    Resolve a future unless it is already done.
+
+    Internal use only.
+    """
+    if not future.done():
+        future.set_result(None)
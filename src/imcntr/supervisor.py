@@ -0,0 +1,332 @@
+"""
+Automatic reconnection after connection loss.
+
+This module provides :class:`ReconnectSupervisor`, which watches a
+:class:`DeviceConnection` and reopens it after an unexpected connection
+loss, e.g. a USB glitch. Reconnection attempts are retried with exponential
+backoff. After the port has been reopened, the supervisor waits for the
+controller's ready banner and repeats the ``connect`` handshake, so the
+connection is in the same state as after the initial setup.
+
+Pending waits raise :class:`ConnectionLostError` immediately when the
+connection is lost. Scan logic can use
+:meth:`ReconnectSupervisor.wait_connected` to wait for the reconnection and
+retry the failed task.
+
+Example::
+
+    with DeviceConnection("/dev/ttyACM0") as connection:
+        with ReconnectSupervisor(connection) as supervisor:
+            sample = Sample(connection)
+            while True:
+                try:
+                    sample.move_out(timeout=60)
+                    break
+                except ConnectionLostError:
+                    if not supervisor.wait_connected(timeout=120):
+                        raise
+"""
+
+import threading
+
+from .controller_api import _Task
+from .device_command_handler import SubmitTask
+
+
+class ReconnectSupervisor:
+    """
+    Reopen a device connection after it has been lost.
+
+    Only losses caused by an error trigger a reconnection; closing the
+    connection via :meth:`DeviceConnection.disconnect` does not. Between
+    attempts the supervisor waits ``initial_delay`` seconds, multiplied by
+    ``factor`` after every failed attempt up to ``max_delay``.
+
+    The supervisor can be used as a context manager, which calls
+    :meth:`close` on exit.
+
+    :param connection: Supervised device connection.
+    :type connection: :class:`DeviceConnection`
+    :param initial_delay: Delay before the first attempt, in seconds.
+    :type initial_delay: float
+    :param max_delay: Maximum delay between attempts, in seconds.
+    :type max_delay: float
+    :param factor: Multiplier applied to the delay after a failed attempt.
+    :type factor: float
+    :param max_attempts: Number of attempts before giving up, or ``None``
+                         to retry until :meth:`close` is called.
+    :type max_attempts: int | None
+    :param ready_timeout: Time to wait for the ready banner and for the
+                          handshake response, in seconds.
+    :type ready_timeout: float
+    :param wait_ready: Whether to wait for the ready banner after reopening
+                       the port, which the controller sends after its reset.
+    :type wait_ready: bool
+    :param handshake: Whether to repeat the ``connect`` handshake.
+    :type handshake: bool
+    :param port_finder: Optional callable returning the port to reopen,
+                        e.g. :func:`discover_port`, for devices that may come
+                        back under a different name.
+    :type port_finder: Callable[[], str] | None
+    """
+
+    def __init__(
+        self,
+        connection,
+        initial_delay=0.5,
+        max_delay=30.0,
+        factor=2.0,
+        max_attempts=None,
+        ready_timeout=10.0,
+        wait_ready=True,
+        handshake=True,
+        port_finder=None,
+    ):
+        for name, value in (
+            ("initial delay", initial_delay),
+            ("max delay", max_delay),
+            ("ready timeout", ready_timeout),
+        ):
+            if not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"Invalid {name}: must be non-zero positive number, got '{value}'")
+        if not isinstance(factor, (int, float)) or factor < 1:
+            raise ValueError(f"Invalid factor: must be at least 1, got '{factor}'")
+        if max_attempts is not None and (not isinstance(max_attempts, int) or max_attempts <= 0):
+            raise ValueError(
+                f"Invalid max attempts: must be positive integer or None, got '{max_attempts}'"
+            )
+        self._connection = connection
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._factor = factor
+        self._max_attempts = max_attempts
+        self._ready_timeout = ready_timeout
+        self._wait_ready = wait_ready
+        self._handshake = handshake
+        self._port_finder = port_finder
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._connected = threading.Event()
+        if connection.connected:
+            self._connected.set()
+        self._thread = None
+        self._reconnecting = False
+        self._attempts = 0
+        self._reconnects = 0
+        self._last_error = None
+        self._handle = connection.connection_lost_observer.subscribe(self._connection_lost)
+
+    @property
+    def connection(self):
+        """
+        Supervised device connection.
+
+        :rtype: DeviceConnection
+        """
+        return self._connection
+
+    @property
+    def reconnecting(self):
+        """
+        Whether a reconnection is in progress.
+
+        :rtype: bool
+        """
+        return self._reconnecting
+
+    @property
+    def attempts(self):
+        """
+        Total number of reconnection attempts.
+
+        :rtype: int
+        """
+        return self._attempts
+
+    @property
+    def reconnects(self):
+        """
+        Number of successful reconnections.
+
+        :rtype: int
+        """
+        return self._reconnects
+
+    @property
+    def last_error(self):
+        """
+        Exception of the most recent loss or failed attempt, or ``None``.
+
+        :rtype: Exception | None
+        """
+        return self._last_error
+
+    def wait_connected(self, timeout=None):
+        """
+        Block until the connection is established.
+
+        Returns immediately if the connection is up.
+
+        :param timeout: Maximum time to wait in seconds, or ``None``.
+        :type timeout: float | None
+        :return: ``True`` if connected, ``False`` on timeout or if the
+                 supervisor gave up or was closed.
+        :rtype: bool
+        """
+        return self._connected.wait(timeout) and not self._closed.is_set()
+
+    def close(self):
+        """
+        Stop supervising the connection and abort a running reconnection.
+        """
+        self._closed.set()
+        self._connected.set()
+        if self._handle is not None:
+            self._connection.connection_lost_observer.unsubscribe_handle(self._handle)
+            self._handle = None
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def reconnected_callback(self):
+        """
+        Optional hook invoked after a successful reconnection.
+
+        Override in subclasses or monkey patch to implement custom handling.
+        """
+        pass
+
+    def failed_callback(self, exception):
+        """
+        Optional hook invoked when the supervisor gives up after ``max_attempts``.
+
+        Override in subclasses or monkey patch to implement custom handling.
+
+        :param exception: Exception of the last failed attempt.
+        :type exception: Exception
+        """
+        pass
+
+    def _connection_lost(self, exception):
+        """
+        Connection lost observer callback, starting the reconnection thread.
+
+        Invoked in the serial reader thread. Internal use only.
+
+        :param exception: Exception that caused the loss, or ``None`` if the
+                          connection was closed.
+        :type exception: Exception | None
+        """
+        if exception is None or self._closed.is_set():
+            return
+        with self._lock:
+            self._last_error = exception
+            self._connected.clear()
+            if self._reconnecting:
+                return
+            self._reconnecting = True
+            self._thread = threading.Thread(
+                target=self._run, name="imcntr-reconnect", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        """
+        Reconnection thread main loop.
+
+        The reconnection ends before :attr:`wait_connected` returns and
+        :meth:`reconnected_callback` is invoked, so a loss during the
+        callback starts a new reconnection.
+
+        Internal use only.
+        """
+        delay = self._initial_delay
+        attempt = 0
+        while not self._closed.wait(delay):
+            attempt += 1
+            self._attempts += 1
+            try:
+                self._reconnect()
+            except Exception as e:
+                self._last_error = e
+                try:
+                    self._connection.disconnect()
+                except Exception:
+                    pass
+                if self._max_attempts is not None and attempt >= self._max_attempts:
+                    self._give_up(e)
+                    return
+                delay = min(delay * self._factor, self._max_delay)
+                continue
+            self._reconnects += 1
+            with self._lock:
+                self._reconnecting = False
+                self._connected.set()
+            try:
+                self.reconnected_callback()
+            except Exception:
+                pass
+            return
+        self._reconnecting = False
+
+    def _reconnect(self):
+        """
+        Find and reopen the port, wait for the ready banner and repeat the handshake.
+
+        Internal use only.
+
+        :raises TimeoutError: If the controller does not answer in time.
+        """
+        connection = self._connection
+        if self._port_finder is not None:
+            connection.port = self._port_finder()
+        ready = threading.Event()
+        observer = connection.receive_observer
+        handle = observer.subscribe_key(_Task.READY.value.response, lambda data: ready.set())
+        try:
+            connection.connect()
+            if self._wait_ready and not ready.wait(self._ready_timeout):
+                raise TimeoutError("Controller did not report ready after reconnection")
+        finally:
+            observer.unsubscribe_handle(handle)
+        if self._handshake:
+            handshake = SubmitTask(
+                connection,
+                response=_Task.CONNECTED.value.response,
+                task=_Task.CONNECTED.value.task,
+            )
+            if not handshake(self._ready_timeout, wait=True):
+                raise TimeoutError("Controller did not answer the connect handshake")
+
+    def _give_up(self, exception):
+        """
+        Stop reconnecting and wake all threads waiting for the connection.
+
+        Internal use only.
+        """
+        self._closed.set()
+        self._reconnecting = False
+        self._connected.set()
+        try:
+            self.failed_callback(exception)
+        except Exception:
+            pass
+
+    def __enter__(self):
+        """
+        Enter context manager.
+
+        :return: This instance.
+        :rtype: ReconnectSupervisor
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit context manager and stop supervising.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        self.close()
+        return False
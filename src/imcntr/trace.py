@@ -0,0 +1,302 @@
+"""
+Trace recording of serial traffic.
+
+This module provides :class:`TraceRecorder`, which captures every sent and
+received line of a :class:`DeviceConnection` together with a monotonic
+timestamp. Recording only stores references in a preallocated ring buffer;
+encoding and writing happen in a background thread, so tracing can be kept
+enabled during long scans without slowing down the serial reader thread.
+
+Traces are written as a compact binary file: an 8 byte header followed by
+one record per line, consisting of a little-endian timestamp in
+nanoseconds, a direction byte and the length-prefixed UTF-8 encoded line.
+Use :func:`read_trace` to load them.
+
+Example::
+
+    with TraceRecorder("scan.trace") as tracer:
+        connection.tracer = tracer
+        Sample(connection).scan([10] * 360, timeout=5)
+
+    for record in read_trace("scan.trace"):
+        print(record.timestamp, record.direction, record.line)
+"""
+
+import collections
+import struct
+import threading
+import time
+
+SENT = "tx"
+RECEIVED = "rx"
+
+_MAGIC = b"IMTRACE1"
+_RECORD = struct.Struct("<QBI")
+_DIRECTIONS = (SENT, RECEIVED)
+_CODES = {SENT: 0, RECEIVED: 1}
+
+TraceRecord = collections.namedtuple("TraceRecord", ("timestamp", "direction", "line"))
+TraceRecord.__doc__ = """
+Single line of a recorded trace.
+
+:param timestamp: Monotonic time of the record in seconds.
+:type timestamp: float
+:param direction: :data:`SENT` or :data:`RECEIVED`.
+:type direction: str
+:param line: Line without terminator.
+:type line: str
+"""
+
+
+class TraceRecorder:
+    """
+    Record serial traffic into a trace file.
+
+    Records are kept in a ring buffer of ``capacity`` entries, which a
+    background thread flushes to ``path`` every ``flush_interval`` seconds.
+    If the buffer overflows before it is flushed, the oldest records are
+    discarded and counted in :attr:`dropped`.
+
+    Assign the recorder to :attr:`DeviceConnection.tracer` to trace a
+    connection. The recorder can be used as a context manager, which calls
+    :meth:`start` on entry and :meth:`stop` on exit.
+
+    :param path: Path of the trace file. An existing file is overwritten.
+    :type path: str | os.PathLike
+    :param capacity: Number of records the ring buffer can hold.
+    :type capacity: int
+    :param flush_interval: Interval between flushes, in seconds.
+    :type flush_interval: float
+    """
+
+    def __init__(self, path, capacity=65536, flush_interval=0.5):
+        if not isinstance(capacity, int):
+            raise TypeError(
+                f"Invalid capacity: must be of type int, got '{type(capacity).__name__}'"
+            )
+        if capacity <= 0:
+            raise ValueError(
+                f"Invalid capacity: must be non-zero positive number, got '{capacity}'"
+            )
+        if not isinstance(flush_interval, (int, float)) or flush_interval <= 0:
+            raise ValueError(
+                f"Invalid flush interval: must be non-zero positive number, got '{flush_interval}'"
+            )
+        self._path = path
+        self._capacity = capacity
+        self._flush_interval = flush_interval
+        self._timestamps = [0] * capacity
+        self._codes = [0] * capacity
+        self._lines = [None] * capacity
+        self._head = 0
+        self._tail = 0
+        self._dropped = 0
+        self._written = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._file = None
+        self._thread = None
+
+    @property
+    def path(self):
+        """
+        Path of the trace file.
+        """
+        return self._path
+
+    @property
+    def running(self):
+        """
+        Whether the recorder is started.
+
+        :rtype: bool
+        """
+        return self._file is not None
+
+    @property
+    def dropped(self):
+        """
+        Number of records discarded because the ring buffer overflowed.
+
+        :rtype: int
+        """
+        return self._dropped
+
+    @property
+    def written(self):
+        """
+        Number of records written to the trace file.
+
+        :rtype: int
+        """
+        return self._written
+
+    def start(self):
+        """
+        Open the trace file and start the flusher thread.
+
+        :raises RuntimeError: If the recorder is already running.
+        """
+        if self.running:
+            raise RuntimeError("Trace recorder already running")
+        with self._lock:
+            self._take()
+        self._file = open(self._path, "wb")
+        self._file.write(_MAGIC)
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="imcntr-trace", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the flusher thread, write all pending records and close the file.
+        """
+        if not self.running:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        with self._write_lock:
+            self._file.close()
+            self._file = None
+
+    def record(self, direction, line):
+        """
+        Record a line.
+
+        Lines recorded while the recorder is not running are discarded.
+
+        :param direction: :data:`SENT` or :data:`RECEIVED`.
+        :type direction: str
+        :param line: Line without terminator.
+        :type line: str
+        """
+        if self._file is None:
+            return
+        timestamp = time.monotonic_ns()
+        code = _CODES[direction]
+        with self._lock:
+            index = self._head % self._capacity
+            self._timestamps[index] = timestamp
+            self._codes[index] = code
+            self._lines[index] = line
+            self._head += 1
+            if self._head - self._tail > self._capacity:
+                self._tail += 1
+                self._dropped += 1
+
+    def flush(self):
+        """
+        Write all buffered records to the trace file.
+        """
+        with self._write_lock:
+            if self._file is None:
+                return
+            with self._lock:
+                records = self._take()
+            if not records:
+                return
+            pack = _RECORD.pack
+            chunks = []
+            for timestamp, code, line in records:
+                data = line.encode("utf-8")
+                chunks.append(pack(timestamp, code, len(data)))
+                chunks.append(data)
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+            self._written += len(records)
+
+    def _take(self):
+        """
+        Remove and return all buffered records, oldest first.
+
+        Must be called with the lock held.
+
+        Internal use only.
+        """
+        start, end = self._tail % self._capacity, self._head % self._capacity
+        count = self._head - self._tail
+        self._tail = self._head
+        if not count:
+            return []
+        if start < end:
+            ranges = ((start, end),)
+        else:
+            ranges = ((start, self._capacity), (0, end))
+        records = []
+        for first, last in ranges:
+            records.extend(zip(
+                self._timestamps[first:last], self._codes[first:last], self._lines[first:last]
+            ))
+            self._lines[first:last] = [None] * (last - first)
+        return records
+
+    def _run(self):
+        """
+        Flusher thread main loop.
+
+        Internal use only.
+        """
+        while not self._stopping.wait(self._flush_interval):
+            self.flush()
+
+    def __enter__(self):
+        """
+        Enter context manager and start recording.
+
+        :return: This instance.
+        :rtype: TraceRecorder
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Exit context manager and stop recording.
+
+        :return: ``False`` to propagate exceptions.
+        :rtype: bool
+        """
+        self.stop()
+        return False
+
+
+def read_trace(path):
+    """
+    Read a trace file written by :class:`TraceRecorder`.
+
+    A truncated last record, e.g. of a recorder that was not stopped, is
+    ignored.
+
+    :param path: Path of the trace file.
+    :type path: str | os.PathLike
+    :return: Iterator over the records in recording order.
+    :rtype: Iterator[TraceRecord]
+    :raises ValueError: If the file is not a trace file.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"Invalid trace file: '{path}'")
+    return _parse_records(data, len(_MAGIC))
+
+
+def _parse_records(data, offset):
+    """
+    Yield the records encoded in ``data`` from ``offset`` on.
+
+    Internal use only.
+    """
+    unpack = _RECORD.unpack_from
+    size = _RECORD.size
+    end = len(data)
+    while offset + size <= end:
+        timestamp, code, length = unpack(data, offset)
+        offset += size
+        if offset + length > end:
+            return
+        line = data[offset:offset + length].decode("utf-8")
+        offset += length
+        yield TraceRecord(timestamp / 1e9, _DIRECTIONS[code], line)
@@ -1,14 +1,15 @@
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch
 
-from src.imcntr import Controller, Sample, Shutter
-from src.imcntr.controller_api import _Task, _TaskFactory
+from src.imcntr import Controller, Sample, Shutter, AsyncSample, AsyncSubmitTask, SubmitTask, Observer
+from src.imcntr.controller_api import _Task, TaskFactory
 
 
 class TestController(unittest.TestCase):
     def setUp(self):
         self.protocol = MagicMock()
-        patcher = patch('src.imcntr.controller_api._TaskFactory')
+        patcher = patch('src.imcntr.controller_api.TaskFactory')
         self.addCleanup(patcher.stop)
         self.mock_factory_cls = patcher.start()
         self.mock_factory = self.mock_factory_cls.return_value
@@ -35,7 +36,7 @@ class TestController(unittest.TestCase):
 class TestSample(unittest.TestCase):
     def setUp(self):
         self.protocol = MagicMock()
-        patcher = patch('src.imcntr.controller_api._TaskFactory')
+        patcher = patch('src.imcntr.controller_api.TaskFactory')
         self.addCleanup(patcher.stop)
         self.mock_factory_cls = patcher.start()
         self.mock_factory = self.mock_factory_cls.return_value
@@ -65,6 +66,7 @@ class TestSample(unittest.TestCase):
         self.sample.rotate_cw(5)
         self.mock_factory.submit.assert_any_call(_Task.ROTATE_CW)
         self.mock_submit.assert_called_once()
+        self.assertEqual(self.mock_submit.call_args.kwargs["task"], "rot_cw+5")
         with self.assertRaises(TypeError):
             self.sample.rotate_cw("invalid")
         with self.assertRaises(ValueError):
@@ -79,6 +81,25 @@ class TestSample(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.sample.rotate_ccw(-1)
 
+    def test_non_blocking_call_returns_submitted_future(self):
+        result = self.sample.move_in(5, block=False)
+        self.mock_submit.submit.assert_called_once_with(5)
+        self.assertIs(result, self.mock_submit.submit.return_value)
+        self.mock_submit.assert_not_called()
+
+    def test_scan_runs_prebuilt_rotation_sequence(self):
+        after = []
+        self.sample.scan([1, 2], 5, after_step=lambda index, step: after.append((index, step)))
+        tasks, timeout = self.mock_submit.run_sequence.call_args.args
+        self.assertEqual(tasks, ["rot_cw+1", "rot_cw+2"])
+        self.assertEqual(timeout, 5)
+        self.mock_submit.run_sequence.call_args.kwargs["after_task"](1)
+        self.assertEqual(after, [(1, 2)])
+        self.sample.scan([3], clockwise=False)
+        self.assertEqual(self.mock_submit.run_sequence.call_args.args[0], ["rot_ccw+3"])
+        with self.assertRaises(ValueError):
+            self.sample.scan([1, 0])
+
     def test_rotate_stop_calls_correct_task(self):
         self.sample.rotate_stop()
         self.mock_factory.submit.assert_any_call(_Task.ROTATE_STOP)
@@ -93,7 +114,7 @@ class TestSample(unittest.TestCase):
 class TestShutter(unittest.TestCase):
     def setUp(self):
         self.protocol = MagicMock()
-        patcher = patch('src.imcntr.controller_api._TaskFactory')
+        patcher = patch('src.imcntr.controller_api.TaskFactory')
         self.addCleanup(patcher.stop)
         self.mock_factory_cls = patcher.start()
         self.mock_factory = self.mock_factory_cls.return_value
@@ -114,5 +135,33 @@ class TestShutter(unittest.TestCase):
         self.mock_submit.assert_called_once()
 
 
+class TestTaskFactory(unittest.TestCase):
+    def setUp(self):
+        self.protocol = MagicMock()
+
+    def test_submit_creates_sync_or_async_task(self):
+        self.assertIsInstance(TaskFactory(self.protocol).submit(_Task.OPEN), SubmitTask)
+        self.assertNotIsInstance(TaskFactory(self.protocol).submit(_Task.OPEN), AsyncSubmitTask)
+        self.assertIsInstance(
+            TaskFactory(self.protocol, asynchronous=True).submit(_Task.OPEN), AsyncSubmitTask
+        )
+
+    def test_async_sample_creates_async_tasks(self):
+        sample = AsyncSample(self.protocol)
+        self.assertIsInstance(sample._rotate_cw, AsyncSubmitTask)
+
+
+    def test_async_sample_non_blocking_returns_awaitable_future(self):
+        self.protocol.receive_observer = Observer()
+        self.protocol.send.side_effect = lambda task: self.protocol.receive_observer.call("pos_in")
+        sample = AsyncSample(self.protocol)
+
+        async def main():
+            future = sample.move_in(timeout=1, block=False)
+            self.assertIsInstance(future, asyncio.Future)
+            return await future
+
+        self.assertTrue(asyncio.run(main()))
+
 if __name__ == '__main__':
     unittest.main()
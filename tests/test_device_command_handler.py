@@ -3,7 +3,16 @@ from unittest.mock import patch, Mock
 import threading
 import time
 
-from src.imcntr import WaitForResponse, SubmitTask
+import asyncio
+import concurrent.futures
+
+from src.imcntr import (
+    WaitForResponse, SubmitTask, AsyncWaitForResponse, AsyncSubmitTask, CommandPipeline, Observer,
+    CommandMetrics, ConnectionLostError, ResponsePattern, ResponseMatcher, ResponseMatch,
+    DeviceConnection, DispatchExecutor
+)
+from src.imcntr.device_command_handler import _TimeoutScheduler
+from src.imcntr.dispatch import DROP_NEWEST
 
 class MockObserver:
     """Minimal observer implementation for testing."""
@@ -54,6 +63,11 @@ class TestWaitForResponse(unittest.TestCase):
 
         self.assertEqual(len(self.observer._callbacks), 0)
 
+    def test_response_is_registered_with_protocol(self):
+        WaitForResponse(self.protocol, response="OK")
+
+        self.protocol.register_responses.assert_called_once_with("OK")
+
     def test_call_without_response_raises(self):
         waiter = WaitForResponse(self.protocol)
         with self.assertRaises(ValueError):
@@ -87,6 +101,20 @@ class TestWaitForResponse(unittest.TestCase):
         self.assertEqual(len(self.observer._callbacks), 0)
 
 
+    def test_concurrent_waits_on_same_instance(self):
+        waiter = WaitForResponse(self.protocol, response="OK", timeout=1)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(waiter())) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while len(self.observer._callbacks) < 2:
+            time.sleep(0.01)
+        self.observer.call("OK")
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True, True])
+        self.assertEqual(len(self.observer._callbacks), 0)
+
 
 class TestSubmitTask(unittest.TestCase):
 
@@ -154,11 +182,70 @@ class TestSubmitTask(unittest.TestCase):
 
         self.protocol.send.assert_called_once_with("CUSTOM")
 
+    def test_task_argument_overrides_default_for_single_call(self):
+        task = SubmitTask(self.protocol, response="OK", task="DEFAULT")
+
+        task(wait=False, task="CUSTOM")
+
+        self.protocol.send.assert_called_once_with("CUSTOM")
+        self.assertEqual(task.task, "DEFAULT")
+        with self.assertRaises(TypeError):
+            task(wait=False, task=1)
+
+    def test_run_sequence_waits_for_each_response(self):
+        self.protocol.send.side_effect = lambda task: self.observer.call("OK")
+        task = SubmitTask(self.protocol, response="OK", timeout=1)
+        completed = []
+
+        result = task.run_sequence(["A", "B", "C"], after_task=completed.append)
+
+        self.assertEqual(result, 3)
+        self.assertEqual(completed, [0, 1, 2])
+        self.assertEqual([c.args[0] for c in self.protocol.send.call_args_list], ["A", "B", "C"])
+        self.assertEqual(len(self.observer._callbacks), 0)
+
+    def test_run_sequence_stops_at_timeout(self):
+        self.protocol.send.side_effect = lambda task: task != "B" and self.observer.call("OK")
+        task = SubmitTask(self.protocol, response="OK")
+
+        result = task.run_sequence(["A", "B", "C"], timeout=0.05)
+
+        self.assertEqual(result, 1)
+        self.assertEqual(self.protocol.send.call_count, 2)
+
     def test_submit_task_no_task_raises(self):
         task = SubmitTask(self.protocol, response="OK")
         with self.assertRaises(ValueError):
             task(wait=False)
 
+    def test_submit_returns_future_resolved_by_response(self):
+        task = SubmitTask(self.protocol, response="OK", task="CMD", timeout=1)
+
+        future = task.submit()
+        self.protocol.send.assert_called_once_with("CMD")
+        self.assertFalse(future.done())
+
+        self.observer.call("OK")
+
+        self.assertTrue(future.result(timeout=1))
+        self.assertEqual(len(self.observer._callbacks), 0)
+
+    def test_submit_future_times_out(self):
+        task = SubmitTask(self.protocol, response="OK", task="CMD")
+
+        future = task.submit(timeout=0.05)
+
+        self.assertFalse(future.result(timeout=1))
+        self.assertEqual(len(self.observer._callbacks), 0)
+
+    def test_submit_cancel_unsubscribes(self):
+        task = SubmitTask(self.protocol, response="OK", task="CMD")
+
+        future = task.submit()
+        future.cancel()
+
+        self.assertEqual(len(self.observer._callbacks), 0)
+
     def test_submit_task_custom_timeout(self):
         task = SubmitTask(self.protocol, response="OK", task="CMD", timeout=1)
 
@@ -170,6 +257,474 @@ class TestSubmitTask(unittest.TestCase):
         result = task(timeout=0.1, wait=True)
         self.assertTrue(result)
 
+    def test_connection_loss_wakes_pending_wait(self):
+        self.protocol.connection_lost_observer = Observer()
+        task = SubmitTask(self.protocol, response="OK", task="CMD", timeout=10)
+        threading.Timer(0.05, self.protocol.connection_lost_observer.call, (OSError(),)).start()
+        start = time.monotonic()
+
+        with self.assertRaises(ConnectionLostError) as context:
+            task(wait=True)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIsInstance(context.exception.__cause__, OSError)
+        self.assertEqual(self.protocol.connection_lost_observer.observers, [])
+
+    def test_connection_loss_fails_submitted_future_and_sequence(self):
+        self.protocol.connection_lost_observer = Observer()
+        task = SubmitTask(self.protocol, response="OK", task="CMD")
+        future = task.submit()
+        self.protocol.send.side_effect = (
+            lambda data: self.protocol.connection_lost_observer.call(None)
+        )
+
+        with self.assertRaises(ConnectionLostError):
+            task.run_sequence(["A", "B"], timeout=10)
+        self.assertIsInstance(future.exception(timeout=1), ConnectionLostError)
+
+    def test_wait_records_metrics(self):
+        metrics = CommandMetrics()
+        self.protocol.metrics = metrics
+        self.protocol.line_started = None
+        self.protocol.send.side_effect = lambda data: self.observer.call("OK")
+        task = SubmitTask(self.protocol, response="OK", task="CMD", timeout=1, name="TEST")
+
+        self.assertTrue(task(wait=True))
+        self.protocol.send.side_effect = None
+        self.assertFalse(task(timeout=0.01, wait=True))
+
+        summary = metrics.snapshot()["TEST"]
+        self.assertEqual(summary["total"]["count"], 1)
+        self.assertEqual(summary["timeouts"], 1)
+        self.assertEqual(len(self.observer._callbacks), 0)
+
+
+
+class TestAsyncSubmitTask(unittest.TestCase):
+
+    def setUp(self):
+        self.observer = Observer()
+        self.protocol = Mock()
+        self.protocol.send = Mock()
+        self.protocol.receive_observer = self.observer
+
+    def delayed_call(self, data, delay=0.05):
+        def emit():
+            time.sleep(delay)
+            self.observer.call(data)
+        threading.Thread(target=emit).start()
+
+    def test_await_response_success(self):
+        task = AsyncSubmitTask(self.protocol, response="OK", task="CMD", timeout=1)
+        self.delayed_call("OK")
+
+        result = asyncio.run(task(wait=True))
+
+        self.protocol.send.assert_called_once_with("CMD")
+        self.assertTrue(result)
+        self.assertEqual(self.observer.keyed_observers, {})
+
+    def test_await_response_connection_lost(self):
+        self.protocol.connection_lost_observer = Observer()
+        task = AsyncSubmitTask(self.protocol, response="OK", task="CMD", timeout=10)
+        threading.Timer(0.05, self.protocol.connection_lost_observer.call, (OSError(),)).start()
+
+        with self.assertRaises(ConnectionLostError):
+            asyncio.run(task(wait=True))
+        self.assertEqual(self.protocol.connection_lost_observer.observers, [])
+
+    def test_await_response_timeout(self):
+        waiter = AsyncWaitForResponse(self.protocol, response="OK", timeout=0.05)
+
+        result = asyncio.run(waiter())
+
+        self.assertFalse(result)
+        self.assertEqual(self.observer.keyed_observers, {})
+
+    def test_send_without_wait(self):
+        task = AsyncSubmitTask(self.protocol, response="OK", task="CMD")
+
+        result = asyncio.run(task())
+
+        self.protocol.send.assert_called_once_with("CMD")
+        self.assertIsNone(result)
+
+    def test_concurrent_waits_on_same_instance(self):
+        waiter = AsyncWaitForResponse(self.protocol, response="OK", timeout=1)
+
+        async def wait_twice():
+            return await asyncio.gather(waiter(), waiter())
+
+        self.delayed_call("OK")
+        self.assertEqual(asyncio.run(wait_twice()), [True, True])
+
+    def test_run_sequence(self):
+        self.protocol.send.side_effect = lambda task: self.delayed_call("OK", delay=0.01)
+        task = AsyncSubmitTask(self.protocol, response="OK", timeout=1)
+
+        result = asyncio.run(task.run_sequence(["A", "B"]))
+
+        self.assertEqual(result, 2)
+        self.assertEqual(self.observer.keyed_observers, {})
+
+    def test_submit_returns_asyncio_future(self):
+        task = AsyncSubmitTask(self.protocol, response="OK", task="CMD", timeout=1)
+
+        async def main():
+            future = task.submit()
+            self.assertIsInstance(future, asyncio.Future)
+            self.protocol.send.assert_called_once_with("CMD")
+            self.delayed_call("OK")
+            return await future
+
+        self.assertTrue(asyncio.run(main()))
+        self.assertEqual(self.observer.keyed_observers, {})
+
+    def test_submit_requires_running_loop(self):
+        task = AsyncSubmitTask(self.protocol, response="OK", task="CMD", timeout=1)
+
+        with self.assertRaises(RuntimeError):
+            task.submit()
+        self.protocol.send.assert_not_called()
+
+    def test_task_is_read_when_called(self):
+        task = AsyncSubmitTask(self.protocol, response="OK", task="FIRST")
+        coroutine = task()
+        task.task = "SECOND"
+
+        asyncio.run(coroutine)
+
+        self.protocol.send.assert_called_once_with("FIRST")
+
+
+class TestCommandPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.observer = Observer()
+        self.protocol = Mock()
+        self.protocol.send = Mock()
+        self.protocol.receive_observer = self.observer
+
+    def test_responses_are_matched_in_submission_order(self):
+        pipeline = CommandPipeline(self.protocol)
+        first, second = pipeline.submit_all(
+            [("rot_cw+5", "rot_stopped"), ("rot_ccw+5", "rot_stopped")]
+        )
+        opened = pipeline.submit("open_shutter", "shutter_opened")
+
+        self.assertEqual(
+            [c.args[0] for c in self.protocol.send.call_args_list],
+            ["rot_cw+5", "rot_ccw+5", "open_shutter"],
+        )
+        self.assertEqual(pipeline.pending, 3)
+        self.observer.call("rot_stopped")
+        self.assertTrue(first.done())
+        self.assertFalse(second.done())
+        self.observer.call("shutter_opened")
+        self.observer.call("rot_stopped")
+        self.assertTrue(second.result(timeout=1))
+        self.assertTrue(opened.result(timeout=1))
+        self.assertEqual(pipeline.pending, 0)
+
+    def test_lost_reply_does_not_shift_later_responses(self):
+        pipeline = CommandPipeline(self.protocol)
+        lost = pipeline.submit("rot_cw+5", "rot_stopped", timeout=0.01)
+        self.assertFalse(lost.result(timeout=1))
+        self.assertEqual(pipeline.pending, 0)
+        following = pipeline.submit("rot_cw+5", "rot_stopped", timeout=1)
+
+        self.observer.call("rot_stopped")
+        self.assertTrue(following.result(timeout=1))
+        self.assertEqual(pipeline.pending, 0)
+
+    def test_cancelled_future_gives_up_its_slot(self):
+        pipeline = CommandPipeline(self.protocol)
+        cancelled = pipeline.submit("rot_cw+5", "rot_stopped")
+        following = pipeline.submit("rot_cw+5", "rot_stopped")
+        cancelled.cancel()
+
+        self.observer.call("rot_stopped")
+        self.assertTrue(following.result(timeout=1))
+
+    def test_send_does_not_block_response_matching(self):
+        pipeline = CommandPipeline(self.protocol)
+        first = pipeline.submit("rot_cw+5", "rot_stopped")
+        matched = []
+
+        def send(data):
+            receiver = threading.Thread(target=self.observer.call, args=("rot_stopped",))
+            receiver.start()
+            receiver.join(1)
+            matched.append(first.done())
+
+        self.protocol.send.side_effect = send
+        pipeline.submit("rot_cw+5", "rot_stopped")
+
+        self.assertEqual(matched, [True])
+
+    def test_failed_send_releases_slot(self):
+        pipeline = CommandPipeline(self.protocol)
+        self.protocol.send.side_effect = OSError()
+
+        with self.assertRaises(OSError):
+            pipeline.submit("rot_cw+5", "rot_stopped")
+        self.assertEqual(pipeline.pending, 0)
+
+    def test_connection_loss_fails_pending_futures(self):
+        self.protocol.connection_lost_observer = Observer()
+        pipeline = CommandPipeline(self.protocol)
+        futures = pipeline.submit_all([("rot_cw+1", "rot_stopped"), ("open", "opened")])
+
+        self.protocol.connection_lost_observer.call(OSError())
+
+        for future in futures:
+            self.assertIsInstance(future.exception(timeout=1), ConnectionLostError)
+        self.assertEqual(pipeline.pending, 0)
+        pipeline.close()
+        self.assertEqual(self.protocol.connection_lost_observer.observers, [])
+
+    def test_close_cancels_pending_and_unsubscribes(self):
+        with CommandPipeline(self.protocol) as pipeline:
+            future = pipeline.submit("move_in", "pos_in")
+        self.assertTrue(future.cancelled())
+        self.assertEqual(self.observer.keyed_observers, {})
+
+
+
+class TestTimeoutScheduler(unittest.TestCase):
+
+    def test_completed_futures_are_removed_from_heap(self):
+        scheduler = _TimeoutScheduler()
+        futures = [concurrent.futures.Future() for _ in range(10)]
+        for future in futures:
+            scheduler.schedule_future_timeout(future, 60)
+        for future in futures:
+            future.set_result(True)
+
+        self.assertLessEqual(len(scheduler._deadlines), 5)
+
+    def test_timeout_resolves_pending_future(self):
+        scheduler = _TimeoutScheduler()
+        done = concurrent.futures.Future()
+        pending = concurrent.futures.Future()
+        scheduler.schedule_future_timeout(done, 0.01)
+        scheduler.schedule_future_timeout(pending, 0.05)
+        done.set_result(True)
+
+        self.assertFalse(pending.result(timeout=1))
+        self.assertTrue(done.result())
+        self.assertEqual(scheduler._deadlines, [])
+
+
+class TestResponsePattern(unittest.TestCase):
+
+    def test_template_values(self):
+        pattern = ResponsePattern("pos={int} speed={float} mode={word}")
+
+        match = pattern.match("pos=-120 speed=2.5 mode=fast")
+
+        self.assertEqual(match.values, (-120, 2.5, "fast"))
+        self.assertIs(match.pattern, pattern)
+        self.assertIsNone(pattern.match("pos=x speed=2.5 mode=fast"))
+        self.assertIsNone(pattern.match("pos=1 speed=2.5 mode=fast extra"))
+
+    def test_prefix_appends_rest(self):
+        pattern = ResponsePattern("error:", prefix=True)
+
+        self.assertEqual(pattern.match("error:limit switch").values, ("limit switch",))
+        self.assertIsNone(pattern.match("warning:x"))
+
+    def test_literal_braces_and_exact(self):
+        self.assertEqual(ResponsePattern("{{a}}").exact, "{a}")
+        self.assertTrue(ResponsePattern("{{a}}").match("{a}"))
+        self.assertIsNone(ResponsePattern("pos={int}").exact)
+
+    def test_equality(self):
+        self.assertEqual(ResponsePattern("pos={int}"), ResponsePattern("pos={int}"))
+        self.assertNotEqual(ResponsePattern("pos="), ResponsePattern("pos=", prefix=True))
+        self.assertEqual(len({ResponsePattern("a"), ResponsePattern("a")}), 1)
+
+    def test_invalid_template(self):
+        with self.assertRaises(TypeError):
+            ResponsePattern(1)
+        with self.assertRaises(ValueError):
+            ResponsePattern("pos={number}")
+
+
+class TestResponseMatcher(unittest.TestCase):
+
+    def test_classifies_exact_templates_and_prefixes(self):
+        position = ResponsePattern("pos={int}")
+        error = ResponsePattern("err", prefix=True)
+        matcher = ResponseMatcher(["moved_in", position, error])
+
+        self.assertEqual(matcher.match("moved_in"), ResponseMatch("moved_in", "moved_in", ()))
+        self.assertEqual(matcher.match("pos=42"), ResponseMatch(position, "pos=42", (42,)))
+        self.assertEqual(matcher.match("err=3"), ResponseMatch(error, "err=3", ("=3",)))
+        self.assertIsNone(matcher.match("unknown"))
+
+    def test_precedence(self):
+        prefix = ResponsePattern("pos", prefix=True)
+        template = ResponsePattern("pos={int}")
+        longer = ResponsePattern("pos=0{int}")
+        matcher = ResponseMatcher([prefix, template, longer, "pos=1"])
+
+        self.assertEqual(matcher.match("pos=1").pattern, "pos=1")
+        self.assertIs(matcher.match("pos=05").pattern, longer)
+        self.assertIs(matcher.match("pos=5").pattern, template)
+        self.assertIs(matcher.match("pos=x").pattern, prefix)
+
+    def test_match_all_returns_every_match(self):
+        prefix = ResponsePattern("err=", prefix=True)
+        template = ResponsePattern("err={int}")
+        matcher = ResponseMatcher([prefix, "err=3", template, "ok"])
+
+        self.assertEqual(matcher.match_all("err=3"), (
+            ResponseMatch(prefix, "err=3", ("3",)),
+            ResponseMatch("err=3", "err=3", ()),
+            ResponseMatch(template, "err=3", (3,)),
+        ))
+        self.assertEqual(matcher.match_all("err=x"), (ResponseMatch(prefix, "err=x", ("x",)),))
+        self.assertEqual(matcher.match_all("unknown"), ())
+
+    def test_add_and_remove(self):
+        pattern = ResponsePattern("pos={int}")
+        matcher = ResponseMatcher()
+        matcher.add(pattern)
+        matcher.add(pattern)
+
+        self.assertEqual(len(matcher), 1)
+        self.assertIn(pattern, matcher)
+        matcher.remove(pattern)
+        matcher.remove(pattern)
+        self.assertIsNone(matcher.match("pos=1"))
+        with self.assertRaises(TypeError):
+            matcher.add(1)
+
+
+class TestPatternWaits(unittest.TestCase):
+
+    def setUp(self):
+        self.observer = Observer()
+        self.protocol = Mock()
+        self.protocol.receive_observer = self.observer
+        self.protocol.connection_lost_observer = Observer()
+        self.pattern = ResponsePattern("pos={int}")
+
+    def test_wait_returns_parsed_values(self):
+        waiter = WaitForResponse(self.protocol, response=self.pattern, timeout=1)
+        threading.Timer(0.05, self.observer.call, ("pos=17",)).start()
+
+        match = waiter()
+
+        self.assertEqual(match.values, (17,))
+        self.assertEqual(match.line, "pos=17")
+        self.assertEqual(self.observer.observers, [])
+        self.protocol.register_responses.assert_not_called()
+
+    def test_wait_timeout(self):
+        waiter = WaitForResponse(self.protocol, response=self.pattern, timeout=0.05)
+        self.observer.call("pos=?")
+
+        self.assertFalse(waiter())
+
+    def test_submit_and_measured_wait(self):
+        self.protocol.send.side_effect = lambda data: self.observer.call("pos=3")
+        task = SubmitTask(self.protocol, response=self.pattern, task="where")
+
+        self.assertEqual(task.submit(timeout=1).result(timeout=1).values, (3,))
+        self.protocol.metrics = CommandMetrics()
+        self.protocol.line_started = None
+        self.assertEqual(task(timeout=1, wait=True).values, (3,))
+        self.assertEqual(self.protocol.metrics.snapshot()["pos={int}"]["total"]["count"], 1)
+
+    def test_concurrent_waits_share_one_subscription(self):
+        other = ResponsePattern("err={int}")
+        results = {}
+
+        def wait(name, response):
+            results[name] = WaitForResponse(self.protocol, response=response, timeout=1)()
+
+        threads = [
+            threading.Thread(target=wait, args=(name, response))
+            for name, response in (("a", self.pattern), ("b", self.pattern), ("c", other))
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 1
+        while len(self.observer.observers) != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual(len(self.observer.observers), 1)
+        self.observer.call("pos=1")
+        self.observer.call("err=2")
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results["a"].values, (1,))
+        self.assertEqual(results["b"].values, (1,))
+        self.assertEqual(results["c"].values, (2,))
+        self.assertEqual(self.observer.observers, [])
+
+    def test_async_wait_returns_match(self):
+        waiter = AsyncWaitForResponse(self.protocol, response=self.pattern, timeout=1)
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, self.observer.call, "pos=-4")
+            return await waiter()
+
+        self.assertEqual(asyncio.run(main()).values, (-4,))
+
+    def test_overlapping_waits_all_receive_line(self):
+        prefix = ResponsePattern("err=", prefix=True)
+        template = ResponsePattern("err={int}")
+        self.protocol.send = Mock()
+        prefix_future = SubmitTask(self.protocol, response=prefix, task="a").submit(timeout=1)
+        template_future = SubmitTask(self.protocol, response=template, task="b").submit(timeout=1)
+
+        self.observer.call("err=3")
+
+        self.assertEqual(prefix_future.result(timeout=1).values, ("3",))
+        self.assertEqual(template_future.result(timeout=1).values, (3,))
+        self.assertEqual(self.observer.observers, [])
+
+    def test_async_run_sequence_resolves_with_match(self):
+        self.protocol.send.side_effect = lambda task: self.observer.call("pos=5")
+        task = AsyncSubmitTask(self.protocol, response=self.pattern, timeout=1)
+        results = []
+
+        with patch("src.imcntr.device_command_handler._set_future_result",
+                   side_effect=lambda future, result: (results.append(result), future.set_result(result))):
+            count = asyncio.run(task.run_sequence(["A", "B"]))
+
+        self.assertEqual(count, 2)
+        self.assertEqual(results, [ResponseMatch(self.pattern, "pos=5", (5,))] * 2)
+
+    def test_pattern_wait_is_not_dropped_by_saturated_dispatcher(self):
+        connection = DeviceConnection()
+        connection.send = Mock()
+        release = threading.Event()
+        executor = DispatchExecutor(maxsize=1, policy=DROP_NEWEST)
+        self.addCleanup(executor.shutdown)
+        self.addCleanup(release.set)
+        executor.submit(release.wait)
+        executor.submit(release.wait)
+        connection.dispatcher = executor
+        pattern_future = SubmitTask(connection, response=self.pattern, task="where").submit(timeout=1)
+        exact_future = SubmitTask(connection, response="pos_in", task="in").submit(timeout=1)
+
+        connection.receive("pos=9")
+        connection.receive("pos_in")
+
+        self.assertEqual(pattern_future.result(timeout=1).values, (9,))
+        self.assertTrue(exact_future.result(timeout=1))
+        self.assertGreaterEqual(executor.dropped, 1)
+        self.assertEqual(connection.match_observer.observers, [])
+        self.assertEqual(connection.receive_observer.observers, [])
+
+    def test_invalid_response_type(self):
+        with self.assertRaises(TypeError):
+            WaitForResponse(self.protocol, response=1)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,11 @@
 import unittest
 from unittest.mock import Mock, patch
-from src.imcntr import DeviceConnection
-from src.imcntr.device_connection import _SerialLineHandler
+import asyncio
+import threading
+import time
+
+from src.imcntr import DeviceConnection, AsyncDeviceConnection
+from src.imcntr.device_connection import _SerialLineHandler, _SerialWriter
 
 
 class TestDeviceConnection(unittest.TestCase):
@@ -34,6 +38,28 @@ class TestDeviceConnection(unittest.TestCase):
         self.assertEqual(comm._protocol.receiver, comm)
         mock_thread_instance.start.assert_called_once()
 
+    @patch("serial.threaded.ReaderThread")
+    @patch("serial.Serial")
+    def test_connect_passes_serial_settings(self, mock_serial, mock_thread_class):
+        mock_thread_class.return_value.connect.return_value = (Mock(), Mock())
+
+        comm = DeviceConnection(port="COM1", baudrate=115200, write_timeout=0.5, rx_buffer_size=4096)
+        comm.connect()
+
+        mock_serial.assert_called_once_with("COM1", baudrate=115200, write_timeout=0.5)
+        mock_serial.return_value.set_buffer_size.assert_called_once_with(rx_size=4096)
+        self.assertEqual(comm.serial_settings, {"baudrate": 115200, "write_timeout": 0.5})
+
+    @patch("serial.threaded.ReaderThread")
+    @patch("serial.serial_for_url")
+    def test_connect_opens_url(self, mock_serial_for_url, mock_thread_class):
+        mock_thread_class.return_value.connect.return_value = (Mock(), Mock())
+
+        comm = DeviceConnection(port="socket://localhost:7777", baudrate=115200)
+        comm.connect()
+
+        mock_serial_for_url.assert_called_once_with("socket://localhost:7777", baudrate=115200)
+
     def test_send_calls_protocol_write_line(self):
         comm = DeviceConnection()
         comm._protocol = Mock()
@@ -99,6 +125,133 @@ class TestDeviceConnection(unittest.TestCase):
         mock_thread_instance.close.assert_called_once()
         mock_serial_instance.close.assert_called_once()
 
+    @patch("serial.threaded.ReaderThread")
+    @patch("serial.Serial")
+    def test_async_context_manager_connects_and_disconnects(self, mock_serial, mock_thread_class):
+        mock_serial_instance = Mock()
+        mock_serial.return_value = mock_serial_instance
+
+        mock_thread_instance = Mock()
+        mock_thread_instance.connect.return_value = (Mock(), Mock())
+        mock_thread_instance.is_alive.return_value = True
+        mock_thread_class.return_value = mock_thread_instance
+
+        async def run():
+            async with AsyncDeviceConnection(port="COM1") as comm:
+                self.assertTrue(comm.connected)
+
+        asyncio.run(run())
+
+        mock_thread_instance.close.assert_called_once()
+        mock_serial_instance.close.assert_called_once()
+
+    def test_line_handler_records_first_byte_time(self):
+        comm = DeviceConnection()
+        received = []
+        comm.receive_observer.subscribe(lambda data: received.append((data, comm.line_started)))
+        handler = _SerialLineHandler()
+        handler.receiver = comm
+        handler.timestamps = True
+        comm._protocol = handler
+
+        handler.data_received(b"shutter_")
+        first = handler.line_started
+        handler.data_received(b"opened\r\nrot_stopped\r\n")
+
+        self.assertEqual(received[0], ("shutter_opened", first))
+        self.assertEqual(received[1][0], "rot_stopped")
+        self.assertGreater(received[1][1], first)
+
+    def _handler(self):
+        comm = DeviceConnection()
+        received = []
+        comm.receive_observer.subscribe(received.append)
+        handler = _SerialLineHandler()
+        handler.receiver = comm
+        handler.responses = comm._responses
+        return comm, handler, received
+
+    def test_line_handler_frames_split_chunks(self):
+        comm, handler, received = self._handler()
+
+        handler.data_received(b"shutter_op")
+        handler.data_received(b"ened\r")
+        handler.data_received(b"\nrot_stopped\r\nmove_")
+        handler.data_received(bytearray(b"stopped\r\n"))
+
+        self.assertEqual(received, ["shutter_opened", "rot_stopped", "move_stopped"])
+        self.assertEqual(handler.buffer, bytearray())
+
+    def test_line_handler_uses_registered_responses(self):
+        comm, handler, received = self._handler()
+        response = "".join(["rot_", "stopped"])
+        comm.register_responses(response)
+
+        handler.data_received(b"rot_stopped\r\nunknown \xff\r\n")
+
+        self.assertIs(received[0], response)
+        self.assertEqual(received[1], "unknown \ufffd")
+
+    def test_register_responses_rejects_non_strings(self):
+        with self.assertRaises(TypeError):
+            DeviceConnection().register_responses(b"rot_stopped")
+
+    def test_write_queue_sends_via_writer_thread(self):
+        received = []
+        with DeviceConnection("loop://", write_queue=True) as comm:
+            comm.receive_observer.subscribe(received.append)
+            futures = [comm.send(f"line_{index}") for index in range(50)]
+            for future in futures:
+                self.assertIsNone(future.result(timeout=1))
+            for _ in range(100):
+                if len(received) == 50:
+                    break
+                time.sleep(0.01)
+
+        self.assertEqual(received, [f"line_{index}" for index in range(50)])
+
+    def test_writer_coalesces_queued_lines(self):
+        writes = []
+        release = threading.Event()
+
+        def write(data):
+            writes.append(data)
+            release.wait(1)
+
+        writer = _SerialWriter(write)
+        first = writer.submit(b"a\r\n")
+        while not writes:
+            release.wait(0.001)
+        second, third = writer.submit(b"b\r\n"), writer.submit(b"c\r\n")
+        release.set()
+        writer.close()
+
+        self.assertEqual(writes, [b"a\r\n", b"b\r\nc\r\n"])
+        self.assertTrue(first.done() and second.done() and third.done())
+
+    def test_writer_failure_and_cancellation(self):
+        release = threading.Event()
+        calls = []
+
+        def write(data):
+            calls.append(data)
+            release.wait(1)
+            raise OSError("device gone")
+
+        writer = _SerialWriter(write)
+        first = writer.submit(b"a\r\n")
+        while not calls:
+            release.wait(0.001)
+        cancelled = writer.submit(b"b\r\n")
+        self.assertTrue(cancelled.cancel())
+        release.set()
+        writer.close()
+
+        self.assertIsInstance(first.exception(), RuntimeError)
+        self.assertEqual(calls, [b"a\r\n"])
+        with self.assertRaises(RuntimeError):
+            writer.submit(b"c\r\n")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from src.imcntr import discover_port, find_ports
+from src.imcntr.discovery import ARDUINO_VID, NANO_EVERY_PID
+
+
+def port(device, vid=ARDUINO_VID, pid=NANO_EVERY_PID, serial_number="A1"):
+    return Mock(device=device, vid=vid, pid=pid, serial_number=serial_number)
+
+
+class TestDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = os.path.join(directory.name, "imcntr", "ports.json")
+        comports = patch("src.imcntr.discovery.list_ports.comports")
+        self.comports = comports.start()
+        self.addCleanup(comports.stop)
+        self.comports.return_value = [
+            port("/dev/ttyUSB0", vid=0x0403, pid=0x6001),
+            port("/dev/ttyACM1", serial_number="B2"),
+            port("/dev/ttyACM0", serial_number="A1"),
+        ]
+
+    def test_find_ports_filters_by_identifiers(self):
+        self.assertEqual(find_ports(), ["/dev/ttyACM0", "/dev/ttyACM1"])
+        self.assertEqual(find_ports(serial_number="B2"), ["/dev/ttyACM1"])
+        self.assertEqual(find_ports(vid=0x0403, pid=0x6001), ["/dev/ttyUSB0"])
+
+    def test_discover_port_writes_cache(self):
+        self.assertEqual(discover_port(serial_number="A1", cache=self.cache), "/dev/ttyACM0")
+
+        with open(self.cache) as file:
+            content = json.load(file)
+        self.assertEqual(content["ports"], {"2341:0058:A1": "/dev/ttyACM0"})
+
+    @patch("src.imcntr.discovery._validate", return_value=True)
+    def test_valid_cache_entry_skips_enumeration(self, validate):
+        discover_port(serial_number="A1", cache=self.cache)
+        self.comports.reset_mock()
+
+        self.assertEqual(discover_port(serial_number="A1", cache=self.cache), "/dev/ttyACM0")
+        self.comports.assert_not_called()
+        validate.assert_called_once_with("/dev/ttyACM0", ARDUINO_VID, NANO_EVERY_PID, "A1")
+
+    @patch("src.imcntr.discovery._validate", return_value=False)
+    def test_stale_cache_entry_is_replaced(self, validate):
+        discover_port(serial_number="A1", cache=self.cache)
+        self.comports.return_value = [port("/dev/ttyACM2", serial_number="A1")]
+
+        self.assertEqual(discover_port(serial_number="A1", cache=self.cache), "/dev/ttyACM2")
+        with open(self.cache) as file:
+            self.assertEqual(json.load(file)["ports"]["2341:0058:A1"], "/dev/ttyACM2")
+
+    def test_corrupt_cache_is_ignored(self):
+        os.makedirs(os.path.dirname(self.cache))
+        with open(self.cache, "w") as file:
+            file.write("{not json")
+
+        self.assertEqual(discover_port(serial_number="B2", cache=self.cache), "/dev/ttyACM1")
+
+    def test_ambiguous_or_missing_device_raises(self):
+        with self.assertRaises(RuntimeError):
+            discover_port(cache=False)
+        with self.assertRaises(RuntimeError):
+            discover_port(serial_number="C3", cache=False)
+
+    @patch("src.imcntr.discovery._validate", return_value=True)
+    def test_cache_is_bypassed_without_serial_number(self, validate):
+        self.comports.return_value = [port("/dev/ttyACM0")]
+        self.assertEqual(discover_port(cache=self.cache), "/dev/ttyACM0")
+        self.comports.return_value.append(port("/dev/ttyACM1", serial_number="B2"))
+
+        with self.assertRaises(RuntimeError):
+            discover_port(cache=self.cache)
+        validate.assert_not_called()
+        self.assertFalse(os.path.exists(self.cache))
@@ -0,0 +1,138 @@
+import threading
+import time
+import unittest
+
+from src.imcntr import DeviceConnection, DispatchExecutor
+from src.imcntr.dispatch import BLOCK, DROP_OLDEST, DROP_NEWEST
+
+
+class TestDispatchExecutor(unittest.TestCase):
+
+    def _blocked_executor(self, policy):
+        executor = DispatchExecutor(maxsize=2, policy=policy)
+        self.addCleanup(executor.shutdown)
+        release = threading.Event()
+        started = threading.Event()
+        self.addCleanup(release.set)
+
+        def block():
+            started.set()
+            release.wait()
+
+        executor.submit(block)
+        started.wait(1)
+        return executor, release
+
+    def test_calls_are_executed_in_order(self):
+        results = []
+        with DispatchExecutor() as executor:
+            for index in range(100):
+                executor.submit(results.append, index)
+            self.assertTrue(executor.join(1))
+        self.assertEqual(results, list(range(100)))
+
+    def test_drop_oldest(self):
+        executor, release = self._blocked_executor(DROP_OLDEST)
+        results = []
+        for index in range(4):
+            self.assertTrue(executor.submit(results.append, index))
+        release.set()
+        executor.join(1)
+
+        self.assertEqual(results, [2, 3])
+        self.assertEqual(executor.dropped, 2)
+
+    def test_drop_newest(self):
+        executor, release = self._blocked_executor(DROP_NEWEST)
+        results = []
+        outcomes = [executor.submit(results.append, index) for index in range(4)]
+        release.set()
+        executor.join(1)
+
+        self.assertEqual(outcomes, [True, True, False, False])
+        self.assertEqual(results, [0, 1])
+        self.assertEqual(executor.dropped, 2)
+
+    def test_block_waits_for_free_space(self):
+        executor, release = self._blocked_executor(BLOCK)
+        results = []
+        executor.submit(results.append, 0)
+        executor.submit(results.append, 1)
+        submitted = threading.Event()
+
+        def submit():
+            executor.submit(results.append, 2)
+            submitted.set()
+
+        threading.Thread(target=submit).start()
+        self.assertFalse(submitted.wait(0.05))
+        release.set()
+        self.assertTrue(submitted.wait(1))
+        executor.join(1)
+
+        self.assertEqual(results, [0, 1, 2])
+        self.assertEqual(executor.dropped, 0)
+
+    def test_errors_are_counted(self):
+        errors = []
+        with DispatchExecutor() as executor:
+            executor.error_callback = lambda exception, function: errors.append(exception)
+            executor.submit(lambda: 1 / 0)
+            executor.join(1)
+
+        self.assertEqual(executor.error_count, 1)
+        self.assertIsInstance(executor.last_error, ZeroDivisionError)
+        self.assertEqual(errors, [executor.last_error])
+
+    def test_submit_after_shutdown_raises(self):
+        executor = DispatchExecutor()
+        executor.shutdown()
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            DispatchExecutor(workers=1.5)
+        with self.assertRaises(ValueError):
+            DispatchExecutor(maxsize=0)
+        with self.assertRaises(ValueError):
+            DispatchExecutor(policy="unknown")
+
+    def test_device_connection_survives_shut_down_dispatcher(self):
+        connection = DeviceConnection("loop://")
+        received = []
+        connection.receive_observer.subscribe(received.append)
+        with DispatchExecutor() as executor:
+            connection.dispatcher = executor
+        connection.connect()
+        self.addCleanup(connection.disconnect)
+
+        connection.send("rot_stopped")
+        deadline = time.monotonic() + 1
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(received, ["rot_stopped"])
+        self.assertTrue(connection.connected)
+
+    def test_device_connection_defers_plain_callbacks(self):
+        connection = DeviceConnection()
+        reader = threading.current_thread()
+        threads = {}
+        connection.receive_observer.subscribe_key(
+            "rot_stopped", lambda data: threads.setdefault("keyed", threading.current_thread())
+        )
+        connection.receive_observer.subscribe(
+            lambda data: threads.setdefault("plain", threading.current_thread())
+        )
+        connection.receive_callback = (
+            lambda data: threads.setdefault("callback", threading.current_thread())
+        )
+        with DispatchExecutor() as executor:
+            connection.dispatcher = executor
+            connection.receive("rot_stopped")
+            executor.join(1)
+
+        self.assertIs(threads["keyed"], reader)
+        self.assertIsNot(threads["plain"], reader)
+        self.assertIsNot(threads["callback"], reader)
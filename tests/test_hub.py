@@ -0,0 +1,92 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+import serial
+
+from src.imcntr import ConnectionHub, ConnectionLostError, DeviceConnection, Sample, Shutter
+from src.imcntr.simulator import ControllerSimulator
+
+
+class TestConnectionHub(unittest.TestCase):
+
+    def setUp(self):
+        self.hub = ConnectionHub()
+        self.addCleanup(self.hub.close)
+        self.simulators = []
+        for _ in range(3):
+            simulator = ControllerSimulator(linear_time=0.05)
+            self.addCleanup(simulator.stop)
+            simulator.start_pty()
+            self.simulators.append(simulator)
+
+    def test_serves_several_connections_on_one_thread(self):
+        threads = threading.active_count()
+        connections = [DeviceConnection(simulator.port, hub=self.hub) for simulator in self.simulators]
+        for connection in connections:
+            connection.connect()
+            self.addCleanup(connection.disconnect)
+
+        self.assertEqual(threading.active_count(), threads + 1)
+        self.assertEqual(self.hub.connections, 3)
+        for connection in connections:
+            self.assertTrue(connection.connected)
+            self.assertTrue(Shutter(connection).open(timeout=1))
+        futures = [Sample(connection).move_in(block=False) for connection in connections]
+        self.assertEqual([future.result(timeout=1) for future in futures], [True, True, True])
+
+    def test_disconnect_detaches_connection(self):
+        connection = DeviceConnection(self.simulators[0].port, hub=self.hub)
+        connection.connect()
+        connection.disconnect()
+
+        self.assertFalse(connection.connected)
+        self.assertEqual(self.hub.connections, 0)
+
+    def test_close_disconnects_all_connections(self):
+        connections = [DeviceConnection(simulator.port, hub=self.hub) for simulator in self.simulators]
+        for connection in connections:
+            connection.connect()
+
+        self.hub.close()
+
+        self.assertEqual([connection.connected for connection in connections], [False] * 3)
+        self.assertFalse(self.hub.thread.is_alive())
+        with self.assertRaises(RuntimeError):
+            connections[0].connect()
+
+    def test_connection_loss_is_reported(self):
+        simulator = ControllerSimulator(linear_time=10)
+        self.addCleanup(simulator.stop)
+        connection = DeviceConnection(simulator.start_socket(), hub=self.hub)
+        connection.connect()
+        self.addCleanup(connection.disconnect)
+        threading.Timer(0.05, simulator._transport._close_client).start()
+
+        with self.assertRaises(ConnectionLostError):
+            Sample(connection).move_in(timeout=5)
+        self.assertFalse(connection.connected)
+        self.assertEqual(self.hub.connections, 0)
+
+    def test_port_without_file_descriptor_raises(self):
+        connection = DeviceConnection("loop://", hub=self.hub)
+        with self.assertRaises(RuntimeError):
+            connection.connect()
+
+    def test_failed_attach_closes_port(self):
+        serial_for_url = serial.serial_for_url
+        opened = []
+
+        def open_port(*args, **kwargs):
+            opened.append(serial_for_url(*args, **kwargs))
+            return opened[-1]
+
+        connection = DeviceConnection("loop://", hub=self.hub)
+        with patch("serial.serial_for_url", side_effect=open_port):
+            with self.assertRaises(RuntimeError):
+                connection.connect()
+
+        self.assertEqual(len(opened), 1)
+        self.assertFalse(opened[0].is_open)
+        self.assertFalse(connection.connected)
+        self.assertEqual(self.hub.connections, 0)
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+import src.imcntr as imcntr
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class TestPackage(unittest.TestCase):
+
+    def run_python(self, code):
+        process = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return process.stdout.split()
+
+    def test_import_does_not_load_heavy_modules(self):
+        loaded = self.run_python(
+            "import sys; import src.imcntr; "
+            "print('serial' in sys.modules, 'asyncio' in sys.modules)"
+        )
+        self.assertEqual(loaded, ["False", "False"])
+
+    def test_lazy_attribute_loads_submodule(self):
+        loaded = self.run_python(
+            "import sys; import src.imcntr as imcntr; imcntr.DeviceConnection; "
+            "print('serial' in sys.modules, 'src.imcntr.device_connection' in sys.modules)"
+        )
+        self.assertEqual(loaded, ["True", "True"])
+
+    def test_version(self):
+        self.assertIsInstance(imcntr.__version__, str)
+
+    def test_exports_resolve(self):
+        for name in imcntr.__all__:
+            with self.subTest(name=name):
+                self.assertIsNotNone(getattr(imcntr, name))
+        self.assertIs(imcntr.Controller, imcntr.controller_api.Controller)
+
+    def test_dir_lists_exports(self):
+        self.assertTrue(set(imcntr.__all__) <= set(dir(imcntr)))
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            imcntr.Missing
+
+
+if __name__ == "__main__":
+    unittest.main()
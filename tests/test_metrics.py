@@ -0,0 +1,66 @@
+import unittest
+
+from src.imcntr import CommandMetrics
+
+
+class TestCommandMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = CommandMetrics(window=4)
+
+    def test_record_splits_phases(self):
+        self.metrics.record("OPEN", 0.0, 1.0, 3.0, 3.5, 4.0)
+
+        summary = self.metrics.snapshot()["OPEN"]
+
+        self.assertEqual(summary["write"]["sum"], 1.0)
+        self.assertEqual(summary["device"]["sum"], 2.0)
+        self.assertEqual(summary["dispatch"]["sum"], 0.5)
+        self.assertEqual(summary["wakeup"]["sum"], 0.5)
+        self.assertEqual(summary["total"]["sum"], 4.0)
+        self.assertEqual(summary["timeouts"], 0)
+
+    def test_record_without_first_byte_skips_device_phases(self):
+        self.metrics.record("OPEN", 0.0, 1.0, None, 3.5, 4.0)
+
+        summary = self.metrics.snapshot()["OPEN"]
+
+        self.assertNotIn("device", summary)
+        self.assertNotIn("dispatch", summary)
+        self.assertEqual(summary["total"]["count"], 1)
+
+    def test_quantiles_use_recent_window(self):
+        for total in (10.0, 1.0, 2.0, 3.0, 4.0):
+            self.metrics.record("OPEN", 0.0, 0.0, None, total, total)
+
+        total = self.metrics.snapshot()["OPEN"]["total"]
+
+        self.assertEqual(total["count"], 5)
+        self.assertEqual(total["sum"], 20.0)
+        self.assertEqual(total["p50"], 2.0)
+        self.assertEqual(total["max"], 4.0)
+
+    def test_record_timeout_and_reset(self):
+        self.metrics.record_timeout("CLOSE")
+        self.assertEqual(self.metrics.snapshot(), {"CLOSE": {"timeouts": 1}})
+
+        self.metrics.reset()
+
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_prometheus_output(self):
+        self.metrics.record("OPEN", 0.0, 1.0, 3.0, 3.5, 4.0)
+        self.metrics.record_timeout("OPEN")
+
+        text = self.metrics.prometheus(prefix="test")
+
+        self.assertIn("# TYPE test_task_seconds summary", text)
+        self.assertIn('test_task_seconds{task="OPEN",phase="total",quantile="0.99"} 4.0', text)
+        self.assertIn('test_task_seconds_count{task="OPEN",phase="device"} 1', text)
+        self.assertIn('test_task_timeouts_total{task="OPEN"} 1', text)
+
+    def test_invalid_window(self):
+        with self.assertRaises(TypeError):
+            CommandMetrics(window=1.5)
+        with self.assertRaises(ValueError):
+            CommandMetrics(window=0)
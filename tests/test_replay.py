@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src.imcntr import (
+    ConnectionLostError, ReplayConnection, Shutter, TraceRecord, TraceRecorder, WaitForResponse
+)
+from src.imcntr.trace import SENT, RECEIVED
+
+
+SESSION = [
+    TraceRecord(0.0, RECEIVED, "controller_ready"),
+    TraceRecord(1.0, SENT, "open_shutter"),
+    TraceRecord(1.2, RECEIVED, "shutter_opened"),
+    TraceRecord(2.0, SENT, "close_shutter"),
+    TraceRecord(2.2, RECEIVED, "shutter_closed"),
+]
+
+
+class TestReplayConnection(unittest.TestCase):
+
+    def test_api_runs_against_replay(self):
+        connection = ReplayConnection(SESSION, speed=None)
+        received = []
+        connection.receive_observer.subscribe(received.append)
+        with connection:
+            shutter = Shutter(connection)
+            self.assertTrue(shutter.open(timeout=1))
+            self.assertTrue(shutter.close(timeout=1))
+            self.assertEqual(connection.remaining, 0)
+        self.assertEqual(received, ["controller_ready", "shutter_opened", "shutter_closed"])
+
+    def test_speed_scales_recorded_delays(self):
+        with ReplayConnection(SESSION, speed=2) as connection:
+            start = time.monotonic()
+            self.assertTrue(Shutter(connection).open(timeout=1))
+            elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.5)
+
+    def test_strict_mismatch_raises(self):
+        with ReplayConnection(SESSION, speed=None) as connection:
+            with self.assertRaises(RuntimeError):
+                connection.send("close_shutter")
+
+    def test_non_strict_skips_to_matching_line(self):
+        with ReplayConnection(SESSION, speed=None, strict=False) as connection:
+            self.assertTrue(Shutter(connection).close(timeout=1))
+            self.assertFalse(Shutter(connection).open(timeout=0.05))
+
+    def test_disconnect_wakes_pending_waits(self):
+        connection = ReplayConnection(SESSION, speed=None)
+        lost = []
+        connection.connection_lost_observer.subscribe(lost.append)
+        connection.connect()
+        waiter = WaitForResponse(connection, response="never", timeout=3)
+        threading.Timer(0.05, connection.disconnect).start()
+        start = time.monotonic()
+
+        with self.assertRaises(ConnectionLostError):
+            waiter()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(lost, [None])
+        connection.disconnect()
+        self.assertEqual(lost, [None])
+
+    def test_send_when_disconnected_raises(self):
+        connection = ReplayConnection(SESSION)
+        with self.assertRaises(RuntimeError):
+            connection.send("open_shutter")
+
+    def test_invalid_speed(self):
+        with self.assertRaises(ValueError):
+            ReplayConnection(SESSION, speed=0)
+
+    def test_replays_trace_file(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "session.trace")
+        with TraceRecorder(path) as tracer:
+            for record in SESSION[:3]:
+                tracer.record(record.direction, record.line)
+
+        with ReplayConnection(path, speed=None) as connection:
+            self.assertTrue(Shutter(connection).open(timeout=1))
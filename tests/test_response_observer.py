@@ -1,4 +1,6 @@
+import threading
 import unittest
+from unittest.mock import Mock
 from src.imcntr import Observer
 
 class TestObserver(unittest.TestCase):
@@ -45,5 +47,137 @@ class TestObserver(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             self.observer.call()
 
+    def test_subscribe_key_only_called_for_matching_key(self):
+        self.observer.subscribe_key("OK", self.dummy_callback, 1)
+        self.observer.call("NOK")
+        self.assertEqual(self.callback_calls, [])
+        self.observer.call("OK")
+        self.assertEqual(self.callback_calls, [((1, "OK"), {})])
+
+    def test_keyed_observers_called_before_plain_observers(self):
+        order = []
+        self.observer.subscribe(lambda data: order.append("plain"))
+        self.observer.subscribe_key("OK", lambda data: order.append("keyed"))
+        self.observer.call("OK")
+        self.assertEqual(order, ["keyed", "plain"])
+
+    def test_call_keyed_and_call_plain(self):
+        order = []
+        self.observer.subscribe(lambda data: order.append("plain"))
+        self.observer.subscribe_key("OK", lambda data: order.append("keyed"))
+        self.observer.call_keyed("OK")
+        self.assertEqual(order, ["keyed"])
+        self.observer.call_plain("OK")
+        self.assertEqual(order, ["keyed", "plain"])
+
+    def test_unsubscribe_key(self):
+        self.observer.subscribe_key("OK", self.dummy_callback, 1)
+        self.observer.subscribe_key("OK", self.dummy_callback, 2)
+        self.observer.unsubscribe_key("OK", self.dummy_callback, 1)
+        self.assertEqual(len(self.observer.keyed_observers["OK"]), 1)
+        self.observer.unsubscribe_key("OK", self.dummy_callback, remove_all=True)
+        self.assertEqual(self.observer.keyed_observers, {})
+
+    def test_call_with_unhashable_argument_skips_keyed_observers(self):
+        self.observer.subscribe_key("OK", self.dummy_callback)
+        self.observer.subscribe(self.dummy_callback)
+        self.observer.call(["OK"])
+        self.assertEqual(self.callback_calls, [((["OK"],), {})])
+
+    def test_subscribe_returns_handle_and_ignores_duplicates(self):
+        handle = self.observer.subscribe(self.dummy_callback, 1)
+        self.assertEqual(self.observer.subscribe(self.dummy_callback, 1), handle)
+        self.assertNotEqual(self.observer.subscribe(self.dummy_callback, 2), handle)
+        self.assertEqual(len(self.observer.observers), 2)
+
+    def test_unsubscribe_handle(self):
+        plain = self.observer.subscribe(self.dummy_callback, 1)
+        keyed = self.observer.subscribe_key("OK", self.dummy_callback, 2)
+        self.observer.unsubscribe_handle(plain)
+        self.observer.unsubscribe_handle(keyed)
+        self.observer.unsubscribe_handle(keyed)
+        self.assertEqual(self.observer.observers, [])
+        self.assertEqual(self.observer.keyed_observers, {})
+
+    def test_unhashable_arguments_can_be_unsubscribed(self):
+        self.observer.subscribe(self.dummy_callback, [1], key={"a": 1})
+        self.observer.subscribe(self.dummy_callback, [1], key={"a": 1})
+        self.assertEqual(len(self.observer.observers), 1)
+        self.observer.unsubscribe(self.dummy_callback, [1], key={"a": 1})
+        self.assertEqual(self.observer.observers, [])
+
+    def test_changes_during_call_apply_to_next_call(self):
+        calls = []
+
+        def unsubscribing_callback(data):
+            calls.append("first")
+            self.observer.unsubscribe(unsubscribing_callback)
+            self.observer.subscribe(lambda data: calls.append("new"))
+
+        self.observer.subscribe(unsubscribing_callback)
+        self.observer.subscribe(lambda data: calls.append("second"))
+        self.observer.call("OK")
+        self.assertEqual(calls, ["first", "second"])
+        self.observer.call("OK")
+        self.assertEqual(calls, ["first", "second", "second", "new"])
+
+    def test_concurrent_subscribe_during_dispatch(self):
+        calls = []
+        self.observer.subscribe_key("OK", calls.append)
+        stop = threading.Event()
+
+        def churn():
+            while not stop.is_set():
+                handle = self.observer.subscribe_key("OK", self.dummy_callback)
+                self.observer.unsubscribe_handle(handle)
+
+        thread = threading.Thread(target=churn)
+        thread.start()
+        try:
+            for _ in range(1000):
+                self.observer.call("OK")
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(len(calls), 1000)
+
+    def test_keyed_changes_keep_snapshots_of_other_keys(self):
+        self.observer.subscribe_key("OK", self.dummy_callback)
+        snapshot = self.observer._keyed_snapshots["OK"]
+        keyed_observers = self.observer.keyed_observers
+
+        handle = self.observer.subscribe_key("ERR", self.dummy_callback)
+        self.observer.unsubscribe_handle(handle)
+
+        self.assertIs(self.observer._keyed_snapshots["OK"], snapshot)
+        self.assertEqual(list(keyed_observers), ["OK"])
+        self.assertEqual(list(self.observer.keyed_observers), ["OK"])
+
+    def test_isolated_errors_do_not_abort_dispatch(self):
+        errors = []
+        observer = Observer(isolate_errors=True)
+        observer.error_callback = lambda exception, definition: errors.append(definition['target'])
+
+        def callback_raises(data):
+            raise ValueError("Oops")
+
+        observer.subscribe(callback_raises)
+        observer.subscribe(self.dummy_callback)
+        observer.call("OK")
+        observer.call("OK")
+        self.assertEqual(len(self.callback_calls), 2)
+        self.assertEqual(observer.error_count, 2)
+        self.assertIsInstance(observer.last_error, RuntimeError)
+        self.assertIsInstance(observer.last_error.__cause__, ValueError)
+        self.assertEqual(errors, [callback_raises, callback_raises])
+
+    def test_isolated_errors_ignore_failing_error_callback(self):
+        observer = Observer(isolate_errors=True)
+        observer.error_callback = Mock(side_effect=Exception("hook failed"))
+        observer.subscribe_key("OK", lambda: None)
+        observer.call("OK")
+        self.assertEqual(observer.error_count, 1)
+        self.assertIsInstance(observer.last_error, TypeError)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,88 @@
+import os
+import threading
+import unittest
+
+from src.imcntr import DeviceConnection, Controller, Sample, Shutter, CommandPipeline
+from src.imcntr.simulator import ControllerSimulator
+
+
+class TestControllerSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = ControllerSimulator(linear_time=0.05, rotation_step_time=0.001)
+        self.addCleanup(self.simulator.stop)
+
+    def connect(self, port):
+        connection = DeviceConnection(port)
+        connection.connect()
+        self.addCleanup(connection.disconnect)
+        return connection
+
+    def test_socket_connection_sends_ready_and_answers_tasks(self):
+        self.simulator.boot_time = 0.1
+        connection = self.connect(self.simulator.start_socket())
+        controller = Controller(connection)
+
+        self.assertTrue(controller.ready(timeout=2))
+        self.assertTrue(controller.connected(timeout=2))
+        self.assertTrue(Shutter(connection).open(timeout=2))
+        sample = Sample(connection)
+        self.assertTrue(sample.move_in(timeout=2))
+        self.assertEqual(sample.scan([10, 20, 30], timeout=2), 3)
+        self.assertEqual(
+            self.simulator.commands,
+            ["connect", "open_shutter", "move_in", "rot_cw+10", "rot_cw+20", "rot_cw+30"],
+        )
+
+    @unittest.skipUnless(os.name == "posix", "pseudo terminals require POSIX")
+    def test_pty_connection_answers_tasks(self):
+        connection = self.connect(self.simulator.start_pty())
+        self.simulator.boot_time = 0.05
+
+        threading.Timer(0.05, self.simulator.reset).start()
+
+        self.assertTrue(Controller(connection).ready(timeout=2))
+        self.assertTrue(Shutter(connection).close(timeout=2))
+
+    def test_stop_cancels_pending_motion(self):
+        self.simulator.linear_time = 5
+        connection = self.connect(self.simulator.start_socket())
+        sample = Sample(connection)
+
+        moving = sample.move_out(timeout=0.5, block=False)
+        self.assertTrue(sample.move_stop(timeout=2))
+        self.assertFalse(moving.result())
+
+    def test_pipelined_motions_are_queued_per_axis(self):
+        self.simulator.rotation_step_time = 0.01
+        connection = self.connect(self.simulator.start_socket())
+
+        with CommandPipeline(connection, timeout=2) as pipeline:
+            futures = pipeline.submit_all([("rot_cw+5", "rot_stopped")] * 4)
+            results = [future.result(timeout=3) for future in futures]
+
+            self.assertEqual(results, [True] * 4)
+            self.assertEqual(pipeline.pending, 0)
+
+    def test_stop_cancels_queued_motions(self):
+        self.simulator.linear_time = 5
+        connection = self.connect(self.simulator.start_socket())
+
+        with CommandPipeline(connection, timeout=0.5) as pipeline:
+            moving = pipeline.submit_all([("move_in", "pos_in"), ("move_out", "pos_out")])
+            self.assertTrue(pipeline.submit("stop_lin", "lin_stopped").result(timeout=2))
+            self.assertEqual([future.result(timeout=2) for future in moving], [False, False])
+
+    def test_dropped_replies_time_out(self):
+        self.simulator.drop_rate = 1
+        connection = self.connect(self.simulator.start_socket())
+
+        self.assertFalse(Shutter(connection).open(timeout=0.1))
+
+    def test_invalid_drop_rate_raises(self):
+        with self.assertRaises(ValueError):
+            ControllerSimulator(drop_rate=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import unittest
+
+from src.imcntr import DeviceConnection, LineStream, ConnectionLostError, ReplayConnection, TraceRecord
+from src.imcntr.trace import RECEIVED
+from src.imcntr.stream import DROP_OLDEST, DROP_NEWEST
+
+
+class TestLineStream(unittest.TestCase):
+
+    def test_drop_oldest(self):
+        stream = LineStream(maxsize=2, policy=DROP_OLDEST)
+        for line in ("a", "b", "c"):
+            stream.put(line)
+        stream.finish()
+
+        self.assertEqual(list(stream), ["b", "c"])
+        self.assertEqual(stream.dropped, 1)
+        self.assertEqual(stream.received, 3)
+
+    def test_drop_newest(self):
+        stream = LineStream(maxsize=2, policy=DROP_NEWEST)
+        for line in ("a", "b", "c"):
+            stream.put(line)
+        stream.finish()
+
+        self.assertEqual(list(stream), ["a", "b"])
+        self.assertEqual(stream.dropped, 1)
+
+    def test_blocking_iteration_wakes_on_put(self):
+        stream = LineStream()
+        threading.Timer(0.05, stream.put, ("a",)).start()
+        threading.Timer(0.1, stream.finish).start()
+
+        self.assertEqual(list(stream), ["a"])
+
+    def test_error_is_raised_after_buffered_lines(self):
+        stream = LineStream()
+        stream.put("a")
+        stream.finish(ConnectionLostError("lost"))
+
+        self.assertEqual(next(stream), "a")
+        with self.assertRaises(ConnectionLostError):
+            next(stream)
+
+    def test_async_iteration(self):
+        stream = LineStream()
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.02, lambda: threading.Thread(target=stream.put, args=("a",)).start())
+            loop.call_later(0.05, stream.put, "b")
+            loop.call_later(0.08, stream.finish)
+            return [line async for line in stream]
+
+        self.assertEqual(asyncio.run(main()), ["a", "b"])
+
+    def test_close_discards_and_ends(self):
+        detach = []
+        stream = LineStream(detach=detach.append)
+        stream.put("a")
+        stream.close()
+        stream.close()
+        stream.put("b")
+
+        self.assertEqual(list(stream), [])
+        self.assertEqual(detach, [stream])
+        self.assertTrue(stream.ended)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            LineStream(maxsize=1.5)
+        with self.assertRaises(ValueError):
+            LineStream(maxsize=0)
+        with self.assertRaises(ValueError):
+            LineStream(policy="block")
+
+
+class TestConnectionStreams(unittest.TestCase):
+
+    def test_independent_consumers(self):
+        connection = DeviceConnection()
+        first = connection.lines()
+        second = connection.alines(maxsize=1, policy=DROP_NEWEST)
+        connection.receive("a")
+        connection.receive("b")
+        connection.connection_lost(None)
+
+        self.assertEqual(list(first), ["a", "b"])
+        self.assertEqual(list(second), ["a"])
+        self.assertEqual(second.dropped, 1)
+
+    def test_connection_loss_raises(self):
+        connection = DeviceConnection()
+        stream = connection.lines()
+        connection.receive("a")
+        connection.connection_lost(OSError("unplugged"))
+
+        self.assertEqual(next(stream), "a")
+        with self.assertRaises(ConnectionLostError) as context:
+            next(stream)
+        self.assertIsInstance(context.exception.__cause__, OSError)
+
+    def test_replay_disconnect_ends_streams(self):
+        connection = ReplayConnection([TraceRecord(0.0, RECEIVED, "controller_ready")], speed=None)
+        stream = connection.lines()
+        connection.connect()
+        threading.Timer(0.1, connection.disconnect).start()
+
+        self.assertEqual(list(stream), ["controller_ready"])
+        self.assertTrue(stream.ended)
+
+    def test_closed_stream_is_detached(self):
+        connection = DeviceConnection()
+        with connection.lines() as stream:
+            connection.receive("a")
+        connection.receive("b")
+
+        self.assertEqual(stream.received, 1)
+        self.assertEqual(connection._streams, ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from src.imcntr import (
+    ConnectionLostError, DeviceConnection, ReconnectSupervisor, Sample, SubmitTask
+)
+from src.imcntr.simulator import ControllerSimulator
+
+
+class TestReconnectSupervisor(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = ControllerSimulator(linear_time=5)
+        self.addCleanup(self.simulator.stop)
+        self.port = self.simulator.start_socket()
+        self.connection = DeviceConnection(self.port)
+        self.connection.connect()
+        self.addCleanup(self.connection.disconnect)
+
+    def _drop_connection(self):
+        self.simulator._transport._close_client()
+
+    def _wait_for_loss(self, action):
+        lost = threading.Event()
+        handle = self.connection.connection_lost_observer.subscribe(lambda exception: lost.set())
+        action()
+        self.assertTrue(lost.wait(5))
+        self.connection.connection_lost_observer.unsubscribe_handle(handle)
+
+    def test_reconnects_after_connection_loss(self):
+        with ReconnectSupervisor(self.connection, initial_delay=0.05, ready_timeout=2) as supervisor:
+            supervisor.reconnected_callback = Mock()
+            self._wait_for_loss(self._drop_connection)
+
+            self.assertTrue(supervisor.wait_connected(timeout=5))
+            self.assertTrue(self.connection.connected)
+            self.assertEqual(supervisor.reconnects, 1)
+            supervisor.reconnected_callback.assert_called_once_with()
+            self.assertIn("connect", self.simulator.commands)
+
+    def test_loss_during_reconnected_callback_reconnects_again(self):
+        with ReconnectSupervisor(self.connection, initial_delay=0.05, ready_timeout=2) as supervisor:
+            reconnected = threading.Event()
+
+            def drop_once():
+                if supervisor.reconnects == 1:
+                    self._wait_for_loss(self._drop_connection)
+                else:
+                    reconnected.set()
+
+            supervisor.reconnected_callback = drop_once
+            self._wait_for_loss(self._drop_connection)
+
+            self.assertTrue(reconnected.wait(5))
+            self.assertTrue(self.connection.connected)
+            self.assertEqual(supervisor.reconnects, 2)
+            self.assertFalse(supervisor.reconnecting)
+
+    def test_pending_wait_raises_on_connection_loss(self):
+        with ReconnectSupervisor(self.connection, initial_delay=0.05, ready_timeout=2):
+            sample = Sample(self.connection)
+            threading.Timer(0.1, self._drop_connection).start()
+            start = time.monotonic()
+
+            with self.assertRaises(ConnectionLostError):
+                sample.move_in(timeout=10)
+            self.assertLess(time.monotonic() - start, 2)
+
+    def test_submit_future_fails_on_connection_loss(self):
+        task = SubmitTask(self.connection, response="pos_in", task="move_in")
+        future = task.submit(timeout=10)
+        self._drop_connection()
+
+        self.assertIsInstance(future.exception(timeout=2), ConnectionLostError)
+
+    def test_gives_up_after_max_attempts(self):
+        with ReconnectSupervisor(
+            self.connection, initial_delay=0.05, max_attempts=2, ready_timeout=0.1
+        ) as supervisor:
+            supervisor.failed_callback = Mock()
+            self._wait_for_loss(self.simulator.stop)
+
+            self.assertFalse(supervisor.wait_connected(timeout=5))
+            self.assertEqual(supervisor.attempts, 2)
+            supervisor.failed_callback.assert_called_once()
+
+    def test_disconnect_does_not_reconnect(self):
+        with ReconnectSupervisor(self.connection, initial_delay=0.05) as supervisor:
+            self.connection.disconnect()
+            time.sleep(0.1)
+
+            self.assertFalse(supervisor.reconnecting)
+            self.assertFalse(self.connection.connected)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ReconnectSupervisor(self.connection, initial_delay=0)
+        with self.assertRaises(ValueError):
+            ReconnectSupervisor(self.connection, factor=0.5)
+        with self.assertRaises(ValueError):
+            ReconnectSupervisor(self.connection, max_attempts=0)
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from src.imcntr import DeviceConnection, TraceRecorder, TraceRecord, read_trace
+from src.imcntr.trace import SENT, RECEIVED
+
+
+class TestTraceRecorder(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "test.trace")
+
+    def test_records_are_written_in_order(self):
+        with TraceRecorder(self.path) as tracer:
+            tracer.record(SENT, "open_shutter")
+            tracer.record(RECEIVED, "shutter_opened")
+
+        records = list(read_trace(self.path))
+
+        self.assertEqual([(r.direction, r.line) for r in records],
+                         [(SENT, "open_shutter"), (RECEIVED, "shutter_opened")])
+        self.assertLessEqual(records[0].timestamp, records[1].timestamp)
+        self.assertIsInstance(records[0], TraceRecord)
+        self.assertEqual(tracer.written, 2)
+
+    def test_overflow_drops_oldest_records(self):
+        tracer = TraceRecorder(self.path, capacity=3)
+        tracer.start()
+        for index in range(5):
+            tracer.record(RECEIVED, str(index))
+        tracer.stop()
+
+        self.assertEqual([r.line for r in read_trace(self.path)], ["2", "3", "4"])
+        self.assertEqual(tracer.dropped, 2)
+
+    def test_ring_buffer_wraps_around(self):
+        with TraceRecorder(self.path, capacity=4) as tracer:
+            for index in range(10):
+                tracer.record(SENT, str(index))
+                if index % 3 == 2:
+                    tracer.flush()
+
+        self.assertEqual([r.line for r in read_trace(self.path)], [str(i) for i in range(10)])
+        self.assertEqual(tracer.dropped, 0)
+
+    def test_records_while_stopped_are_discarded(self):
+        tracer = TraceRecorder(self.path, capacity=3)
+        for index in range(5):
+            tracer.record(SENT, "before")
+        with tracer:
+            tracer.record(SENT, "during")
+        tracer.record(SENT, "after")
+
+        self.assertEqual([r.line for r in read_trace(self.path)], ["during"])
+        self.assertEqual(tracer.dropped, 0)
+
+    def test_truncated_record_is_ignored(self):
+        with TraceRecorder(self.path) as tracer:
+            tracer.record(SENT, "first")
+            tracer.record(SENT, "second")
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 2)
+
+        self.assertEqual([r.line for r in read_trace(self.path)], ["first"])
+
+    def test_invalid_file_raises(self):
+        with open(self.path, "wb") as file:
+            file.write(b"no trace")
+        with self.assertRaises(ValueError):
+            read_trace(self.path)
+
+    def test_start_twice_raises(self):
+        with TraceRecorder(self.path) as tracer:
+            with self.assertRaises(RuntimeError):
+                tracer.start()
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(TypeError):
+            TraceRecorder(self.path, capacity=1.5)
+        with self.assertRaises(ValueError):
+            TraceRecorder(self.path, capacity=0)
+
+    def test_device_connection_records_traffic(self):
+        connection = DeviceConnection()
+        connection._serial_connection = Mock(is_open=True)
+        connection._thread = Mock()
+        connection._thread.is_alive.return_value = True
+        connection._protocol = Mock()
+        with TraceRecorder(self.path) as tracer:
+            connection.tracer = tracer
+            connection.send("open_shutter")
+            connection.receive("shutter_opened")
+
+        self.assertEqual([(r.direction, r.line) for r in read_trace(self.path)],
+                         [(SENT, "open_shutter"), (RECEIVED, "shutter_opened")])